@@ -0,0 +1,215 @@
+# benchmarks/__main__.py
+"""基准运行器：逐个用例启动子进程计时，汇总为 JSON，并可与基线比较。
+
+    python -m benchmarks [--quick] [--real-ocr] [--only 用例 ...] [--repeat N]
+                         [--output results.json] [--compare baseline.json] [--tolerance 0.15]
+
+与基线比较时吞吐（页/秒、文件/秒、MB/秒）下降或内存峰值上升超过 tolerance 即记为退化，
+存在退化时退出码为 1。
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BENCH_DIR = Path(__file__).parent
+DATA_DIR = BENCH_DIR / ".data"
+RESULTS_VERSION = 1
+# 指标 -> 是否越大越好
+METRICS = {
+    "pages_per_sec": True,
+    "files_per_sec": True,
+    "mb_per_sec": True,
+    "peak_rss_mb": False,
+}
+
+
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    """当前进程（或已结束子进程中最大者）的内存峰值，取不到时返回 None"""
+    if sys.platform == "win32":
+        if children:
+            return None
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return None
+        return round(counters.PeakWorkingSetSize / 2 ** 20, 1)
+
+    import resource
+
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    if not usage.ru_maxrss:
+        return None
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    scale = 1 if sys.platform == "darwin" else 1024
+    return round(usage.ru_maxrss * scale / 2 ** 20, 1)
+
+
+def _dir_bytes(folder: Path) -> int:
+    return sum(p.stat().st_size for p in folder.rglob("*") if p.is_file())
+
+
+def run_case(name: str, scale_name: str, repeat: int) -> dict:
+    """在当前进程中运行一个用例（由子进程调用），返回中位数耗时及派生指标"""
+    from .cases import CASES
+    from .fixtures import SCALES
+
+    case = CASES[name]
+    scale = SCALES[scale_name]
+    data = DATA_DIR / scale_name
+    if case.prepare:
+        case.prepare()
+
+    timings, counts, written = [], {}, 0
+    for _ in range(repeat):
+        out = Path(tempfile.mkdtemp(prefix=f"bench_{name}_"))
+        try:
+            started = time.perf_counter()
+            counts = case.run(data, out, scale)
+            timings.append(time.perf_counter() - started)
+            written = _dir_bytes(out)
+        finally:
+            shutil.rmtree(out, ignore_errors=True)
+
+    elapsed = statistics.median(timings)
+    result = {"elapsed_s": round(elapsed, 4), "runs": [round(t, 4) for t in timings], **counts}
+    if "pages" in counts:
+        result["pages_per_sec"] = round(counts["pages"] / elapsed, 2)
+    if "files" in counts:
+        result["files_per_sec"] = round(counts["files"] / elapsed, 2)
+    if written:
+        result["bytes_written"] = written
+        result["mb_per_sec"] = round(written / 2 ** 20 / elapsed, 2)
+    result["peak_rss_mb"] = peak_rss_mb()
+    children = peak_rss_mb(children=True)
+    if children:
+        result["peak_rss_children_mb"] = children
+    return result
+
+
+def _spawn_case(name: str, scale_name: str, repeat: int) -> dict:
+    cmd = [sys.executable, "-m", "benchmarks", "--run-case", name, "--scale", scale_name, "--repeat", str(repeat)]
+    proc = subprocess.run(cmd, cwd=BENCH_DIR.parent, capture_output=True, text=True, encoding="utf-8")
+    if proc.returncode != 0:
+        return {"error": (proc.stderr.strip().splitlines() or ["子进程异常退出"])[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _environment() -> dict:
+    import fitz
+    import PIL
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "pymupdf": fitz.VersionBind,
+        "pillow": PIL.__version__,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """返回退化项的描述；同时打印逐项对比"""
+    if current.get("scale") != baseline.get("scale"):
+        print(f"⚠️ 数据规模不同（当前 {current.get('scale')}，基线 {baseline.get('scale')}），对比仅供参考")
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or "error" in result or "error" in base:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            new, old = result.get(metric), base.get(metric)
+            if not new or not old:
+                continue
+            change = new / old - 1
+            worse = -change if higher_is_better else change
+            mark = "❌" if worse > tolerance else "✅"
+            print(f"  {mark} {name}.{metric}: {old} → {new} ({change:+.1%})")
+            if worse > tolerance:
+                regressions.append(f"{name}.{metric} {change:+.1%}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .cases import CASES
+    from .fixtures import SCALES, ensure_fixtures
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="渲染 / OCR / 导出性能基准")
+    parser.add_argument("--quick", action="store_true", help="使用小规模数据")
+    parser.add_argument("--scale", choices=sorted(SCALES), help=argparse.SUPPRESS)
+    parser.add_argument("--only", nargs="+", metavar="CASE", choices=sorted(CASES), help="只运行指定用例")
+    parser.add_argument("--real-ocr", action="store_true", help="同时运行需要真实 PaddleOCR 的用例")
+    parser.add_argument("--repeat", type=int, default=3, help="每个用例重复次数，取耗时中位数")
+    parser.add_argument("--output", type=Path, default=BENCH_DIR / "results.json")
+    parser.add_argument("--compare", type=Path, metavar="BASELINE", help="与基线 JSON 比较")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="允许的相对退化幅度")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    scale_name = args.scale or ("quick" if args.quick else "full")
+
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, scale_name, max(1, args.repeat))))
+        return 0
+
+    ensure_fixtures(DATA_DIR, scale_name)
+    names = args.only or [n for n, c in CASES.items() if args.real_ocr or not c.real_ocr]
+    results: Dict[str, dict] = {}
+    for name in names:
+        result = _spawn_case(name, scale_name, max(1, args.repeat))
+        results[name] = result
+        if "error" in result:
+            print(f"❌ {name} 失败: {result['error']}")
+            continue
+        rate = " · ".join(
+            f"{result[k]} {unit}" for k, unit in
+            (("pages_per_sec", "页/秒"), ("files_per_sec", "文件/秒"), ("mb_per_sec", "MB/秒")) if k in result
+        )
+        print(f"✅ {name}: {result['elapsed_s']}s · {rate} · 内存峰值 {result['peak_rss_mb']} MB")
+
+    report = {
+        "version": RESULTS_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "scale": scale_name,
+        "repeat": args.repeat,
+        "environment": _environment(),
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, ensure_ascii=False, indent=1), encoding="utf-8")
+    print(f"📄 结果已写入 {args.output}")
+
+    failed = any("error" in r for r in results.values())
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"❌ 性能退化 {len(regressions)} 项: " + "；".join(regressions))
+            failed = True
+        else:
+            print("✅ 未发现超出容差的退化")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+# benchmarks/cases.py
+"""基准用例：每个用例接收数据目录和一个空输出目录，返回处理量（页数/文件数）。
+
+计时、统计写出字节数和内存峰值由 __main__ 负责；用例内部只做被测的那一件事。
+"""
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from tools.ocr_to_doc import (
+    IMAGE_OR_PDF_EXTENSIONS, collect_images_or_pdfs as _collect_images_or_pdfs, export_to_excel, export_to_word, get_ocr_engine,
+    ocr_files_pipelined,
+)
+from tools.pdf_to_jpg import (
+    DEFAULT_PROFILE, OutputProfile, RenderOptions, collect_pdfs as _collect_pdfs, convert_pdfs_parallel,
+    convert_single_pdf,
+)
+from tools.scanner import DirectoryScanner
+
+from .fixtures import FixtureScale
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    description: str
+    run: Callable[[Path, Path, FixtureScale], Dict[str, int]]
+    real_ocr: bool = False  # 需要真实 PaddleOCR，只在 --real-ocr 时运行
+    prepare: Optional[Callable[[], None]] = None  # 计时前执行一次（如加载模型）
+
+
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str, description: str, real_ocr: bool = False, prepare=None):
+    def register(func):
+        CASES[name] = Case(name, description, func, real_ocr, prepare)
+        return func
+    return register
+
+
+# ---- PDF 转 JPG ----
+
+def _render(pdf: Path, out: Path, options: Optional[RenderOptions] = None) -> Dict[str, int]:
+    pages = [0]
+    ok, msg = convert_single_pdf(
+        pdf, out, options=options or RenderOptions(resume=False),
+        page_callback=lambda n: pages.__setitem__(0, pages[0] + n),
+    )
+    if not ok:
+        raise RuntimeError(msg)
+    return {"pages": pages[0]}
+
+
+@case("render_text_a4", "convert_single_pdf：A4 文字页")
+def render_text_a4(data: Path, out: Path, scale: FixtureScale):
+    return _render(data / "text_a4.pdf", out)
+
+
+@case("render_text_a3", "convert_single_pdf：A3 文字页（大页面）")
+def render_text_a3(data: Path, out: Path, scale: FixtureScale):
+    return _render(data / "text_a3.pdf", out)
+
+
+@case("render_image_a4", "convert_single_pdf：A4 扫描图片页")
+def render_image_a4(data: Path, out: Path, scale: FixtureScale):
+    return _render(data / "image_a4.pdf", out)
+
+
+@case("render_profiles", "convert_single_pdf：A4 文字页，原图 + 缩略图 + WebP + 灰度，一次渲染")
+def render_profiles(data: Path, out: Path, scale: FixtureScale):
+    profiles = (
+        DEFAULT_PROFILE,
+        OutputProfile("thumb", max_size=400, quality=80),
+        OutputProfile(format="WEBP"),
+        OutputProfile("gray", mode="L"),
+    )
+    return _render(data / "text_a4.pdf", out, RenderOptions(resume=False, profiles=profiles))
+
+
+@case("render_archive", "convert_single_pdf：A4 文字页，写入一个 CBZ 归档")
+def render_archive(data: Path, out: Path, scale: FixtureScale):
+    return _render(data / "text_a4.pdf", out, RenderOptions(resume=False, archive="cbz"))
+
+
+@case("render_tiled", "convert_single_pdf：A3 文字页，2 MP 像素预算，切块输出")
+def render_tiled(data: Path, out: Path, scale: FixtureScale):
+    return _render(data / "text_a3.pdf", out, RenderOptions(resume=False, max_pixels=2_000_000, oversize="tile"))
+
+
+@case("render_parallel", "convert_pdfs_parallel：三份 PDF，默认进程数")
+def render_parallel(data: Path, out: Path, scale: FixtureScale):
+    pages = [0]
+    jobs = [(data / name, out / Path(name).stem) for name in ("text_a4.pdf", "text_a3.pdf", "image_a4.pdf")]
+    for pdf, ok, msg, _ in convert_pdfs_parallel(
+        jobs, options=RenderOptions(resume=False), page_callback=lambda n: pages.__setitem__(0, pages[0] + n),
+    ):
+        if not ok:
+            raise RuntimeError(msg)
+    return {"pages": pages[0]}
+
+
+# ---- 文件收集 ----
+
+@case("collect_pdfs", "collect_pdfs：递归目录树")
+def collect_pdfs(data: Path, out: Path, scale: FixtureScale):
+    return {"files": scale.tree_files, "matched": len(_collect_pdfs(data / "tree"))}
+
+
+@case("collect_images_or_pdfs", "collect_images_or_pdfs：递归目录树")
+def collect_images_or_pdfs(data: Path, out: Path, scale: FixtureScale):
+    return {"files": scale.tree_files, "matched": len(_collect_images_or_pdfs(data / "tree"))}
+
+
+@case("scan_streaming", "DirectoryScanner：并行扫描，按发现顺序产出")
+def scan_streaming(data: Path, out: Path, scale: FixtureScale):
+    matched = sum(1 for _ in DirectoryScanner(data / "tree", extensions=IMAGE_OR_PDF_EXTENSIONS))
+    return {"files": scale.tree_files, "matched": matched}
+
+
+# ---- 导出 ----
+
+def _texts(scale: FixtureScale) -> List[tuple]:
+    rng = random.Random(5)
+    alphabet = "报纸版面新闻标题正文记者编辑日期经济社会文化体育abcdefghij0123456789 \n"
+    return [
+        (f"file_{i:04d}.pdf", "".join(rng.choices(alphabet, k=scale.export_chars)))
+        for i in range(scale.export_files)
+    ]
+
+
+@case("export_word", "export_to_word：流式写 docx")
+def export_word(data: Path, out: Path, scale: FixtureScale):
+    texts = _texts(scale)
+    export_to_word(texts, out / "OCR结果.docx")
+    return {"files": len(texts)}
+
+
+@case("export_excel", "export_to_excel：write-only 工作簿")
+def export_excel(data: Path, out: Path, scale: FixtureScale):
+    texts = _texts(scale)
+    export_to_excel(texts, out / "OCR结果.xlsx")
+    return {"files": len(texts)}
+
+
+# ---- OCR 流水线 ----
+
+_STUB_LINE = [[[0.0, 0.0], [100.0, 0.0], [100.0, 20.0], [0.0, 20.0]], ("stub 识别结果", 0.99)]
+
+
+def stub_recognize(images) -> list:
+    """桩引擎：立即返回固定结果，测出的是读取/栅格化/调度本身的开销"""
+    return [[[_STUB_LINE]] for _ in images]
+
+
+def _ocr_inputs(data: Path) -> List[Path]:
+    return sorted((data / "images").iterdir()) + [data / "image_a4.pdf", data / "text_a4.pdf"]
+
+
+def _ocr(files: List[Path], recognize, use_text_layer: bool) -> Dict[str, int]:
+    pages = [0]
+    for result in ocr_files_pipelined(
+        files, recognize=recognize, use_text_layer=use_text_layer,
+        page_callback=lambda n: pages.__setitem__(0, pages[0] + n),
+    ):
+        if result.error:
+            raise RuntimeError(f"{result.path}: {result.error}")
+    return {"pages": pages[0], "files": len(files)}
+
+
+@case("ocr_stub", "ocr_files_pipelined：桩引擎，全部页面走识别")
+def ocr_stub(data: Path, out: Path, scale: FixtureScale):
+    return _ocr(_ocr_inputs(data), stub_recognize, use_text_layer=False)
+
+
+@case("ocr_stub_text_layer", "ocr_files_pipelined：桩引擎，有文本层的页直接提取")
+def ocr_stub_text_layer(data: Path, out: Path, scale: FixtureScale):
+    return _ocr(_ocr_inputs(data), stub_recognize, use_text_layer=True)
+
+
+@case("ocr_real", "ocr_files_pipelined：真实 PaddleOCR（单独图片 + 扫描 PDF）", real_ocr=True, prepare=get_ocr_engine)
+def ocr_real(data: Path, out: Path, scale: FixtureScale):
+    files = sorted((data / "images").iterdir()) + [data / "image_a4.pdf"]
+    return _ocr(files, None, use_text_layer=False)
@@ -0,0 +1,120 @@
+# benchmarks/fixtures.py
+"""合成基准数据：固定随机种子，同一规模每次生成的内容完全相同。"""
+import io
+import json
+import random
+import shutil
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import fitz
+from PIL import Image
+
+FIXTURES_VERSION = 1
+_WORDS = (
+    "报纸 版面 新闻 标题 正文 记者 编辑 日期 第一版 要闻 经济 社会 文化 体育 "
+    "newspaper page column headline report market city weather sports archive"
+).split()
+
+
+@dataclass(frozen=True)
+class FixtureScale:
+    pages: int          # 每份 PDF 的页数
+    image_dpi: int      # 扫描页里嵌入图片的分辨率
+    tree_files: int     # collect_* 用的目录树中的文件数
+    images: int         # OCR 用的单独图片数
+    export_files: int   # 导出用例的文件数
+    export_chars: int   # 导出用例每个文件的字符数
+
+
+SCALES = {
+    "quick": FixtureScale(pages=4, image_dpi=100, tree_files=300, images=4, export_files=50, export_chars=2000),
+    "full": FixtureScale(pages=30, image_dpi=150, tree_files=3000, images=20, export_files=500, export_chars=6000),
+}
+
+
+def _paragraph(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def make_text_pdf(path: Path, pages: int, paper: str = "a4", seed: int = 1):
+    """纯文字页：带文本层，版面接近报纸正文"""
+    rng = random.Random(seed)
+    width, height = fitz.paper_size(paper)
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page(width=width, height=height)
+        page.insert_text((36, 54), _paragraph(rng, 8), fontname="china-s", fontsize=20)
+        column = fitz.Rect(36, 80, width - 36, height - 36)
+        page.insert_textbox(column, _paragraph(rng, int(width * height / 180)), fontname="china-s", fontsize=9)
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def _scan_image(rng: random.Random, size) -> bytes:
+    """模拟扫描件：浅色噪声底 + 深色文字块，编码为 JPEG"""
+    w, h = size
+    noise = Image.frombytes("L", (w, h), rng.randbytes(w * h)).point(lambda v: 200 + v // 5)
+    for _ in range(h // 40):
+        x, y = rng.randrange(0, w // 2), rng.randrange(0, h - 20)
+        noise.paste(40, (x, y, x + rng.randrange(w // 8, w // 2), y + 12))
+    buf = io.BytesIO()
+    noise.convert("RGB").save(buf, "JPEG", quality=85)
+    return buf.getvalue()
+
+
+def make_image_pdf(path: Path, pages: int, dpi: int, paper: str = "a4", seed: int = 2):
+    """扫描件：每页一张整页图片，没有文本层"""
+    rng = random.Random(seed)
+    width, height = fitz.paper_size(paper)
+    size = (int(width / 72 * dpi), int(height / 72 * dpi))
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page(width=width, height=height)
+        page.insert_image(page.rect, stream=_scan_image(rng, size))
+    doc.save(path)
+    doc.close()
+
+
+def make_images(folder: Path, count: int, source_pdf: Path, dpi: int = 150):
+    """OCR 用的单独图片：由文字 PDF 的页面渲染成 PNG/JPG 交替"""
+    folder.mkdir(parents=True, exist_ok=True)
+    with fitz.open(source_pdf) as doc:
+        for i in range(count):
+            pix = doc[i % doc.page_count].get_pixmap(matrix=fitz.Matrix(dpi / 72, dpi / 72))
+            ext = "png" if i % 2 == 0 else "jpg"
+            pix.save(folder / f"page_{i + 1:03d}.{ext}")
+
+
+def make_tree(root: Path, files: int, seed: int = 3):
+    """collect_* 用的目录树：多层子目录，PDF、图片与无关文件混合（内容只有占位字节）"""
+    rng = random.Random(seed)
+    suffixes = [".pdf", ".PDF", ".jpg", ".png", ".txt", ".docx", ".bmp", ".json"]
+    for i in range(files):
+        folder = root / f"{rng.randrange(20):02d}" / f"{rng.randrange(10):02d}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"f{i:05d}{rng.choice(suffixes)}").write_bytes(b"0")
+
+
+def ensure_fixtures(data_dir: Path, scale_name: str) -> Path:
+    """生成（或复用已缓存的）指定规模的基准数据，返回其目录"""
+    scale = SCALES[scale_name]
+    root = data_dir / scale_name
+    stamp = root / "fixtures.json"
+    spec = {"version": FIXTURES_VERSION, "scale": asdict(scale)}
+    try:
+        if json.loads(stamp.read_text(encoding="utf-8")) == spec:
+            return root
+    except (OSError, ValueError):
+        pass
+
+    print(f"⏳ 生成基准数据（{scale_name}）…")
+    shutil.rmtree(root, ignore_errors=True)
+    root.mkdir(parents=True, exist_ok=True)
+    make_text_pdf(root / "text_a4.pdf", scale.pages, "a4")
+    make_text_pdf(root / "text_a3.pdf", scale.pages, "a3", seed=4)
+    make_image_pdf(root / "image_a4.pdf", scale.pages, scale.image_dpi)
+    make_images(root / "images", scale.images, root / "text_a4.pdf")
+    make_tree(root / "tree", scale.tree_files)
+    stamp.write_text(json.dumps(spec), encoding="utf-8")
+    return root
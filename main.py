@@ -1,4 +1,5 @@
 # main.py
+import multiprocessing
 import ssl
 import urllib.request
 
@@ -12,9 +13,8 @@ urllib.request.install_opener(
 
 import flet as ft
 from home_page import HomePage
-from tools import get_tools  # 触发工具发现
-import tools.pdf_to_jpg  # 显式导入工具模块
-# 移除OCR工具模块的导入
+from tools import get_tools  # 触发工具发现（只读取元数据，打开工具时才导入对应模块）
+from tools.ocr_pool import warm_up_from_env
 
 def main(page: ft.Page):
     page.title = "喜洋洋工具库"
@@ -22,6 +22,9 @@ def main(page: ft.Page):
     page.window.height = 600
     page.padding = 20
 
+    # 可选：后台预热 OCR 引擎进程池（NEWSTOOLS_OCR_WARMUP=1）
+    warm_up_from_env()
+
     tool_builders = {name: builder for name, _, builder in get_tools()}
 
     def go_back_to_home(_):
@@ -56,5 +59,7 @@ def main(page: ft.Page):
     go_back_to_home(None)
 
 if __name__ == "__main__":
+    # 打包为 exe 后，进程池子进程需要先经过 freeze_support
+    multiprocessing.freeze_support()
     # 运行Flet应用
     ft.app(target=main)
\ No newline at end of file
@@ -0,0 +1,128 @@
+# tests/test_page_filter.py
+"""页面预筛：用合成的灰度页（随机笔画组成的“字”）检查空白页判断和近似重复判断。
+
+重复判断必须从严：只有内容相同（允许扫描噪声）的页才能复用结果。
+"""
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from tools.page_filter import BLANK_SKIPPED, DUPLICATE_REUSED, PageFilter  # noqa: E402
+
+WIDTH, HEIGHT = 1000, 1400
+PAPER = 245
+GLYPH_W, GLYPH_H, STROKE = 20, 28, 3
+MARGIN = 80
+
+
+def _glyph(rng) -> np.ndarray:
+    """20×28 的字：在 3×4 的骨架上随机选几段横竖笔画"""
+    glyph = np.zeros((GLYPH_H, GLYPH_W), dtype=bool)
+    for _ in range(rng.integers(3, 6)):
+        if rng.random() < 0.5:
+            y = rng.integers(0, 4) * (GLYPH_H - STROKE) // 3
+            glyph[y:y + STROKE, :] = True
+        else:
+            x = rng.integers(0, 3) * (GLYPH_W - STROKE) // 2
+            glyph[:, x:x + STROKE] = True
+    return glyph
+
+
+def _page(lines: int, seed: int, chars: int = 36) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    page = np.full((HEIGHT, WIDTH), PAPER, dtype=np.uint8)
+    for row in range(lines):
+        y = MARGIN + row * (GLYPH_H + 3)
+        for col in range(chars):
+            _put(page, y, MARGIN + col * (GLYPH_W + 4), _glyph(rng))
+    return page
+
+
+def _put(page: np.ndarray, y: int, x: int, glyph: np.ndarray):
+    area = page[y:y + GLYPH_H, x:x + GLYPH_W]
+    area[glyph] = 20
+    area[~glyph] = PAPER
+
+
+def _scanned(page: np.ndarray, seed: int) -> np.ndarray:
+    """同一页再扫描一次：整体亮度略有变化，叠加像素噪声"""
+    rng = np.random.default_rng(seed)
+    noisy = page.astype(np.int16) - 3 + rng.normal(0, 6, page.shape).round().astype(np.int16)
+    return np.clip(noisy, 0, 255).astype(np.uint8)
+
+
+def _pixmap(page: np.ndarray):
+    """只有 check_pixmap 用到的属性"""
+    return SimpleNamespace(samples_mv=page.tobytes(), width=page.shape[1], height=page.shape[0], n=1, stride=page.shape[1])
+
+
+def _register(page_filter: PageFilter, page: np.ndarray, name: str, result="结果"):
+    verdict = page_filter.check_pixmap(_pixmap(page), name, 1)
+    page_filter.remember(verdict, result)
+    return verdict
+
+
+def test_blank_pages():
+    page_filter = PageFilter(blank="skip")
+    blank = page_filter.check_pixmap(_pixmap(_scanned(_page(0, 1), 2)), "a.pdf", 1)
+    text = page_filter.check_pixmap(_pixmap(_page(1, 1)), "a.pdf", 2)
+    assert blank.blank and not text.blank
+    assert page_filter.counts() == {BLANK_SKIPPED: 1}
+    assert page_filter.pages_checked == 2
+
+
+def test_dedupe_is_off_by_default():
+    page_filter = PageFilter()
+    page = _page(30, 1)
+    _register(page_filter, page, "a.pdf")
+    assert page_filter.check_pixmap(_pixmap(page), "b.pdf", 1).duplicate_of is None
+
+
+@pytest.mark.parametrize("lines", [2, 40])
+def test_rescanned_copy_reuses_result(lines):
+    page_filter = PageFilter(dedupe=True)
+    page = _page(lines, 1)
+    _register(page_filter, page, "a.pdf")
+    copy = page_filter.check_pixmap(_pixmap(_scanned(page, 2)), "b.pdf", 1)
+    assert copy.duplicate_of == "a.pdf#1"
+    assert page_filter.reuse(copy) == "结果"
+    assert page_filter.counts() == {DUPLICATE_REUSED: 1}
+
+
+def test_sparse_pages_with_different_text_do_not_match():
+    page_filter = PageFilter(dedupe=True)
+    _register(page_filter, _page(2, 1), "a.pdf")
+    other = page_filter.check_pixmap(_pixmap(_page(2, 2)), "b.pdf", 1)
+    assert other.duplicate_of is None and page_filter.reuse(other) is None
+
+
+@pytest.mark.parametrize("glyphs", [1, 5])
+def test_dense_page_changed_in_one_region_does_not_match(glyphs):
+    page_filter = PageFilter(dedupe=True)
+    page = _page(40, 1)
+    _register(page_filter, page, "a.pdf")
+    changed = page.copy()
+    rng = np.random.default_rng(3)
+    y = MARGIN + 20 * (GLYPH_H + 3)
+    for col in range(10, 10 + glyphs):
+        _put(changed, y, MARGIN + col * (GLYPH_W + 4), _glyph(rng))
+    assert (changed != page).any()
+    verdict = page_filter.check_pixmap(_pixmap(_scanned(changed, 2)), "b.pdf", 1)
+    assert verdict.duplicate_of is None
+
+
+def test_batch_matches_and_memory_limit():
+    page_filter = PageFilter(dedupe=True, memory=2)
+    pages = [_page(10, seed) for seed in range(3)]
+    verdicts = [page_filter.check_pixmap(_pixmap(p), "a.pdf", k + 1) for k, p in enumerate(pages)]
+    copy = page_filter.check_pixmap(_pixmap(_scanned(pages[0], 5)), "a.pdf", 4)
+    assert page_filter.match_batch(verdicts + [copy]) == {3: 0}
+
+    for verdict in verdicts:
+        page_filter.remember(verdict, verdict.key)
+    # 只保留最近登记的 2 页：第 1 页已被覆盖
+    for k, page in enumerate(pages):
+        verdict = page_filter.check_pixmap(_pixmap(_scanned(page, 6)), "b.pdf", k + 1)
+        assert page_filter.reuse(verdict) == (None if k == 0 else f"a.pdf#{k + 1}")
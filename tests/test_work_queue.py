@@ -0,0 +1,111 @@
+# tests/test_work_queue.py
+"""共享目录任务队列：在临时目录上启动多个 run_worker 进程，检查领取、租约接手和汇总顺序。
+
+处理函数换成只记录调用的假函数，不需要 PyMuPDF / PaddleOCR。
+"""
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from pathlib import Path
+
+from tools import ocr_export, work_queue
+from tools.work_queue import WorkQueue, collect_results, run_worker
+
+WORKERS = 3
+ITEMS = 24
+LEASE_SECONDS = 1.0
+# 第一次处理该文件的进程直接退出（不释放租约），模拟机器崩溃
+CRASH_ITEM = "07.pdf"
+
+
+def _fake_process(queue: WorkQueue, path: Path) -> dict:
+    """每处理一次在 processed/ 下留一个标记文件"""
+    if path.name == CRASH_ITEM:
+        try:
+            os.close(os.open(queue.output / "crashed", os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            pass
+        else:
+            os._exit(1)
+    time.sleep(0.02)
+    (queue.output / "processed" / f"{path.name}.{uuid.uuid4().hex}").touch()
+    return {"ok": True, "message": f"✅ {path.name}", "text": path.name}
+
+
+def _worker(root: str, name: str):
+    work_queue._PROCESSORS["ocr_to_doc"] = _fake_process
+    for _ in run_worker(WorkQueue(Path(root)), name, poll_interval=0.05):
+        pass
+
+
+def _make_queue(tmp_path: Path, **kwargs) -> WorkQueue:
+    source = tmp_path / "input"
+    source.mkdir()
+    # 编号顺序与文件名顺序相反，汇总顺序不能靠按名排序得到
+    items = [source / f"{k:02d}.pdf" for k in reversed(range(ITEMS))]
+    for item in items:
+        item.write_bytes(b"%PDF")
+    output = tmp_path / "output"
+    (output / "processed").mkdir(parents=True)
+    return WorkQueue.create(tmp_path / "queue", "ocr_to_doc", source, output, items, **kwargs)
+
+
+class _RecordingExporter:
+    def __init__(self):
+        self.names = []
+
+    def add(self, filename: str, content: str):
+        self.names.append(filename)
+
+    def close(self):
+        return []
+
+
+def test_workers_process_each_item_once(tmp_path, monkeypatch):
+    queue = _make_queue(tmp_path, lease_seconds=LEASE_SECONDS)
+    processes = [
+        multiprocessing.Process(target=_worker, args=(str(queue.root), f"w{k}")) for k in range(WORKERS)
+    ]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join(timeout=60)
+        assert not p.is_alive()
+    # 恰好一个进程在处理 CRASH_ITEM 时退出，其余正常结束
+    assert sorted(p.exitcode for p in processes) == [0] * (WORKERS - 1) + [1]
+
+    records = list(WorkQueue(queue.root).results())
+    assert len(records) == ITEMS
+    assert all(r["ok"] for r in records)
+    processed = [name.rsplit(".", 1)[0] for name in os.listdir(queue.output / "processed")]
+    assert sorted(processed) == sorted(queue.items)
+
+    # 崩溃进程的租约过期后由其他进程接手，作为第 2 次尝试完成
+    attempts = {r["path"]: r["attempt"] for r in records}
+    assert attempts.pop(CRASH_ITEM) == 2
+    assert set(attempts.values()) == {1}
+    assert not list(queue.leases_dir.iterdir())
+
+    exporter = _RecordingExporter()
+    monkeypatch.setattr(ocr_export, "open_exporter", lambda *args, **kwargs: exporter)
+    summary = collect_results(WorkQueue(queue.root))
+    assert exporter.names == queue.items
+    assert summary["ok"] == ITEMS and summary["retried"] == 1
+    assert json.loads((queue.root / "summary.json").read_text(encoding="utf-8"))["done"] == ITEMS
+
+
+def test_expired_lease_gives_up_after_max_attempts(tmp_path):
+    queue = _make_queue(tmp_path, lease_seconds=LEASE_SECONDS, max_attempts=1)
+    lease_file = queue.leases_dir / "000000.lease"
+    lease_file.write_text(json.dumps({"worker": "gone", "token": "x", "attempt": 1}), encoding="utf-8")
+    old = time.time() - LEASE_SECONDS * 10
+    os.utime(lease_file, (old, old))
+
+    lease = queue.claim("w")
+    assert lease is not None and lease.index == 1
+    record = next(WorkQueue(queue.root).results())
+    assert record["index"] == 0 and not record["ok"] and record["attempt"] == 1
+    assert not lease_file.exists()
+
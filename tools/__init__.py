@@ -1,34 +1,72 @@
 # tools/__init__.py
-import os
+import ast
 import importlib
+import importlib.util
+import re
 from pathlib import Path
 
-_REGISTERED_TOOLS = []
+# 工具模块在源码顶层用常量声明元数据，发现阶段只解析源码、不导入模块：
+#   TOOL_NAME = "PDF转JPG"
+#   TOOL_ICON = "picture_as_pdf"   # Flet 图标名
+#   TOOL_REQUIRES = "paddleocr"    # 可选，逗号分隔；缺少这些包时不显示该工具
+#   build_ui = create_xxx_page     # 界面构建函数，用户打开工具时才导入模块
+# 打包为 exe 时需把 tools/*.py 作为数据文件一并打入，供这里扫描。
+_MANIFEST_KEYS = ("TOOL_NAME", "TOOL_ICON")
+# 只匹配行首（模块顶层）的字符串常量赋值，比解析整个模块快得多
+_MANIFEST_RE = re.compile(r"""^(TOOL_NAME|TOOL_ICON|TOOL_REQUIRES)\s*=\s*("[^"\n]*"|'[^'\n]*')""", re.MULTILINE)
+_BUILDER_RE = re.compile(r"^(build_ui\s*=|def build_ui\()", re.MULTILINE)
+
+_REGISTERED_TOOLS = {}  # name -> (name, icon, builder)
+
 
 def register_tool(name, icon, builder):
-    _REGISTERED_TOOLS.append((name, icon, builder))
+    """注册工具；同名重复注册只保留一份（以最后一次为准）"""
+    _REGISTERED_TOOLS[name] = (name, icon, builder)
+
 
 def get_tools():
     if not _REGISTERED_TOOLS:
         _discover_tools()
-    return _REGISTERED_TOOLS
+    return list(_REGISTERED_TOOLS.values())
+
+
+class LazyBuilder:
+    """首次调用时才导入工具模块，再转交给模块里的 build_ui(page)"""
+
+    def __init__(self, module_name):
+        self.module_name = module_name
+
+    def __call__(self, page):
+        module = importlib.import_module(self.module_name)
+        return module.build_ui(page)
+
+
+def read_tool_manifest(file: Path):
+    """从源码顶层读取 TOOL_NAME / TOOL_ICON 常量；不是工具模块时返回 None"""
+    source = file.read_text(encoding="utf-8")
+    meta = {key: ast.literal_eval(value) for key, value in _MANIFEST_RE.findall(source)}
+    if _BUILDER_RE.search(source) and all(k in meta for k in _MANIFEST_KEYS):
+        return meta
+    return None
+
+
+def _missing_requirements(meta) -> list:
+    """TOOL_REQUIRES 中未安装的包（find_spec 只查找、不导入）"""
+    names = [n.strip() for n in meta.get("TOOL_REQUIRES", "").split(",") if n.strip()]
+    return [n for n in names if importlib.util.find_spec(n) is None]
+
 
 def _discover_tools():
-    """自动导入 tools/ 下所有 .py 模块并注册"""
+    """扫描 tools/ 下各模块的元数据常量并注册（不导入模块）"""
     tools_dir = Path(__file__).parent
-    for file in tools_dir.glob("*.py"):
-        if file.name == "__init__.py":
+    for file in sorted(tools_dir.glob("*.py")):
+        if file.name.startswith("_"):
             continue
         module_name = f"tools.{file.stem}"
         try:
-            module = importlib.import_module(module_name)
-            if (hasattr(module, 'TOOL_NAME') and
-                hasattr(module, 'TOOL_ICON') and
-                hasattr(module, 'build_ui')):
-                register_tool(
-                    getattr(module, 'TOOL_NAME'),
-                    getattr(module, 'TOOL_ICON'),
-                    getattr(module, 'build_ui')
-                )
+            meta = read_tool_manifest(file)
         except Exception as e:
-            print(f"⚠️ 无法加载工具 {module_name}: {e}")
\ No newline at end of file
+            print(f"⚠️ 无法加载工具 {module_name}: {e}")
+            continue
+        if meta and not _missing_requirements(meta):
+            register_tool(meta["TOOL_NAME"], meta["TOOL_ICON"], LazyBuilder(module_name))
@@ -0,0 +1,25 @@
+# tools/__main__.py
+"""python -m tools：列出已发现的工具，并测量工具发现耗时及是否误导入了重量级依赖"""
+import json
+import sys
+import time
+
+_HEAVY_MODULES = ("flet", "fitz", "PIL", "docx", "openpyxl", "paddleocr", "numpy")
+
+
+def main() -> int:
+    t0 = time.perf_counter()
+    from tools import get_tools
+
+    tools = get_tools()
+    elapsed = time.perf_counter() - t0
+    print(json.dumps({
+        "tools": [{"name": name, "icon": icon} for name, icon, _ in tools],
+        "discover_ms": round(elapsed * 1000, 2),
+        "heavy_modules_loaded": [m for m in _HEAVY_MODULES if m in sys.modules],
+    }, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+# tools/archive.py
+"""归档输出：一个 PDF 的全部页图像直接写进一个 ZIP/CBZ，而不是成千上万个小文件。
+
+图像已经是压缩格式，条目以 ZIP_STORED 存储，不再重复压缩；归档末尾的 index.json
+记录源文件指纹、渲染参数和每页对应的条目。写入过程中使用 <名称>.part 临时文件，
+全部页写完后才 rename 为正式文件名，因此存在的归档一定是完整的。
+"""
+import json
+import os
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from .manifest import same_source
+
+ARCHIVE_FORMATS = ("zip", "cbz")
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+
+
+class PageArchive:
+    def __init__(self, path: Path, source: dict, settings: dict, page_count: int):
+        self.path = path
+        self.tmp_path = path.with_name(path.name + ".part")
+        self.source = source
+        self.settings = settings
+        self.page_count = page_count
+        self.pages: Dict[int, List[dict]] = {}
+        self._zip = None
+
+    def is_current(self) -> bool:
+        """已有归档的索引与当前源文件、参数一致时为 True（可以跳过）"""
+        try:
+            with zipfile.ZipFile(self.path) as zf:
+                index = json.loads(zf.read(INDEX_NAME).decode("utf-8"))
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return False
+        return (index.get("version") == INDEX_VERSION
+                and index.get("settings") == self.settings
+                and index.get("page_count") == self.page_count
+                and same_source(index.get("source", {}), self.source))
+
+    def open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._zip = zipfile.ZipFile(self.tmp_path, "w", compression=zipfile.ZIP_STORED, allowZip64=True)
+
+    def add(self, page_index: int, files: List[Tuple[str, bytes]]):
+        """写入一页的全部输出；条目立即写到磁盘，不在内存中累积"""
+        entries = []
+        for name, data in files:
+            self._zip.writestr(name, data)
+            entries.append({"name": name, "size": len(data)})
+        self.pages[page_index] = entries
+
+    def close(self):
+        """写入索引并把临时文件换成正式文件"""
+        index = {
+            "version": INDEX_VERSION,
+            "source": self.source,
+            "settings": self.settings,
+            "page_count": self.page_count,
+            "pages": [{"page": i + 1, "files": self.pages[i]} for i in sorted(self.pages)],
+        }
+        self._zip.writestr(INDEX_NAME, json.dumps(index, ensure_ascii=False, indent=1))
+        self._zip.close()
+        self._zip = None
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        """放弃写了一半的归档（出错或取消时），已有的正式文件保持不变"""
+        if self._zip is not None:
+            try:
+                self._zip.close()
+            except Exception:
+                pass
+            self._zip = None
+        self.tmp_path.unlink(missing_ok=True)
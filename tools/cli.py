@@ -0,0 +1,504 @@
+# tools/cli.py
+"""无界面批处理入口：python -m tools.pdf_to_jpg / tools.ocr_to_doc / tools.search_index / tools.work_queue
+
+进度以 JSON Lines 输出到 stdout（每行一个事件），任一文件失败时退出码为 1。
+本模块及其导入的引擎模块都不依赖 Flet。
+"""
+import argparse
+import json
+import sys
+import time
+import traceback
+from pathlib import Path
+from typing import List, Optional
+
+
+def emit(event: str, **fields):
+    """输出一行 JSON 事件并立即 flush，便于上游进程实时读取"""
+    fields = {"event": event, **fields}
+    sys.stdout.write(json.dumps(fields) + "\n")
+    sys.stdout.flush()
+
+
+def _check_paths(parser: argparse.ArgumentParser, args):
+    if not args.input.exists():
+        parser.error(f"输入路径不存在: {args.input}")
+    args.output.mkdir(parents=True, exist_ok=True)
+
+
+def _add_scan_args(parser: argparse.ArgumentParser):
+    group = parser.add_argument_group("目录扫描（边扫描边处理）")
+    group.add_argument("--ordered", action="store_true", help="按路径排序的顺序处理（默认按扫描发现的顺序，开始得更早）")
+    group.add_argument("--include", action="append", metavar="GLOB", help="只处理文件名匹配的文件，可重复")
+    group.add_argument("--exclude", action="append", metavar="GLOB", help="跳过文件名或目录名匹配的项，可重复")
+    group.add_argument("--min-size", type=int, metavar="BYTES", help="跳过小于该大小的文件")
+    group.add_argument("--max-size", type=int, metavar="BYTES", help="跳过大于该大小的文件")
+    group.add_argument("--scan-workers", type=int, help="并行扫描目录的线程数")
+
+
+def _scan_filters(args) -> dict:
+    return {
+        "ordered": args.ordered, "include": args.include, "exclude": args.exclude,
+        "min_size": args.min_size, "max_size": args.max_size, "workers": args.scan_workers,
+    }
+
+
+def _add_watch_args(parser: argparse.ArgumentParser):
+    from tools.watcher import DEFAULT_POLL_INTERVAL, DEFAULT_SETTLE
+
+    group = parser.add_argument_group("监视模式（持续处理新放入的文件，Ctrl+C 停止）")
+    group.add_argument("--watch", action="store_true", help="处理完已有文件后持续监视输入文件夹")
+    group.add_argument("--new-only", action="store_true", help="只处理开始监视之后新增或修改的文件")
+    group.add_argument("--settle", type=float, default=DEFAULT_SETTLE, metavar="SECONDS",
+                       help="文件大小和修改时间保持不变多久才算写完")
+    group.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL, metavar="SECONDS",
+                       help="没有 watchdog（或其不可用）时轮询扫描的间隔")
+
+
+def _watch_batches(args, extensions):
+    """监视模式下逐批产出已写完的文件，Ctrl+C 时结束"""
+    from tools.watcher import FolderWatcher
+
+    watcher = FolderWatcher(
+        args.input, extensions, settle=args.settle, poll_interval=args.poll_interval,
+        include_existing=not args.new_only, **_scan_filters(args),
+    ).start()
+    emit("watch", path=str(args.input), backend=watcher.backend)
+    try:
+        yield from watcher.batches()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+        emit("watch_stopped", files=watcher.emitted)
+
+
+def _check_watch(parser: argparse.ArgumentParser, args):
+    if args.watch and not args.input.is_dir():
+        parser.error("--watch 需要输入路径为文件夹")
+
+
+class _ScanProgress:
+    """目录扫描走完时输出一次 scan_done 事件（此时才知道文件总数）"""
+
+    def __init__(self, scanner, started: float):
+        self.scanner = scanner
+        self.started = started
+        self.reported = False
+
+    def check(self):
+        if self.scanner.done and not self.reported:
+            self.reported = True
+            emit("scan_done", files=self.scanner.found, elapsed=round(time.perf_counter() - self.started, 3))
+
+
+def _start_trace(args):
+    from tools import trace
+
+    return trace.start() if args.trace else None
+
+
+def _finish_trace(tracer, path: Optional[Path]):
+    """停止计时，写出 Chrome trace 并输出按阶段汇总的 trace 事件"""
+    if tracer is None:
+        return
+    from tools import trace
+
+    trace.stop()
+    tracer.write_chrome_trace(path)
+    stages = {k: {"count": n, "seconds": round(sec, 4)} for k, (n, sec) in tracer.stage_totals().items()}
+    emit("trace", path=str(path), stages=stages, counters=tracer.counters)
+
+
+def _add_filter_args(parser: argparse.ArgumentParser, skip_text: str):
+    from tools.pdf_to_jpg import BLANK_PAGE_MODES
+
+    parser.add_argument(
+        "--blank-pages", choices=BLANK_PAGE_MODES, default="keep",
+        help=f"空白页：keep 不检测，flag 照常处理并列入报告，skip {skip_text}并列入报告（需要 numpy）",
+    )
+
+
+def _page_filter_report(page_filter, folder: Path):
+    """输出预筛汇总事件，有记录时同时写出 CSV 报告"""
+    if page_filter is None:
+        return
+    emit("page_filter", pages=page_filter.pages_checked, counts=page_filter.counts(),
+         report=str(page_filter.write_report(folder) or "") or None)
+
+
+def _add_render_args(parser: argparse.ArgumentParser):
+    from tools.archive import ARCHIVE_FORMATS
+    from tools.pdf_to_jpg import DEFAULT_MAX_PIXELS, OVERSIZE_MODES, RenderOptions
+
+    parser.add_argument("--dpi", type=int, default=RenderOptions.dpi)
+    parser.add_argument("--quality", type=int, default=RenderOptions.quality)
+    parser.add_argument("--no-resume", action="store_true", help="忽略清单，全部重新渲染")
+    parser.add_argument("--hash-source", action="store_true", help="用内容哈希判断源文件是否变化")
+    parser.add_argument(
+        "--profile", action="append", default=[], metavar="SPEC",
+        help="附加输出，与原尺寸 JPEG 共用一次渲染，可重复；"
+             "如 name=thumb,size=400,format=webp,mode=L,quality=80（format: jpeg/webp/png/tiff）",
+    )
+    parser.add_argument("--no-default-output", action="store_true", help="不输出原尺寸 JPEG，只输出 --profile")
+    parser.add_argument(
+        "--archive", choices=ARCHIVE_FORMATS,
+        help="每个 PDF 输出为一个 ZIP/CBZ 归档（不再压缩，附页索引），而不是每页一个文件",
+    )
+    parser.add_argument(
+        "--max-megapixels", type=float, default=DEFAULT_MAX_PIXELS / 1_000_000, metavar="MP",
+        help="单页像素上限（百万像素），约束每个进程的内存峰值；0 为不限制",
+    )
+    parser.add_argument(
+        "--oversize", choices=OVERSIZE_MODES, default="downscale",
+        help="超出像素上限的页：downscale 降低分辨率，tile 按原分辨率切块输出",
+    )
+    _add_filter_args(parser, "不输出")
+    parser.add_argument("--dedupe", action="store_true", help="与前面近似重复的页直接复用其编码结果（需要 numpy）")
+
+
+def _render_options(parser: argparse.ArgumentParser, args):
+    from tools.pdf_to_jpg import DEFAULT_PROFILE, OutputProfile, RenderOptions
+
+    try:
+        profiles = tuple(OutputProfile.parse(spec) for spec in args.profile)
+        if not args.no_default_output:
+            profiles = (DEFAULT_PROFILE,) + profiles
+        elif not profiles:
+            parser.error("--no-default-output 需要至少一个 --profile")
+        options = RenderOptions(
+            dpi=args.dpi, quality=args.quality, resume=not args.no_resume, hash_source=args.hash_source,
+            profiles=profiles, archive=args.archive,
+            max_pixels=round(args.max_megapixels * 1_000_000) or None, oversize=args.oversize,
+            blank_pages=args.blank_pages, dedupe=args.dedupe,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    return options
+
+
+def pdf_to_jpg_main(argv: Optional[List[str]] = None) -> int:
+    from tools.pdf_to_jpg import PDF_EXTENSIONS, convert_pdfs_parallel, convert_single_pdf, output_dir_for, scan_pdfs
+
+    parser = argparse.ArgumentParser(prog="python -m tools.pdf_to_jpg", description="PDF 批量转 JPG")
+    parser.add_argument("input", type=Path, help="PDF 文件或包含 PDF 的文件夹")
+    parser.add_argument("output", type=Path, help="输出目录")
+    parser.add_argument("--workers", type=int, default=1, help="并行进程数，大于 1 时按页分片并行渲染")
+    _add_render_args(parser)
+    parser.add_argument("--trace", type=Path, metavar="FILE", help="记录各阶段耗时并写出 Chrome trace JSON")
+    _add_scan_args(parser)
+    _add_watch_args(parser)
+    args = parser.parse_args(argv)
+    _check_paths(parser, args)
+    _check_watch(parser, args)
+
+    options = _render_options(parser, args)
+    try:
+        page_filter = options.page_filter()
+    except ImportError:
+        parser.error("--blank-pages / --dedupe 需要安装 numpy")
+    # 边扫描边转换：文件总数在扫描结束时以 scan_done 事件给出
+    scanner = scan_pdfs(args.input, **_scan_filters(args))
+    emit("start", tool="pdf_to_jpg", files=None)
+
+    started = time.perf_counter()
+    scan_progress = _ScanProgress(scanner, started)
+    processed = failed = 0
+    tracer = _start_trace(args)
+    # 监视模式下每批已写完的新文件各跑一遍；否则整个扫描结果就是一批
+    batches = _watch_batches(args, PDF_EXTENSIONS) if args.watch else [scanner]
+    try:
+        for batch in batches:
+            if args.workers > 1:
+                # 多进程模式下各文件的分片交错执行，seconds 为从打开该文件到最后一个分片完成的时间
+                jobs = ((pdf, output_dir_for(pdf, args.input, args.output)) for pdf in batch)
+                for pdf, ok, msg, seconds in convert_pdfs_parallel(
+                    jobs, workers=args.workers, options=options, page_filter=page_filter,
+                ):
+                    processed += 1
+                    failed += not ok
+                    emit("file", file=str(pdf), ok=ok, message=msg, seconds=round(seconds, 3),
+                         elapsed=round(time.perf_counter() - started, 3))
+                    scan_progress.check()
+            else:
+                for pdf in batch:
+                    t0 = time.perf_counter()
+                    ok, msg = convert_single_pdf(
+                        pdf, output_dir_for(pdf, args.input, args.output), options=options, page_filter=page_filter,
+                    )
+                    processed += 1
+                    failed += not ok
+                    emit("file", file=str(pdf), ok=ok, message=msg, seconds=round(time.perf_counter() - t0, 3),
+                         elapsed=round(time.perf_counter() - started, 3))
+                    scan_progress.check()
+    except KeyboardInterrupt:
+        # 监视模式以 Ctrl+C 结束，仍然输出汇总
+        if not args.watch:
+            raise
+    scan_progress.check()
+    _finish_trace(tracer, args.trace)
+    _page_filter_report(page_filter, args.output)
+
+    emit("summary", files=processed, ok=processed - failed, failed=failed,
+         seconds=round(time.perf_counter() - started, 3))
+    return 1 if failed else 0
+
+
+def ocr_main(argv: Optional[List[str]] = None) -> int:
+    from tools.ocr_cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_BYTES, OcrCache
+    from tools.ocr_export import open_exporter, unique_export_name
+    from tools.ocr_pool import OcrEnginePool
+    from tools.ocr_to_doc import IMAGE_OR_PDF_EXTENSIONS, ocr_files_pipelined, scan_images_or_pdfs
+    from tools.search_index import DEFAULT_INDEX_PATH, SearchIndex
+
+    parser = argparse.ArgumentParser(prog="python -m tools.ocr_to_doc", description="图片/PDF 批量 OCR")
+    parser.add_argument("input", type=Path, help="图片/PDF 文件或文件夹")
+    parser.add_argument("output", type=Path, help="输出目录")
+    parser.add_argument("--format", choices=["word", "excel"], default="word")
+    parser.add_argument("--batch-size", type=int, default=8, help="识别端每批页数")
+    parser.add_argument("--producers", type=int, default=2, help="读取/栅格化线程数")
+    parser.add_argument("--no-cache", action="store_true", help="不使用识别结果缓存")
+    parser.add_argument("--ocr-all", action="store_true", help="PDF 有文字层的页也做 OCR")
+    parser.add_argument("--cache-path", type=Path, default=DEFAULT_CACHE_PATH)
+    parser.add_argument("--cache-size-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024))
+    parser.add_argument("--ocr-workers", type=int, default=0, help="常驻识别进程数，0 为在当前进程识别")
+    parser.add_argument("--ocr-threads", type=int, default=None, help="每个识别进程的推理线程数")
+    parser.add_argument("--files-per-part", type=int, default=1000, help="导出文件每卷最多包含的文件数")
+    parser.add_argument("--trace", type=Path, metavar="FILE", help="记录各阶段耗时并写出 Chrome trace JSON")
+    parser.add_argument("--no-index", action="store_true", help="不写入全文检索索引")
+    parser.add_argument("--index-path", type=Path, default=DEFAULT_INDEX_PATH)
+    _add_filter_args(parser, "不识别")
+    parser.add_argument("--dedupe", action="store_true", help="与前面近似重复的页直接复用其识别结果（需要 numpy）")
+    _add_scan_args(parser)
+    _add_watch_args(parser)
+    args = parser.parse_args(argv)
+    _check_paths(parser, args)
+    _check_watch(parser, args)
+    page_filter = None
+    if args.blank_pages != "keep" or args.dedupe:
+        try:
+            from tools.page_filter import PageFilter
+        except ImportError:
+            parser.error("--blank-pages / --dedupe 需要安装 numpy")
+        page_filter = PageFilter(blank=args.blank_pages, dedupe=args.dedupe)
+    cache = None if args.no_cache else OcrCache(args.cache_path, args.cache_size_mb * 1024 * 1024)
+    index = None if args.no_index else SearchIndex(args.index_path)
+
+    # 边扫描边识别：文件总数在扫描结束时以 scan_done 事件给出
+    scanner = scan_images_or_pdfs(args.input, **_scan_filters(args))
+    emit("start", tool="ocr_to_doc", files=None)
+
+    started = time.perf_counter()
+    scan_progress = _ScanProgress(scanner, started)
+    pool = None
+    if args.ocr_workers > 0:
+        pool = OcrEnginePool(args.ocr_workers, args.ocr_threads)
+        pool.warm_up()
+        emit("pool_ready", workers=args.ocr_workers, seconds=round(time.perf_counter() - started, 3))
+    processed = failed = 0
+    tracer = _start_trace(args)
+
+    def export(files, name: str = "OCR结果") -> List[Path]:
+        """识别 files 并写入一份导出文档（及分卷），返回输出文件"""
+        nonlocal processed, failed
+        # 每个文件识别完立即写入导出文件（超过阈值自动分卷），中途退出时已完成部分仍可用
+        exporter = open_exporter(args.output, args.format, max_files=args.files_per_part, name=name)
+        error = None
+        try:
+            # 流水线中各文件的读取与识别交错进行，只能给出完成时刻
+            for r in ocr_files_pipelined(
+                files, batch_size=max(args.batch_size, args.ocr_workers * 2), producers=args.producers,
+                cache=cache, use_text_layer=not args.ocr_all, recognize=pool.recognize if pool else None,
+                page_filter=page_filter,
+            ):
+                processed += 1
+                scan_progress.check()
+                elapsed = round(time.perf_counter() - started, 3)
+                if r.error:
+                    failed += 1
+                    emit("file", file=str(r.path), ok=False, error=r.error, elapsed=elapsed)
+                    continue
+                exporter.add(r.path.name, r.text)
+                if index:
+                    index.add(r)
+                emit("file", file=str(r.path), ok=True, chars=len(r.text), pages=r.source_counts(), elapsed=elapsed)
+            scan_progress.check()
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            # 出错或 Ctrl+C 时也保存已写入的部分，事件中列出的是实际保存的文件
+            out_files = exporter.close()
+            if error is not None:
+                emit("export", ok=False, error=str(error), files=[str(p) for p in out_files])
+        return out_files
+
+    try:
+        if args.watch:
+            # 每批已写完的新文件识别后立即保存为一份带时间的结果文档
+            for batch in _watch_batches(args, IMAGE_OR_PDF_EXTENSIONS):
+                out_files = export(batch, unique_export_name(args.output))
+                emit("export", ok=True, files=[str(p) for p in out_files])
+        else:
+            out_files = export(scanner)
+    except KeyboardInterrupt:
+        # 监视模式以 Ctrl+C 结束，仍然输出汇总
+        if not args.watch:
+            raise
+    except Exception as e:
+        # 导出失败、监视无法启动等：单个文件之外的错误也以事件给出
+        emit("error", ok=False, error=f"{type(e).__name__}: {e}", traceback=traceback.format_exc())
+        return 1
+    finally:
+        if pool:
+            pool.shutdown()
+        if index:
+            index.close()
+        _finish_trace(tracer, args.trace)
+        _page_filter_report(page_filter, args.output)
+    if not args.watch:
+        emit("export", ok=True, files=[str(p) for p in out_files])
+    emit("summary", files=processed, ok=processed - failed, failed=failed,
+         seconds=round(time.perf_counter() - started, 3), cache=cache.stats() if cache else None)
+    return 1 if failed else 0
+
+
+def search_main(argv: Optional[List[str]] = None) -> int:
+    from tools.search_index import DEFAULT_INDEX_PATH, SearchIndex
+
+    parser = argparse.ArgumentParser(prog="python -m tools.search_index", description="在 OCR 结果中全文查找")
+    parser.add_argument("query", help="查找的文字，空格分隔的多个词须同时出现在一行中；只有单个字的查询需逐行比较，索引大时较慢")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--offset", type=int, default=0)
+    parser.add_argument("--path", metavar="PREFIX", help="只查找该路径（文件或文件夹）下的文件")
+    parser.add_argument("--index-path", type=Path, default=DEFAULT_INDEX_PATH)
+    args = parser.parse_args(argv)
+    if not args.index_path.exists():
+        parser.error(f"索引不存在: {args.index_path}（先运行 OCR 识别）")
+
+    index = SearchIndex(args.index_path)
+    try:
+        started = time.perf_counter()
+        hits = index.search(args.query, limit=args.limit, offset=args.offset, path_prefix=args.path)
+        ms = round((time.perf_counter() - started) * 1000, 2)
+        for hit in hits:
+            emit("hit", path=hit.path, page=hit.page, line=hit.line, text=hit.text, snippet=hit.snippet,
+                 source=hit.source, box=hit.box, score=hit.score)
+        emit("summary", hits=len(hits), ms=ms, **index.stats())
+    finally:
+        index.close()
+    return 0
+
+
+def queue_main(argv: Optional[List[str]] = None) -> int:
+    from tools.work_queue import (
+        DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS, DEFAULT_POLL_INTERVAL, WorkQueue, collect_results, default_worker_id,
+        render_settings, run_worker,
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="python -m tools.work_queue",
+        description="共享目录任务队列：在多台机器上各运行 work，合力处理同一批文件",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    init = commands.add_parser("init", help="扫描输入目录，在共享目录中新建队列")
+    tools = init.add_subparsers(dest="tool", required=True)
+    for tool, help_text in (("pdf_to_jpg", "PDF 批量转 JPG"), ("ocr_to_doc", "图片/PDF 批量 OCR")):
+        sub = tools.add_parser(tool, help=help_text)
+        sub.add_argument("queue", type=Path, help="队列目录（各机器都能访问的共享目录）")
+        sub.add_argument("input", type=Path, help="输入文件或文件夹（应位于共享目录）")
+        sub.add_argument("output", type=Path, help="输出目录（应位于共享目录）")
+        sub.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS, metavar="SECONDS",
+                         help="租约时长：持有者这么久没有刷新即视为已崩溃，文件交给其他进程重试")
+        sub.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                         help="租约过期后最多重试的次数（含第一次）")
+        if tool == "pdf_to_jpg":
+            _add_render_args(sub)
+        else:
+            sub.add_argument("--format", choices=["word", "excel"], default="word")
+            sub.add_argument("--no-cache", action="store_true", help="不使用识别结果缓存（各机器的本地缓存）")
+            sub.add_argument("--ocr-all", action="store_true", help="PDF 有文字层的页也做 OCR")
+            sub.add_argument("--files-per-part", type=int, default=1000, help="汇总导出文件每卷最多包含的文件数")
+            sub.add_argument("--no-index", action="store_true", help="不写入全文检索索引（各机器的本地索引）")
+            _add_filter_args(sub, "不识别")
+            sub.add_argument("--dedupe", action="store_true", help="与前面近似重复的页直接复用其识别结果（需要 numpy）")
+        _add_scan_args(sub)
+
+    work = commands.add_parser("work", help="领取并处理文件，直到队列全部完成")
+    work.add_argument("queue", type=Path)
+    work.add_argument("--worker", default=None, help=f"本进程的名称，默认为 主机名-进程号（{default_worker_id()}）")
+    work.add_argument("--no-wait", action="store_true", help="没有可领取的文件时立即结束，不等待其他进程")
+    work.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL, metavar="SECONDS")
+    work.add_argument("--input", type=Path, help="本机上输入目录的路径（共享目录挂载位置与创建队列的机器不同时）")
+    work.add_argument("--output", type=Path, help="本机上输出目录的路径")
+
+    status = commands.add_parser("status", help="输出队列进度")
+    status.add_argument("queue", type=Path)
+
+    collect = commands.add_parser("collect", help="汇总结果（OCR 队列在此导出文档）")
+    collect.add_argument("queue", type=Path)
+    collect.add_argument("--output", type=Path, help="本机上输出目录的路径")
+    collect.add_argument("--partial", action="store_true", help="队列未全部完成时也汇总已完成的部分")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "init":
+        if not args.input.exists():
+            parser.error(f"输入路径不存在: {args.input}")
+        if args.tool == "pdf_to_jpg":
+            from tools.pdf_to_jpg import scan_pdfs as scan
+            settings = render_settings(_render_options(parser, args))
+        else:
+            from tools.ocr_to_doc import scan_images_or_pdfs as scan
+            settings = {"format": args.format, "cache": not args.no_cache, "use_text_layer": not args.ocr_all,
+                        "files_per_part": args.files_per_part, "index": not args.no_index,
+                        "blank_pages": args.blank_pages, "dedupe": args.dedupe}
+        root = args.input if args.input.is_dir() else args.input.parent
+        # 队列中的文件顺序固定，各机器看到的编号一致
+        items = scan(args.input, **{**_scan_filters(args), "ordered": True})
+        try:
+            queue = WorkQueue.create(args.queue, args.tool, root, args.output, items, settings,
+                                     lease_seconds=args.lease, max_attempts=args.max_attempts)
+        except (FileExistsError, ValueError) as e:
+            parser.error(str(e))
+        emit("queue_created", queue=str(queue.root), tool=queue.tool, items=len(queue.items))
+        return 0
+
+    try:
+        queue = WorkQueue(args.queue)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    if args.command == "status":
+        emit("status", **queue.status())
+        return 0
+
+    if args.command == "collect":
+        if not args.partial and not queue.finished():
+            emit("status", **queue.status())
+            parser.error("队列尚未全部完成（可加 --partial 汇总已完成的部分）")
+        summary = collect_results(queue, args.output)
+        emit("summary", **summary)
+        return 1 if summary["failed"] else 0
+
+    if args.input:
+        queue.input = args.input
+    if args.output:
+        queue.output = args.output
+    worker = args.worker or default_worker_id()
+    emit("start", tool=queue.tool, queue=str(queue.root), worker=worker, files=len(queue.items))
+    started = time.perf_counter()
+    processed = failed = 0
+    try:
+        for record in run_worker(queue, worker, wait=not args.no_wait, poll_interval=args.poll_interval):
+            processed += 1
+            failed += not record["ok"]
+            emit("file", file=record["path"], ok=record["ok"], message=record.get("message"), attempt=record["attempt"],
+                 seconds=record["seconds"], elapsed=round(time.perf_counter() - started, 3))
+    except KeyboardInterrupt:
+        # 正在处理的文件已释放租约，其他进程可以接手
+        pass
+    emit("summary", worker=worker, files=processed, ok=processed - failed, failed=failed,
+         seconds=round(time.perf_counter() - started, 3), queue=queue.status())
+    return 1 if failed else 0
@@ -0,0 +1,218 @@
+# tools/jobs.py
+"""后台作业：各工具把耗时的转换/识别提交到这里执行，界面线程只负责提交和展示进度。
+
+作业在工作线程中排队执行；工作函数在页与页之间调用 job.report()/job.checkpoint()，
+以便汇报进度并响应暂停、取消。进度事件按时间节流后回调给界面。
+"""
+import itertools
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+PAUSED = "paused"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+FINISHED_STATES = (DONE, CANCELLED, FAILED)
+
+
+class JobCancelled(Exception):
+    """作业已被取消；由 checkpoint() 抛出，工作函数不应吞掉它"""
+
+
+@dataclass
+class JobProgress:
+    """一次进度事件；messages 为上次事件以来累积的日志行（节流时不会丢失）"""
+    job_id: int
+    name: str
+    state: str
+    files_done: int = 0
+    files_total: Optional[int] = None
+    pages_done: int = 0
+    pages_per_sec: float = 0.0
+    eta: Optional[float] = None  # 预计剩余秒数，未知时为 None
+    messages: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+
+class Job:
+    def __init__(self, job_id: int, name: str, work: Callable[["Job"], None],
+                 on_event: Optional[Callable[[JobProgress], None]] = None,
+                 files_total: Optional[int] = None, throttle: float = 0.25):
+        self.id = job_id
+        self.name = name
+        self.state = QUEUED
+        self.files_total = files_total
+        self.files_done = 0
+        self.pages_done = 0
+        self.error: Optional[str] = None
+        self._work = work
+        self._on_event = on_event
+        self._throttle = throttle
+        self._cancel = threading.Event()
+        self._resume = threading.Event()
+        self._resume.set()
+        self._lock = threading.Lock()
+        self._messages: List[str] = []
+        self._last_emit = 0.0
+        self._started: Optional[float] = None
+        self._paused_total = 0.0
+
+    # --- 控制（可从任意线程调用） ---
+    def cancel(self):
+        self._cancel.set()
+        self._resume.set()  # 唤醒暂停中的作业，使其尽快退出
+
+    def pause(self):
+        if self.state in (QUEUED, RUNNING):
+            self._resume.clear()
+
+    def resume(self):
+        self._resume.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._resume.is_set()
+
+    # --- 工作函数内调用 ---
+    def checkpoint(self):
+        """页与页之间调用：已取消则抛出 JobCancelled，已暂停则阻塞到继续或取消"""
+        if self._cancel.is_set():
+            raise JobCancelled()
+        if not self._resume.is_set():
+            paused_at = time.monotonic()
+            self.state = PAUSED
+            self._emit(force=True)
+            self._resume.wait()
+            self._paused_total += time.monotonic() - paused_at
+            if self._cancel.is_set():
+                raise JobCancelled()
+            self.state = RUNNING
+            self._emit(force=True)
+
+    def report(self, pages: int = 0, files: int = 0, message: Optional[str] = None):
+        """累加进度并在节流间隔到达时发出事件，随后执行一次 checkpoint()"""
+        with self._lock:
+            self.pages_done += pages
+            self.files_done += files
+            if message is not None:
+                self._messages.append(message)
+        self._emit()
+        self.checkpoint()
+
+    # --- 内部 ---
+    def _snapshot(self) -> JobProgress:
+        with self._lock:
+            messages, self._messages = self._messages, []
+            pages_done, files_done = self.pages_done, self.files_done
+        rate, eta = 0.0, None
+        if self._started is not None:
+            active = time.monotonic() - self._started - self._paused_total
+            if active > 0:
+                rate = pages_done / active
+                if self.files_total and files_done:
+                    eta = active / files_done * max(self.files_total - files_done, 0)
+        return JobProgress(
+            job_id=self.id, name=self.name, state=self.state,
+            files_done=files_done, files_total=self.files_total, pages_done=pages_done,
+            pages_per_sec=rate, eta=eta, messages=messages, error=self.error,
+        )
+
+    def _emit(self, force: bool = False):
+        if self._on_event is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_emit < self._throttle:
+            return
+        self._last_emit = now
+        try:
+            self._on_event(self._snapshot())
+        except Exception as e:
+            # 界面回调出错不应中断作业本身
+            print(f"⚠️ 作业 {self.name} 进度回调失败: {e}")
+
+    def _run(self):
+        if self._cancel.is_set():
+            self.state = CANCELLED
+            self._emit(force=True)
+            return
+        self.state = RUNNING
+        self._started = time.monotonic()
+        self._emit(force=True)
+        try:
+            self._work(self)
+            self.state = DONE
+        except JobCancelled:
+            self.state = CANCELLED
+        except Exception as e:
+            self.state = FAILED
+            self.error = str(e)
+        finally:
+            self._emit(force=True)
+
+
+class JobRunner:
+    """作业队列：workers 个后台线程按提交顺序取出作业执行"""
+
+    def __init__(self, workers: int = 1):
+        self._queue: "queue.Queue[Job]" = queue.Queue()
+        self._ids = itertools.count(1)
+        self._threads = [
+            threading.Thread(target=self._loop, name=f"job-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, name: str, work: Callable[[Job], None],
+               on_event: Optional[Callable[[JobProgress], None]] = None,
+               files_total: Optional[int] = None) -> Job:
+        """提交作业并立即返回；work(job) 在后台线程执行"""
+        job = Job(next(self._ids), name, work, on_event, files_total)
+        job._emit(force=True)
+        self._queue.put(job)
+        return job
+
+    def _loop(self):
+        while True:
+            job = self._queue.get()
+            try:
+                job._run()
+            finally:
+                self._queue.task_done()
+
+
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """所有工具共用的作业队列（单个工作线程，作业依次执行）"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
+
+
+def format_progress(event: JobProgress) -> str:
+    """进度事件的一行文字描述，供状态栏显示"""
+    total = f"/{event.files_total}" if event.files_total is not None else ""
+    text = f"{event.files_done}{total} 个文件 · {event.pages_done} 页 · {event.pages_per_sec:.1f} 页/秒"
+    if event.eta is not None and not event.finished:
+        minutes, seconds = divmod(int(event.eta), 60)
+        text += f" · 剩余约 {minutes}:{seconds:02d}"
+    label = {QUEUED: "排队中", PAUSED: "已暂停", CANCELLED: "已取消", FAILED: "失败"}.get(event.state)
+    return f"[{label}] {text}" if label else text
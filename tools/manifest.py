@@ -0,0 +1,104 @@
+# tools/manifest.py
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+MANIFEST_NAME = ".manifest.json"
+MANIFEST_VERSION = 1
+
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """先写临时文件再 rename，崩溃时不会留下写了一半的目标文件"""
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def source_fingerprint(path: Path, content_hash: bool = False) -> dict:
+    """源文件指纹：大小 + 修改时间，可选附带内容 SHA-256"""
+    st = path.stat()
+    info = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if content_hash:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        info["sha256"] = h.hexdigest()
+    return info
+
+
+def same_source(old: dict, new: dict) -> bool:
+    """两份源文件指纹是否指向同一内容"""
+    if old.get("size") != new.get("size"):
+        return False
+    # 两边都有内容哈希时以哈希为准（复制/同步后 mtime 会变，但内容没变）
+    if "sha256" in old and "sha256" in new:
+        return old["sha256"] == new["sha256"]
+    return old.get("mtime_ns") == new.get("mtime_ns")
+
+
+class OutputManifest:
+    """单个输出目录的转换清单：源文件指纹、渲染参数以及每页已完成的输出文件。
+
+    指纹或参数任一变化即视为整份清单作废；页记录只在对应文件确实写完之后添加，
+    因此按清单跳过的页一定是完整的。
+    """
+
+    def __init__(self, folder: Path, source: dict, settings: dict, page_count: int):
+        self.path = folder / MANIFEST_NAME
+        self.folder = folder
+        self.source = source
+        self.settings = settings
+        self.page_count = page_count
+        self.pages: Dict[int, List[str]] = {}
+
+    @classmethod
+    def load(cls, folder: Path, source: dict, settings: dict, page_count: int) -> "OutputManifest":
+        """读取已有清单；与当前源文件或参数不一致时返回空清单"""
+        manifest = cls(folder, source, settings, page_count)
+        try:
+            data = json.loads(manifest.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return manifest
+        if (data.get("version") == MANIFEST_VERSION
+                and data.get("settings") == settings
+                and data.get("page_count") == page_count
+                and same_source(data.get("source", {}), source)):
+            manifest.pages = {int(k): v for k, v in data.get("pages", {}).items()}
+        return manifest
+
+    def is_done(self, page_index: int) -> bool:
+        files = self.pages.get(page_index)
+        # 空列表表示该页没有输出（如跳过的空白页），同样算已完成
+        return files is not None and all((self.folder / name).exists() for name in files)
+
+    def pending(self) -> List[int]:
+        """尚未完成（或输出文件已丢失）的页码，从 0 开始"""
+        return [i for i in range(self.page_count) if not self.is_done(i)]
+
+    def mark_done(self, page_index: int, files: Iterable[str]):
+        self.pages[page_index] = list(files)
+
+    def save(self):
+        data = {
+            "version": MANIFEST_VERSION,
+            "source": self.source,
+            "settings": self.settings,
+            "page_count": self.page_count,
+            "pages": {str(k): v for k, v in sorted(self.pages.items())},
+        }
+        atomic_write_bytes(self.path, json.dumps(data, ensure_ascii=False, indent=1).encode("utf-8"))
+
+
+def load_manifest(
+    pdf_path: Path, folder: Path, settings: dict, page_count: int, content_hash: bool = False
+) -> OutputManifest:
+    """按源文件当前指纹加载清单"""
+    return OutputManifest.load(folder, source_fingerprint(pdf_path, content_hash), settings, page_count)
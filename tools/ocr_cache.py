@@ -0,0 +1,124 @@
+# tools/ocr_cache.py
+"""OCR 结果缓存：按页面像素内容 + 引擎/参数签名寻址，存放在应用目录下的 SQLite 中。
+
+同一页面（重跑、文件夹重叠、不同版次中的相同页）再次识别时直接返回缓存结果；
+总大小超过上限时按最近访问时间淘汰。
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent / "ocr_cache.sqlite"
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB
+
+
+def page_key(img, signature: str) -> str:
+    """页面缓存键：引擎签名 + 图像模式/尺寸 + 像素内容的 SHA-256"""
+    h = hashlib.sha256()
+    h.update(signature.encode("utf-8"))
+    h.update(f"|{img.mode}|{img.size[0]}x{img.size[1]}|".encode("ascii"))
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+def normalize_result(ocr_result) -> list:
+    """把 PaddleOCR 单页结果转成纯 Python 类型（numpy 数值无法直接 JSON 序列化）"""
+    if not ocr_result or not ocr_result[0]:
+        return [None]
+    lines = []
+    for box, (text, score) in ocr_result[0]:
+        lines.append([[[float(x), float(y)] for x, y in box], [str(text), float(score)]])
+    return [lines]
+
+
+class OcrCache:
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ocr_cache_lru ON ocr_cache(last_access)")
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[list]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM ocr_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE ocr_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key: str, ocr_result):
+        """写入缓存；写入失败只打印警告，不影响本次识别结果"""
+        try:
+            value = json.dumps(normalize_result(ocr_result), ensure_ascii=False)
+            self._put(key, value)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"⚠️ OCR 缓存写入失败: {e}")
+
+    def _put(self, key: str, value: str):
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM ocr_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_cache (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()),
+            )
+            self._size += size - (old[0] if old else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # 淘汰到上限的 90%，避免每次写入都触发淘汰
+        target = int(self.max_bytes * 0.9)
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM ocr_cache ORDER BY last_access"):
+            if self._size <= target:
+                break
+            doomed.append((key,))
+            self._size -= size
+        self._conn.executemany("DELETE FROM ocr_cache WHERE key = ?", doomed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM ocr_cache").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": entries,
+                "bytes": self._size,
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[OcrCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_ocr_cache() -> OcrCache:
+    """应用目录下的共享缓存（与 paddleocr_models 同级）"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = OcrCache()
+        return _cache
@@ -0,0 +1,175 @@
+# tools/ocr_export.py
+"""流式导出 OCR 结果：每识别完一个文件就写入，超过阈值自动分卷。
+
+内存中最多只保留当前一卷；已写满的卷立即落盘，批处理中途崩溃时它们仍然完整可用。
+Word 卷在写入过程中定期保存检查点；Excel 使用 openpyxl 的 write-only 模式，
+行数据直接流向临时文件，但当前卷只有在关闭时才成为有效的 .xlsx。
+"""
+import os
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from . import trace
+
+# Excel 单元格上限 32767 字符，留出余量
+EXCEL_CELL_LIMIT = 32000
+
+
+def _atomic_save(obj, path: Path):
+    """docx/openpyxl 对象的原子保存：写临时文件后 rename"""
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        obj.save(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+class RolloverExporter:
+    """分卷导出的公共逻辑。
+
+    第一卷使用 output_path 本身，之后依次为 <stem>_002<suffix>、<stem>_003<suffix>…；
+    max_files / max_chars 任一达到即关闭当前卷（为 None 时不分卷）。
+    """
+
+    def __init__(self, output_path: Path, max_files: Optional[int] = None, max_chars: Optional[int] = None):
+        self.output_path = output_path
+        self.max_files = max_files
+        self.max_chars = max_chars
+        self.paths: List[Path] = []
+        self.files_written = 0
+        self._part_files = 0
+        self._part_chars = 0
+        self._open = False
+
+    def _part_path(self, part: int) -> Path:
+        if part == 1:
+            return self.output_path
+        return self.output_path.with_name(f"{self.output_path.stem}_{part:03d}{self.output_path.suffix}")
+
+    def add(self, filename: str, content: str):
+        if not self._open:
+            self.paths.append(self._part_path(len(self.paths) + 1))
+            self._open_part(len(self.paths))
+            self._open = True
+        with trace.span("export.write", file=filename):
+            self._write(filename, content)
+        self.files_written += 1
+        self._part_files += 1
+        self._part_chars += len(content)
+        if ((self.max_files and self._part_files >= self.max_files)
+                or (self.max_chars and self._part_chars >= self.max_chars)):
+            self._close_current()
+        else:
+            self._after_write()
+
+    def close(self) -> List[Path]:
+        """关闭当前卷并返回全部输出文件；一个文件都没有时也写出一份只有表头的空卷"""
+        if not self.paths:
+            self.paths.append(self.output_path)
+            self._open_part(1)
+            self._open = True
+        if self._open:
+            self._close_current()
+        return self.paths
+
+    def _close_current(self):
+        with trace.span("export.save", part=self.paths[-1].name):
+            self._save_part(self.paths[-1])
+        self._open = False
+        self._part_files = 0
+        self._part_chars = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # 子类实现
+    def _open_part(self, part: int):
+        raise NotImplementedError
+
+    def _write(self, filename: str, content: str):
+        raise NotImplementedError
+
+    def _save_part(self, path: Path):
+        raise NotImplementedError
+
+    def _after_write(self):
+        pass
+
+
+class WordExporter(RolloverExporter):
+    """每个文件一节（标题 + 正文 + 分页符）；每 checkpoint_every 个文件保存一次当前卷"""
+
+    def __init__(self, output_path: Path, max_files: Optional[int] = None, max_chars: Optional[int] = None,
+                 checkpoint_every: Optional[int] = None):
+        super().__init__(output_path, max_files, max_chars)
+        self.checkpoint_every = checkpoint_every
+        self._doc = None
+
+    def _open_part(self, part: int):
+        from docx import Document
+
+        self._doc = Document()
+        title = "OCR 识别结果" if part == 1 else f"OCR 识别结果（第 {part} 部分）"
+        self._doc.add_heading(title, 0)
+
+    def _write(self, filename: str, content: str):
+        self._doc.add_heading(f"📄 {filename}", level=1)
+        self._doc.add_paragraph(content)
+        self._doc.add_page_break()
+
+    def _after_write(self):
+        if self.checkpoint_every and self._part_files % self.checkpoint_every == 0:
+            with trace.span("export.checkpoint", part=self.paths[-1].name):
+                _atomic_save(self._doc, self.paths[-1])
+
+    def _save_part(self, path: Path):
+        _atomic_save(self._doc, path)
+        self._doc = None
+
+
+class ExcelExporter(RolloverExporter):
+    """每行一个文件，A列文件名，B列内容；write-only 工作簿，行写入后不再驻留内存"""
+
+    def __init__(self, output_path: Path, max_files: Optional[int] = None, max_chars: Optional[int] = None):
+        super().__init__(output_path, max_files, max_chars)
+        self._wb = None
+        self._ws = None
+
+    def _open_part(self, part: int):
+        from openpyxl import Workbook
+
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet("OCR Results")
+        self._ws.append(["文件名", "识别内容"])
+
+    def _write(self, filename: str, content: str):
+        # Excel 单元格有字符限制（32767），长文本截断
+        self._ws.append([filename, content[:EXCEL_CELL_LIMIT]])
+
+    def _save_part(self, path: Path):
+        _atomic_save(self._wb, path)
+        self._wb = self._ws = None
+
+
+def unique_export_name(output_dir: Path, prefix: str = "OCR结果") -> str:
+    """带时间的导出文件名（不含扩展名），不与已有的结果文档重名；监视模式下每批输出一份"""
+    name = candidate = time.strftime(f"{prefix}_%Y%m%d_%H%M%S")
+    n = 1
+    while any((output_dir / f"{candidate}{ext}").exists() for ext in (".docx", ".xlsx")):
+        n += 1
+        candidate = f"{name}-{n}"
+    return candidate
+
+
+def open_exporter(output_dir: Path, fmt: str = "word", max_files: Optional[int] = 1000,
+                  max_chars: Optional[int] = 20_000_000, name: str = "OCR结果") -> RolloverExporter:
+    """批处理用的流式导出器：输出到 output_dir 下的 <name>.docx / <name>.xlsx（及分卷）"""
+    if fmt == "word":
+        return WordExporter(output_dir / f"{name}.docx", max_files, max_chars, checkpoint_every=50)
+    return ExcelExporter(output_dir / f"{name}.xlsx", max_files, max_chars)
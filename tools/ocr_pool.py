@@ -0,0 +1,111 @@
+# tools/ocr_pool.py
+"""多进程 OCR 引擎池：每个工作进程只加载一次模型并用空白图预热，之后只处理识别请求。
+
+识别请求按图像分发到各进程，吞吐随核心数扩展，也不再占用界面进程的 GIL。
+环境变量（应用启动时读取）：
+    NEWSTOOLS_OCR_WORKERS  引擎进程数，默认 0（不使用进程池，在当前进程识别）
+    NEWSTOOLS_OCR_THREADS  每个进程的推理线程数，默认由 PaddleOCR 决定
+    NEWSTOOLS_OCR_WARMUP   为 1 时应用启动后立即在后台拉起进程池并预热
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import List, Optional
+
+_worker_engine = None
+
+
+def _init_worker(threads: Optional[int], warmup: bool):
+    """工作进程初始化：限制推理线程数、加载模型、可选预热"""
+    global _worker_engine
+    if threads:
+        # 必须在导入 paddle 之前设置，否则底层数学库已按全部核心初始化
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+            os.environ[var] = str(threads)
+    from tools.ocr_to_doc import get_ocr_engine
+
+    _worker_engine = get_ocr_engine(cpu_threads=threads)
+    if warmup:
+        from PIL import Image, ImageDraw
+
+        img = Image.new("RGB", (320, 64), "white")
+        ImageDraw.Draw(img).text((10, 20), "warm up 预热", fill="black")
+        _worker_engine.ocr(img, cls=True)
+
+
+def _recognize(img) -> list:
+    from tools.ocr_cache import normalize_result
+
+    # 转成纯 Python 类型再传回主进程，结果更小，也可直接写入缓存
+    return normalize_result(_worker_engine.ocr(img, cls=True))
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class OcrEnginePool:
+    def __init__(self, size: int, threads_per_worker: Optional[int] = None, warmup: bool = True):
+        self.size = max(1, size)
+        self.threads_per_worker = threads_per_worker
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.size, initializer=_init_worker, initargs=(threads_per_worker, warmup),
+        )
+
+    def warm_up(self):
+        """立即拉起全部工作进程（各自加载模型并预热），阻塞到完成"""
+        wait([self._executor.submit(_ping) for _ in range(self.size)])
+
+    def recognize(self, images: List) -> list:
+        """与 ocr_to_doc.recognize_batch 接口一致：逐图分发到各进程，按原顺序返回结果"""
+        futures = [self._executor.submit(_recognize, img) for img in images]
+        return [f.result() for f in futures]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: Optional[OcrEnginePool] = None
+_pool_lock = threading.Lock()
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.environ.get(name, "").strip()
+    return int(value) if value.isdigit() else None
+
+
+def default_pool_size() -> int:
+    return _env_int("NEWSTOOLS_OCR_WORKERS") or 0
+
+
+def get_ocr_pool(size: Optional[int] = None, threads_per_worker: Optional[int] = None) -> Optional[OcrEnginePool]:
+    """共享的引擎池；size 为 0 时返回 None（调用方退回到当前进程识别）。
+
+    参数与现有进程池不同时重建进程池。
+    """
+    global _pool
+    size = default_pool_size() if size is None else size
+    threads_per_worker = threads_per_worker or _env_int("NEWSTOOLS_OCR_THREADS")
+    with _pool_lock:
+        if size <= 0:
+            return None
+        if _pool is not None and (_pool.size, _pool.threads_per_worker) != (size, threads_per_worker):
+            _pool.shutdown()
+            _pool = None
+        if _pool is None:
+            _pool = OcrEnginePool(size, threads_per_worker)
+        return _pool
+
+
+def warm_up_from_env():
+    """应用启动时调用：设置了 NEWSTOOLS_OCR_WARMUP=1 时在后台拉起并预热进程池"""
+    if os.environ.get("NEWSTOOLS_OCR_WARMUP") != "1" or default_pool_size() <= 0:
+        return
+
+    def run():
+        try:
+            get_ocr_pool().warm_up()
+        except Exception as e:
+            print(f"⚠️ OCR 引擎池预热失败: {e}")
+
+    threading.Thread(target=run, name="ocr-pool-warmup", daemon=True).start()
@@ -1,20 +1,49 @@
 # tools/ocr_to_doc.py
 import sys
+import itertools
 import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Tuple
-from docx import Document
-from openpyxl import Workbook
-import flet as ft
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+import fitz  # PyMuPDF
 from PIL import Image
 
+from . import trace
+from .jobs import JobCancelled, format_progress, get_job_runner
+from .log_view import LogView
+from .ocr_cache import OcrCache, get_ocr_cache, page_key
+from .ocr_export import ExcelExporter, WordExporter, open_exporter, unique_export_name
+from .ocr_pool import default_pool_size, get_ocr_pool
+from .pdf_to_jpg import RenderOptions, pixmap_to_image
+from .progress_log import ProgressLog
+from .search_index import get_search_index
+from .scanner import DirectoryScanner
+from .watcher import FolderWatcher
+
+if TYPE_CHECKING:
+    import flet as ft
+
+    from .page_filter import PageFilter, PageVerdict
+
+TOOL_NAME = "OCR文字识别"
+TOOL_ICON = "text_snippet"  # Flet 图标名，即 ft.Icons.TEXT_SNIPPET
+TOOL_REQUIRES = "paddleocr"  # 未安装 PaddleOCR（如默认打包的 exe）时不显示该工具
+
+# PDF 栅格化分辨率（与原 pdf2image 设置一致）
+OCR_DPI = 150
+
 # 初始化 OCR（只初始化一次）
 _ocr_engine = None
 
 # 延迟导入PaddleOCR，避免启动时加载
 PaddleOCR = None
 
-def get_ocr_engine():
+def get_ocr_engine(cpu_threads: Optional[int] = None):
+    """当前进程共享的 PaddleOCR 实例；cpu_threads 只在首次创建时生效"""
     global _ocr_engine, PaddleOCR
     
     # 延迟导入PaddleOCR，只有在第一次使用时才导入
@@ -29,6 +58,7 @@ def get_ocr_engine():
         model_dir = script_dir / "paddleocr_models"
         model_dir.mkdir(exist_ok=True)
         
+        extra = {"cpu_threads": cpu_threads} if cpu_threads else {}
         # use_angle_cls=True 启用方向分类，更准
         _ocr_engine = PaddleOCR(
             use_angle_cls=True,
@@ -36,76 +66,496 @@ def get_ocr_engine():
             # 设置模型缓存目录，避免打包后权限问题
             det_model_dir=str(model_dir / "det"),
             rec_model_dir=str(model_dir / "rec"),
-            cls_model_dir=str(model_dir / "cls")
+            cls_model_dir=str(model_dir / "cls"),
             # show_log和use_gpu参数已在新版本中移除
+            **extra
         )
     return _ocr_engine
 
 
-def ocr_image_or_pdf(file_path: Path) -> str:
-    """对单张图片或 PDF（转图）进行 OCR，返回纯文本（按行拼接）"""
-    ocr = get_ocr_engine()
-    results = []
+def engine_signature() -> str:
+    """识别缓存用的引擎签名：模型版本或影响结果的参数变化后，旧缓存自动失效"""
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        paddle_version = version("paddleocr")
+    except PackageNotFoundError:
+        paddle_version = "unknown"
+    return f"paddleocr={paddle_version};lang=ch;angle_cls=1;cls=1;dpi={OCR_DPI}"
 
-    if file_path.suffix.lower() == ".pdf":
-        from pdf2image import convert_from_path
-        # 复用你已有的 poppler 路径逻辑（如果需要）
-        images = convert_from_path(str(file_path), dpi=150)
-    else:
-        images = [Image.open(file_path)]
 
-    for img in images:
-        # PaddleOCR 接受 PIL.Image 或 numpy array
-        ocr_result = ocr.ocr(img, cls=True)
-        if not ocr_result or not ocr_result[0]:
-            continue
-        # 提取文本（忽略坐标和置信度）
-        text_lines = [line[1][0] for line in ocr_result[0]]
-        results.append("\n".join(text_lines))
+# 文字层少于该字符数的页视为没有可用文字（扫描件常带有零星的页码/水印文字）
+MIN_TEXT_CHARS = 20
+# 文字页中面积不低于整页该比例的图片，作为图片区域单独识别
+MIN_REGION_RATIO = 0.05
 
-    return "\n---分页---\n".join(results) if len(results) > 1 else (results[0] if results else "")
+TEXT, OCR, HYBRID, BLANK = "text", "ocr", "hybrid", "blank"
+
+
+# 区域: (x0, y0, x1, y1)；PDF 为页面坐标（点，1/72 英寸），图片为像素
+Box = Tuple[float, float, float, float]
+
+
+@dataclass
+class OcrLine:
+    """一行文字及其在页面上的位置；score 为识别置信度，文字层的行为 None"""
+    text: str
+    box: Optional[Box] = None
+    score: Optional[float] = None
+
+
+@dataclass
+class PageInput:
+    """待处理的一页：text 为 PDF 自带的文字层，images 为仍需 OCR 的图像（整页或图片区域）。
+
+    text_lines 为文字层按文本块拆出的行；origins[k]/scale 把 images[k] 的像素坐标换算回页面坐标：
+    页面坐标 = origin + 像素坐标 / scale。verdict 为整页 OCR 的页经过预筛（见 _prefilter）的结果。
+    """
+    source: str
+    text: Optional[str] = None
+    images: List[Image.Image] = field(default_factory=list)
+    text_lines: List[OcrLine] = field(default_factory=list)
+    origins: List[Tuple[float, float]] = field(default_factory=list)
+    scale: float = 1.0
+    verdict: Optional["PageVerdict"] = None
+
+
+@dataclass
+class PageResult:
+    source: str  # text: 文字层直接提取 | ocr: 整页识别 | hybrid: 文字层 + 图片区域识别 | blank: 预筛跳过的空白页
+    text: Optional[str]
+    lines: List[OcrLine] = field(default_factory=list)
 
 
-def export_to_word(texts: List[Tuple[str, str]], output_path: Path):
-    """texts: [(filename, content), ...]"""
-    doc = Document()
-    doc.add_heading("OCR 识别结果", 0)
+@dataclass
+class FileResult:
+    path: Path
+    text: str = ""
+    error: Optional[str] = None
+    pages: List[PageResult] = field(default_factory=list)
 
-    for filename, content in texts:
-        doc.add_heading(f"📄 {filename}", level=1)
-        doc.add_paragraph(content)
-        doc.add_page_break()
+    def source_counts(self) -> Dict[str, int]:
+        """各处理路径的页数，如 {"text": 12, "ocr": 3}"""
+        counts: Dict[str, int] = {}
+        for p in self.pages:
+            counts[p.source] = counts.get(p.source, 0) + 1
+        return counts
 
-    doc.save(output_path)
 
+def _usable_text(page) -> Optional[str]:
+    """PDF 页自带的文字层；过短或大部分是无法映射的字形（�）时视为不可用"""
+    text = page.get_text("text").strip()
+    if len(text) < MIN_TEXT_CHARS or text.count("�") > len(text) * 0.1:
+        return None
+    return text
 
-def export_to_excel(texts: List[Tuple[str, str]], output_path: Path):
+
+def _text_layer_lines(page) -> List[OcrLine]:
+    """文字层按文本块拆成行；同一块中的行共用块的区域"""
+    lines = []
+    for x0, y0, x1, y1, text, _, block_type in page.get_text("blocks"):
+        if block_type != 0:  # 图片块
+            continue
+        lines.extend(OcrLine(line, (x0, y0, x1, y1)) for line in text.splitlines() if line.strip())
+    return lines
+
+
+def _render(page, mat, clip=None) -> Image.Image:
+    pix = page.get_pixmap(matrix=mat, alpha=False, clip=clip)
+    # 图像会在流水线队列中滞留，复制一份，不依赖 pix 的缓冲区
+    return pixmap_to_image(pix).copy()
+
+
+def _load_pages(file_path: Path, use_text_layer: bool = True) -> Iterator[PageInput]:
+    """逐页产出待处理的页：图片文件为单页，PDF 每页一个。
+
+    PDF 用与 PDF转JPG 相同的 fitz 渲染逐页生成，任意时刻只有一页的像素在内存中，
+    也不再依赖外部 poppler。use_text_layer 为 True 时，带可用文字层的页直接取文字，
+    只把其中较大的图片区域送去 OCR；没有文字层的页整页识别。
+    """
+    name = file_path.name
+    if file_path.suffix.lower() != ".pdf":
+        with trace.span("image.decode", file=name):
+            img = Image.open(file_path)
+            img.load()  # 在生产线程中解码并释放文件句柄，而不是等到识别时
+        yield PageInput(OCR, images=[img], origins=[(0.0, 0.0)])
+        return
+
+    options = RenderOptions(dpi=OCR_DPI)
+    mat = options.matrix
+    with trace.span("pdf.open", file=name):
+        doc = fitz.open(file_path)
+    with doc:
+        for page in doc:
+            page_no = page.number + 1
+            if use_text_layer:
+                with trace.span("pdf.text_layer", file=name, page=page_no):
+                    text = _usable_text(page)
+            else:
+                text = None
+            if text is None:
+                with trace.span("pdf.render", file=name, page=page_no):
+                    images = [_render(page, mat)]
+                yield PageInput(OCR, images=images, origins=[(page.rect.x0, page.rect.y0)], scale=options.zoom)
+                continue
+            with trace.span("pdf.text_layer", file=name, page=page_no):
+                text_lines = _text_layer_lines(page)
+            with trace.span("pdf.render", file=name, page=page_no):
+                min_area = abs(page.rect) * MIN_REGION_RATIO
+                regions = [
+                    fitz.Rect(info["bbox"]) & page.rect for info in page.get_image_info()
+                ]
+                regions = [r for r in regions if abs(r) >= min_area]
+                images = [_render(page, mat, clip=r) for r in regions]
+            yield PageInput(
+                HYBRID if images else TEXT, text=text, images=images, text_lines=text_lines,
+                origins=[(r.x0, r.y0) for r in regions], scale=options.zoom,
+            )
+
+
+def _prefilter(page: PageInput, page_filter: Optional["PageFilter"], file_path: Path, page_no: int) -> PageInput:
+    """整页 OCR 的页先做预筛：跳过的空白页不再识别，其余的页带上预筛结果，供识别时复用近似页的结果。
+
+    预筛记录以完整路径标识文件，不同文件夹中的同名文件不会混在一起。
+    """
+    if page_filter is None or page.source != OCR:
+        return page
+    with trace.span("page.filter", file=file_path.name, page=page_no):
+        page.verdict = page_filter.check_image(page.images[0], str(file_path), page_no)
+    if page.verdict.blank and page_filter.skip_blank:
+        trace.count("pages_blank_skipped")
+        return PageInput(BLANK)
+    return page
+
+
+def _page_text(ocr_result) -> Optional[str]:
+    """单页 OCR 结果 → 文本（忽略坐标和置信度），无内容时返回 None"""
+    if not ocr_result or not ocr_result[0]:
+        return None
+    return "\n".join(line[1][0] for line in ocr_result[0])
+
+
+def _ocr_lines(ocr_result, origin: Tuple[float, float], scale: float) -> List[OcrLine]:
+    """单张图像的 OCR 结果 → 带页面坐标和置信度的行"""
+    if not ocr_result or not ocr_result[0]:
+        return []
+    ox, oy = origin
+    lines = []
+    for box, (text, score) in ocr_result[0]:
+        xs = [float(x) for x, _ in box]
+        ys = [float(y) for _, y in box]
+        region = (ox + min(xs) / scale, oy + min(ys) / scale, ox + max(xs) / scale, oy + max(ys) / scale)
+        lines.append(OcrLine(str(text), region, float(score)))
+    return lines
+
+
+def _merge_page(page: PageInput, ocr_results: list) -> PageResult:
+    """文字层与各图像 OCR 结果合并为一页文本，并保留逐行的位置和置信度。
+
+    ocr_results 与 page.images 一一对应，识别失败的图像为 None。
+    """
+    parts = [page.text] + [_page_text(r) for r in ocr_results]
+    parts = [p for p in parts if p]
+    lines = list(page.text_lines)
+    for k, r in enumerate(ocr_results):
+        if r is not None:
+            lines += _ocr_lines(r, page.origins[k] if k < len(page.origins) else (0.0, 0.0), page.scale)
+    return PageResult(page.source, "\n".join(parts) if parts else None, lines)
+
+
+def describe_sources(result: FileResult) -> str:
+    """各处理路径页数的简短描述，用于日志"""
+    labels = {TEXT: "文字层", HYBRID: "文字层+图片识别", OCR: "OCR", BLANK: "空白页"}
+    counts = result.source_counts()
+    return "，".join(f"{labels[k]} {counts[k]} 页" for k in (TEXT, HYBRID, OCR, BLANK) if k in counts)
+
+
+def _join_pages(page_texts: List[Optional[str]]) -> str:
+    results = [t for t in page_texts if t is not None]
+    return "\n---分页---\n".join(results) if len(results) > 1 else (results[0] if results else "")
+
+
+def ocr_file(
+    file_path: Path, page_callback=None, cache: Optional[OcrCache] = None, use_text_layer: bool = True,
+    page_filter: Optional["PageFilter"] = None,
+) -> FileResult:
+    """对单张图片或 PDF 逐页提取文字（文字层或 OCR），返回带每页处理路径的结果
+
+    page_callback(n) 在每处理完 n 页后调用，可在其中抛出 JobCancelled 中止识别。
+    传入 cache 时，像素内容相同的图像直接取缓存结果。
+    传入 page_filter 时，整页识别的页先做预筛：空白页按其设置跳过，近似重复的页复用前面那页的识别结果。
+    """
+    signature = engine_signature() if cache else None
+    result = FileResult(file_path)
+
+    for page_no, page in enumerate(_load_pages(file_path, use_text_layer), 1):
+        page = _prefilter(page, page_filter, file_path, page_no)
+        ocr_results = []
+        for img in page.images:
+            with trace.span("cache.lookup", file=file_path.name, page=page_no):
+                key = page_key(img, signature) if cache else None
+                ocr_result = cache.get(key) if cache else None
+            if ocr_result is None and page.verdict:
+                ocr_result = page_filter.reuse(page.verdict)
+            if ocr_result is None:
+                # PaddleOCR 接受 PIL.Image 或 numpy array
+                with trace.span("ocr.recognize", file=file_path.name, page=page_no):
+                    ocr_result = get_ocr_engine().ocr(img, cls=True)
+                if cache:
+                    cache.put(key, ocr_result)
+            if page.verdict:
+                page_filter.remember(page.verdict, ocr_result)
+            ocr_results.append(ocr_result)
+        result.pages.append(_merge_page(page, ocr_results))
+        if page_callback:
+            page_callback(1)
+
+    result.text = _join_pages([p.text for p in result.pages])
+    return result
+
+
+def ocr_image_or_pdf(
+    file_path: Path, page_callback=None, cache: Optional[OcrCache] = None, use_text_layer: bool = True,
+    page_filter: Optional["PageFilter"] = None,
+) -> str:
+    """对单张图片或 PDF（转图）进行 OCR，返回纯文本（按行拼接）"""
+    return ocr_file(file_path, page_callback, cache, use_text_layer, page_filter).text
+
+
+def recognize_batch(images: List[Image.Image]) -> list:
+    """识别一批图像，返回与 images 一一对应的原始 OCR 结果。
+
+    PaddleOCR 的检测模型一次只接受一张图，这里在同一引擎上依次识别；
+    批次是流水线交给识别端的调度单位。
+    """
+    ocr = get_ocr_engine()
+    return [ocr.ocr(img, cls=True) for img in images]
+
+
+_PAGE, _END, _STOP = "page", "end", "stop"
+
+
+def ocr_files_pipelined(
+    files: Iterable[Path],
+    batch_size: int = 8,
+    producers: int = 2,
+    queue_size: int = 16,
+    recognize=None,
+    page_callback=None,
+    cache: Optional[OcrCache] = None,
+    use_text_layer: bool = True,
+    page_filter: Optional["PageFilter"] = None,
+) -> Iterator[FileResult]:
+    """流水线批量 OCR：producers 个线程并行读取/栅格化文件，识别端跨文件按批取图像。
+
+    有界队列（queue_size 页）提供背压，内存中待识别的页数有上限。
+    按 files 的原始顺序逐个产出 FileResult，其 text 与 ocr_image_or_pdf 的返回值一致，
+    失败时 error 为错误信息。recognize(images) 默认为 recognize_batch。
+    page_callback(n) 在每批处理完成后调用；生成器被关闭或回调抛出异常时生产线程随之停止。
+    传入 cache 时由生产线程计算图像指纹，命中缓存的图像不再送去识别。
+    use_text_layer 见 _load_pages；page_filter 见 ocr_file，预筛同样在生产线程中进行。
+    """
+    recognize = recognize or recognize_batch
+    signature = engine_signature() if cache else None
+    pages_q: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    files_iter = iter(files)
+    files_lock = threading.Lock()
+    next_index = [0]
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                pages_q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        while not stop.is_set():
+            with files_lock:
+                file_path = next(files_iter, None)
+                index = next_index[0]
+                next_index[0] += 1
+            if file_path is None:
+                return
+            count, error = 0, None
+            try:
+                for page in _load_pages(file_path, use_text_layer):
+                    page = _prefilter(page, page_filter, file_path, count + 1)
+                    if cache:
+                        with trace.span("cache.key", file=file_path.name, page=count + 1):
+                            keys = [page_key(img, signature) for img in page.images]
+                    else:
+                        keys = None
+                    if not put((_PAGE, index, count, page, keys)):
+                        return
+                    count += 1
+            except Exception as e:
+                error = str(e)
+            if not put((_END, index, file_path, count, error)):
+                return
+
+    def run_producers():
+        with ThreadPoolExecutor(max_workers=producers, thread_name_prefix="ocr-producer") as pool:
+            for _ in range(producers):
+                pool.submit(produce)
+        put((_STOP,))
+
+    threading.Thread(target=run_producers, name="ocr-producers", daemon=True).start()
+
+    page_results: Dict[int, Dict[int, PageResult]] = {}
+    page_errors: Dict[int, str] = {}
+    finished: Dict[int, Tuple[Path, int, Optional[str]]] = {}
+    next_emit = 0
+    batch = []
+    batch_images = 0
+
+    def flush():
+        nonlocal batch_images
+        # 展开为图像列表：(批内页序号, 图像, 缓存键, 预筛结果)
+        flat = [
+            (n, img, keys[k] if keys else None, page.verdict)
+            for n, (_, _, _, page, keys) in enumerate(batch)
+            for k, img in enumerate(page.images)
+        ]
+        if cache:
+            with trace.span("cache.lookup", images=len(flat)):
+                raw = [cache.get(key) for _, _, key, _ in flat]
+        else:
+            raw = [None] * len(flat)
+        error = None
+
+        def recognize_missing(indices: List[int]):
+            nonlocal error
+            misses = [k for k in indices if raw[k] is None]
+            if not misses:
+                return
+            trace.count("images_recognized", len(misses))
+            try:
+                # 识别按批进行，记录的是整批的耗时（使用引擎池时含进程间传输）
+                with trace.span("ocr.recognize", images=len(misses)):
+                    recognized = recognize([flat[k][1] for k in misses])
+            except Exception as e:
+                error = str(e)
+                return
+            for k, r in zip(misses, recognized):
+                raw[k] = r
+            if cache:
+                with trace.span("cache.put", images=len(misses)):
+                    for k in misses:
+                        cache.put(flat[k][2], raw[k])
+
+        if page_filter:
+            verdicts = [item[3] for item in flat]
+            for k, verdict in enumerate(verdicts):
+                # 生产线程预筛之后又登记了前面批次的页，识别前再比较一次
+                if raw[k] is None and verdict is not None and page_filter.match(verdict):
+                    raw[k] = page_filter.reuse(verdict)
+            # 同一批中近似的页只识别前面那页，识别完再复用其结果；那页识别失败时各自识别
+            copies = {k: src for k, src in page_filter.match_batch(verdicts).items() if raw[k] is None}
+            recognize_missing([k for k in range(len(flat)) if k not in copies])
+            for k, src in copies.items():
+                if raw[src] is not None:
+                    raw[k] = page_filter.reuse_from(verdicts[k], verdicts[src], raw[src])
+            recognize_missing(list(copies))
+            for k, verdict in enumerate(verdicts):
+                if verdict is not None and raw[k] is not None:
+                    page_filter.remember(verdict, raw[k])
+        else:
+            recognize_missing(list(range(len(flat))))
+        per_page = [[] for _ in batch]
+        for (n, _, _, _), r in zip(flat, raw):
+            per_page[n].append(r)
+        for (_, index, page_no, page, _), results in zip(batch, per_page):
+            page_results.setdefault(index, {})[page_no] = _merge_page(page, results)
+            if error and page.images:
+                page_errors.setdefault(index, error)
+        done = len(batch)
+        batch.clear()
+        batch_images = 0
+        if page_callback:
+            page_callback(done)
+
+    try:
+        while True:
+            item = pages_q.get()
+            if item[0] == _PAGE:
+                batch.append(item)
+                batch_images += len(item[3].images)
+                # 批次满了，或者生产端暂时跟不上时，不再等待凑满
+                if batch_images >= batch_size or pages_q.empty():
+                    flush()
+            elif item[0] == _END:
+                _, index, file_path, count, error = item
+                finished[index] = (file_path, count, error)
+                if batch and pages_q.empty():
+                    flush()
+            else:
+                if batch:
+                    flush()
+
+            while next_emit in finished:
+                file_path, count, error = finished[next_emit]
+                pages = page_results.get(next_emit, {})
+                if len(pages) < count:
+                    break  # 该文件还有页在当前批次中
+                del finished[next_emit]
+                page_results.pop(next_emit, None)
+                result = FileResult(file_path, error=error or page_errors.pop(next_emit, None))
+                if not result.error:
+                    result.pages = [pages[k] for k in range(count)]
+                    result.text = _join_pages([p.text for p in result.pages])
+                yield result
+                next_emit += 1
+
+            if item[0] == _STOP:
+                return
+    finally:
+        stop.set()
+
+
+def export_to_word(texts: Iterable[Tuple[str, str]], output_path: Path):
+    """texts: [(filename, content), ...]，全部写入一个文件；批处理请用 open_exporter 流式分卷"""
+    with WordExporter(output_path) as exporter:
+        for filename, content in texts:
+            exporter.add(filename, content)
+
+
+def export_to_excel(texts: Iterable[Tuple[str, str]], output_path: Path):
     """每行一个文件，A列文件名，B列内容"""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "OCR Results"
-    ws.append(["文件名", "识别内容"])
+    with ExcelExporter(output_path) as exporter:
+        for filename, content in texts:
+            exporter.add(filename, content)
 
-    for filename, content in texts:
-        # Excel 单元格有字符限制（32767），长文本可截断或警告
-        ws.append([filename, content[:32000]])
 
-    wb.save(output_path)
+def export_results(texts: List[Tuple[str, str]], output_dir: Path, fmt: str = "word") -> Path:
+    """按格式导出到 output_dir 下的 OCR结果.docx / OCR结果.xlsx，返回输出文件路径"""
+    if fmt == "word":
+        out_file = output_dir / "OCR结果.docx"
+        export_to_word(texts, out_file)
+    else:
+        out_file = output_dir / "OCR结果.xlsx"
+        export_to_excel(texts, out_file)
+    return out_file
+
+
+IMAGE_OR_PDF_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".pdf"}
+
+
+def scan_images_or_pdfs(input_path: Path, ordered: bool = False, **filters) -> DirectoryScanner:
+    """流式收集图片/PDF：边遍历边产出，可直接交给识别流水线（参数同 DirectoryScanner）"""
+    return DirectoryScanner(input_path, extensions=IMAGE_OR_PDF_EXTENSIONS, ordered=ordered, **filters)
 
 
 def collect_images_or_pdfs(input_path: Path) -> List[Path]:
-    allowed_ext = {".jpg", ".jpeg", ".png", ".bmp", ".pdf"}
-    if input_path.is_file() and input_path.suffix.lower() in allowed_ext:
-        return [input_path]
-    elif input_path.is_dir():
-        return sorted([
-            p for p in input_path.rglob("*")
-            if p.suffix.lower() in allowed_ext
-        ])
-    return []
-
-
-def create_ocr_tool_page(page: ft.Page) -> ft.Control:
+    return list(scan_images_or_pdfs(input_path, ordered=True))
+
+
+def create_ocr_tool_page(page: "ft.Page") -> "ft.Control":
+    # Flet 只在打开界面时导入，命令行/无界面环境不依赖它
+    import flet as ft
+
     input_field = ft.TextField(label="输入路径（图片或PDF）", read_only=True, width=400)
     output_field = ft.TextField(label="输出目录", read_only=True, width=400)
     format_dropdown = ft.Dropdown(
@@ -117,7 +567,43 @@ def create_ocr_tool_page(page: ft.Page) -> ft.Control:
         value="word",
         width=200
     )
-    status_text = ft.Text("", size=13, selectable=True, expand=True)
+    cache_checkbox = ft.Checkbox(label="使用识别缓存（相同页面不重复识别）", value=True)
+    text_layer_checkbox = ft.Checkbox(label="PDF 有文字层的页直接提取，不做 OCR", value=True)
+    index_checkbox = ft.Checkbox(label="写入全文检索索引（可在下方按文字查找页面）", value=True)
+    blank_dropdown = ft.Dropdown(
+        label="空白页",
+        options=[
+            ft.dropdown.Option("keep", "不检测"),
+            ft.dropdown.Option("flag", "识别并列入报告"),
+            ft.dropdown.Option("skip", "跳过（列入报告）"),
+        ],
+        value="keep",
+        width=190,
+    )
+    dedupe_checkbox = ft.Checkbox(
+        label="近似重复页复用前面的识别结果",
+        value=False,
+        tooltip="与前面某页几乎相同（重复插页等）时不再识别，直接使用那一页的文字",
+    )
+    trace_checkbox = ft.Checkbox(label="记录各阶段耗时（结果写入输出目录）", value=False)
+    watch_checkbox = ft.Checkbox(
+        label="持续监视输入文件夹（新放入的文件自动识别，点“取消”停止）",
+        value=False,
+        tooltip="每批写完的新文件识别后单独保存为一份带时间的结果文档",
+    )
+    pool_field = ft.TextField(
+        label="识别进程数",
+        value=str(default_pool_size()),
+        width=120,
+        keyboard_type=ft.KeyboardType.NUMBER,
+        tooltip="大于 0 时启动多个常驻识别进程（各自加载一次模型）；0 为在当前进程识别",
+    )
+    # 日志只保留最近若干行，完整日志写入 logs/ 目录；界面按固定帧率刷新
+    log = ProgressLog("ocr_to_doc")
+    log_view = LogView(log)
+    progress_bar = ft.ProgressBar(value=0, visible=False)
+    progress_text = ft.Text("", size=12, color="grey")
+    active_jobs = []  # 本页面提交且尚未结束的作业
 
     # File pickers
     file_picker = ft.FilePicker()
@@ -146,58 +632,226 @@ def create_ocr_tool_page(page: ft.Page) -> ft.Control:
         fmt = format_dropdown.value
 
         if not input_str or not os.path.exists(input_str):
-            status_text.value = "❌ 请输入有效的输入路径"
-            status_text.color = "red"
-            status_text.update()
+            log_view.set_status("❌ 请输入有效的输入路径", "red")
             return
         if not output_str:
-            status_text.value = "❌ 请选择输出目录"
-            status_text.color = "red"
-            status_text.update()
+            log_view.set_status("❌ 请选择输出目录", "red")
             return
 
         input_p = Path(input_str)
         output_p = Path(output_str)
-        files = collect_images_or_pdfs(input_p)
-
-        if not files:
-            status_text.value = "❌ 未找到支持的图片或PDF文件"
-            status_text.color = "red"
-            status_text.update()
+        watch = bool(watch_checkbox.value)
+        if watch and not input_p.is_dir():
+            log_view.set_status("❌ 监视模式需要选择文件夹", "red")
             return
+        # 边扫描边识别，不必等整个目录树遍历完；文件总数在扫描结束后才确定
+        scanner = scan_images_or_pdfs(input_p)
 
-        status_text.value = f"🔄 正在识别 {len(files)} 个文件...\n"
-        status_text.color = "blue"
-        status_text.update()
-
-        results = []
-        for f in files:
+        cache = get_ocr_cache() if cache_checkbox.value else None
+        index = get_search_index() if index_checkbox.value else None
+        try:
+            pool_size = max(0, int(pool_field.value or 0))
+        except ValueError:
+            log_view.set_status("❌ 识别进程数必须是整数", "red")
+            return
+        page_filter = None
+        if blank_dropdown.value != "keep" or dedupe_checkbox.value:
             try:
-                text = ocr_image_or_pdf(f)
-                results.append((f.name, text))
-                status_text.value += f"✅ {f.name} 识别完成\n"
-            except Exception as e:
-                status_text.value += f"❌ {f.name} 失败: {str(e)[:100]}\n"
-            status_text.update()
-
-        # 导出
-        if fmt == "word":
-            out_file = output_p / "OCR结果.docx"
-            export_to_word(results, out_file)
-        else:
-            out_file = output_p / "OCR结果.xlsx"
-            export_to_excel(results, out_file)
-
-        status_text.value += f"\n🎉 完成！文件已保存至:\n{out_file}"
-        status_text.color = "green"
-        status_text.update()
+                from .page_filter import PageFilter
+            except ImportError:
+                log_view.set_status("❌ 空白页/重复页预筛需要安装 numpy", "red")
+                return
+            # 整次运行共用一个过滤器：跨文件识别重复页，结束时汇总为一份报告
+            page_filter = PageFilter(blank=blank_dropdown.value, dedupe=bool(dedupe_checkbox.value))
+
+        traced = bool(trace_checkbox.value)
+
+        def recognize_into(job, files, exporter):
+            # 读取/栅格化与识别流水线并行，结果仍按文件原顺序返回
+            pool = get_ocr_pool(pool_size)
+            pipeline = ocr_files_pipelined(
+                files, page_callback=lambda n: job.report(pages=n), cache=cache,
+                use_text_layer=bool(text_layer_checkbox.value),
+                # 每批至少让每个识别进程分到两张图
+                batch_size=max(8, pool_size * 2),
+                recognize=pool.recognize if pool else None,
+                page_filter=page_filter,
+            )
+            for r in pipeline:
+                if r.error:
+                    log.append(f"❌ {r.path.name} 失败: {r.error[:100]}")
+                else:
+                    exporter.add(r.path.name, r.text)
+                    if index:
+                        with trace.span("index.write", file=r.path.name):
+                            index.add(r)
+                    filtered = page_filter.describe(str(r.path)) if page_filter else ""
+                    log.append(f"✅ {r.path.name} 识别完成（{describe_sources(r)}）" + (f"；{filtered}" if filtered else ""))
+                if scanner.done:
+                    job.files_total = scanner.found
+                job.report(files=1)
+
+        def save_reports(tracer):
+            if tracer:
+                log.append(trace.save_report(tracer, output_p))
+            if page_filter is not None:
+                log.append(page_filter.save_report(output_p))
+
+        def begin():
+            # 作业真正开始时才清空日志：排队中的作业不会清掉前一个仍在运行的作业的日志
+            log.start()
+            log_view.set_status("🔄 正在扫描并识别文件...", "blue")
+
+        def run_watch(job):
+            begin()
+            # 每批已写完的文件识别后立即保存为一份带时间的结果文档，放入文件几秒后即可打开
+            watcher = FolderWatcher(input_p, extensions=IMAGE_OR_PDF_EXTENSIONS).start()
+            log.append(f"👀 正在监视 {input_p}（{watcher.backend}），新放入的图片/PDF 将自动识别")
+            tracer = trace.start() if traced else None
+            files_written = 0
+            try:
+                for batch in watcher.batches(idle=job.checkpoint):
+                    exporter = open_exporter(output_p, fmt, name=unique_export_name(output_p))
+                    try:
+                        recognize_into(job, batch, exporter)
+                    finally:
+                        out_files = exporter.close()
+                        files_written += exporter.files_written
+                        log.append("📄 已保存: " + "、".join(str(p) for p in out_files))
+            except JobCancelled:
+                log_view.finish(f"⏹️ 已停止监视，共识别 {files_written} 个文件，结果在: {output_p}", "orange")
+                raise
+            finally:
+                watcher.stop()
+                if tracer:
+                    trace.stop()
+                save_reports(tracer)
+
+        def run(job):
+            begin()
+            # 在后台作业线程中执行，页与页之间响应暂停/取消
+            # 每识别完一个文件就写入导出文件，超过阈值自动分卷，内存占用有上限
+            # 先取到第一个文件再创建导出文件，找不到文件时不留下空的结果文档
+            files = iter(scanner)
+            first = next(files, None)
+            if first is None:
+                log_view.finish("❌ 未找到支持的图片或PDF文件", "red")
+                return
+            files = itertools.chain([first], files)
+
+            tracer = trace.start() if traced else None
+            exporter = open_exporter(output_p, fmt)
+            try:
+                try:
+                    recognize_into(job, files, exporter)
+                finally:
+                    # 出错或取消时也保存已完成部分
+                    out_files = exporter.close()
+                    if tracer:
+                        trace.stop()
+            except JobCancelled:
+                save_reports(tracer)
+                log_view.finish(
+                    f"⏹️ 已取消，已识别的 {exporter.files_written} 个文件已保存至:\n"
+                    + "\n".join(str(p) for p in out_files),
+                    "orange",
+                )
+                raise
+
+            save_reports(tracer)
+            summary = "🎉 完成！文件已保存至:\n" + "\n".join(str(p) for p in out_files)
+            if cache:
+                stats = cache.stats()
+                summary += f"\n💾 缓存命中 {stats['hits']}/{stats['hits'] + stats['misses']} 页"
+            log_view.finish(summary, "green")
+
+            # 自动打开文件夹
+            try:
+                os.startfile(output_p)
+            except:
+                pass
+
+        active_jobs.append(get_job_runner().submit("OCR文字识别", run_watch if watch else run, on_event=on_job_event))
+        progress_bar.visible = True
+        progress_bar.update()
+
+    def on_job_event(event):
+        if event.finished:
+            active_jobs[:] = [j for j in active_jobs if j.id != event.job_id]
+            if event.error:
+                log.append(f"❌ 识别中断: {event.error}")
+                log_view.finish("❌ 识别中断", "red")
+            if not active_jobs:
+                log.close()
+        progress_bar.visible = bool(active_jobs)
+        # 总数未知（目录仍在扫描）时显示为不确定进度
+        progress_bar.value = event.files_done / event.files_total if event.files_total else None
+        progress_text.value = format_progress(event)
+        pause_button.text = "继续" if event.state == "paused" else "暂停"
+        progress_bar.update()
+        progress_text.update()
+        pause_button.update()
+
+    def toggle_pause(_):
+        for job in active_jobs:
+            if job.paused:
+                job.resume()
+            else:
+                job.pause()
+
+    def cancel_jobs(_):
+        for job in active_jobs:
+            job.cancel()
+
+    pause_button = ft.OutlinedButton("暂停", icon=ft.Icons.PAUSE, on_click=toggle_pause)
+
+    # === 全文检索 ===
+    search_field = ft.TextField(
+        label="在已识别的文字中查找（空格分隔多个词）",
+        helper_text="至少输入两个字；只查单个字时需逐行比较，较慢",
+        expand=True,
+    )
+    search_info = ft.Text("", size=13)
+    search_results = ft.ListView(spacing=2, height=300)
 
-        # 自动打开文件夹
+    def open_hit(path: str):
         try:
-            os.startfile(output_p)
-        except:
+            os.startfile(path)
+        except Exception:
             pass
 
+    def run_search(_):
+        query = (search_field.value or "").strip()
+        search_results.controls.clear()
+        if not query:
+            search_info.value = ""
+        else:
+            start = time.perf_counter()
+            try:
+                hits = get_search_index().search(query, limit=100)
+            except Exception as e:
+                hits = []
+                search_info.value = f"❌ 查询失败: {e}"
+            else:
+                ms = (time.perf_counter() - start) * 1000
+                search_info.value = f"找到 {len(hits)} 条{'（仅显示前 100 条）' if len(hits) == 100 else ''}（{ms:.1f} ms）"
+            for hit in hits:
+                detail = f"{Path(hit.path).name} · 第 {hit.page} 页 · 第 {hit.line} 行"
+                if hit.score is not None:
+                    detail += f" · 置信度 {hit.score:.2f}"
+                if hit.box:
+                    detail += " · 区域 (" + ", ".join(f"{v:.0f}" for v in hit.box) + ")"
+                search_results.controls.append(ft.ListTile(
+                    title=ft.Text(hit.snippet, size=14),
+                    subtitle=ft.Text(detail, size=12),
+                    dense=True,
+                    on_click=lambda _, path=hit.path: open_hit(path),
+                ))
+        search_info.update()
+        search_results.update()
+
+    search_field.on_submit = run_search
+
     return ft.Column([
         ft.Text("🔍 OCR 文字识别（图片/PDF → Word/Excel）", size=24, weight="bold"),
         ft.Row([
@@ -214,16 +868,40 @@ def create_ocr_tool_page(page: ft.Page) -> ft.Control:
                 ft.Text("📤 输出:", weight="bold"),
                 output_field,
                 ft.ElevatedButton("选择输出目录", icon=ft.Icons.SAVE, on_click=lambda _: folder_picker_out.get_directory_path()),
-                format_dropdown,
+                ft.Row([format_dropdown, pool_field]),
+                cache_checkbox,
+                text_layer_checkbox,
+                index_checkbox,
+                ft.Row([blank_dropdown, dedupe_checkbox]),
+                watch_checkbox,
+                trace_checkbox,
             ])
         ]),
         ft.Divider(height=25),
-        ft.ElevatedButton("开始识别", icon=ft.Icons.PLAY_ARROW, on_click=start_ocr, height=50, style=ft.ButtonStyle(bgcolor=ft.colors.GREEN, color=ft.colors.WHITE)),
+        ft.Row([
+            ft.ElevatedButton("开始识别", icon=ft.Icons.PLAY_ARROW, on_click=start_ocr, height=50, style=ft.ButtonStyle(bgcolor=ft.colors.GREEN, color=ft.colors.WHITE)),
+            pause_button,
+            ft.OutlinedButton("取消", icon=ft.Icons.STOP, on_click=cancel_jobs),
+        ]),
+        progress_bar,
+        progress_text,
+        ft.Divider(),
+        log_view.control,
         ft.Divider(),
-        ft.Container(content=status_text, padding=10, border=ft.border.all(1, ft.colors.GREY_300), border_radius=8, bgcolor=ft.colors.BLACK12, expand=True)
+        ft.Text("🔎 全文检索", weight="bold"),
+        ft.Row([
+            search_field,
+            ft.ElevatedButton("查找", icon=ft.Icons.SEARCH, on_click=run_search),
+        ]),
+        search_info,
+        search_results,
     ], expand=True, scroll=ft.ScrollMode.AUTO)
 
 
-# 注册工具
-from . import register_tool
-register_tool("OCR文字识别", ft.Icons.TEXT_SNIPPET, create_ocr_tool_page)
+# === 工具入口（tools/__init__.py 通过 TOOL_NAME / TOOL_ICON 常量发现，打开时才导入本模块） ===
+build_ui = create_ocr_tool_page
+
+
+if __name__ == "__main__":
+    from tools.cli import ocr_main
+    sys.exit(ocr_main())
@@ -0,0 +1,391 @@
+# tools/page_filter.py
+"""页面预筛：在 JPEG 编码和 OCR 之前找出空白页和近似重复页。
+
+直接用 NumPy 读取渲染结果（fitz pixmap 的样本缓冲区或 PIL 图像）的像素，按块求平均缩到长边约
+512 格的灰度网格（逐格比较用），再合并为长边约 256 格的网格，在网格上计算：
+
+- 墨迹覆盖率：比纸张底色（网格亮度的 90 分位）暗 INK_DELTA 以上的格子占比，四周 3% 的边缘
+  （扫描仪阴影、装订孔）不计。低于阈值的页视为空白页（分隔页、背面空白页）。
+- 近似重复：先用感知哈希（16×17 网格的水平梯度方向，共 256 位 dHash）在登记的页中找候选，
+  再逐格比较两页 512×512 的深浅等级（比纸张底色暗多少，每 16 级灰度一档）：相差 3 档以上
+  （亮度差超过 32）的格子算作实质差异，任一 16×16 区域内超过 max_region_diff 个就不算重复。
+  差异按区域计数，与整页墨迹多少无关：稀疏页上换了文字、密集页上只改了一处都能区分。
+  扫描噪声和重新压缩在格子上的亮度变化实测不超过约 20（JPEG 质量 30 加噪声也不会误判）；
+  150 DPI 下 10 号字改动一个数字即可分辨，更小的字中笔画级的差异（如 6 与 8）可能分辨不出。
+  复用结果意味着用前一页的图像/文字代替本页，因此判断刻意从严，明显错位或倾斜的重新扫描
+  也不算重复；去重默认关闭，需显式传入 dedupe=True。
+
+    page_filter = PageFilter(blank="skip", dedupe=True)
+    verdict = page_filter.check_pixmap(pix, "a.pdf", 3)
+    if verdict.blank and page_filter.skip_blank: ...        # blank="flag" 时照常处理，只记入报告
+    result = page_filter.reuse(verdict)                     # 近似页已有的结果，没有时为 None
+    page_filter.remember(verdict, result, nbytes)           # 处理完后登记，供后面的页复用
+    copies = page_filter.match_batch(verdicts)              # 同时在处理的一组页之间互相比较
+    print(page_filter.save_report(output_dir))              # 汇总文字 + CSV 报告路径
+
+空白页不参与重复判断。登记的页存放在按 memory 预先分配的环形缓冲区中（每页约 128 KB），
+结果按条数和字节数淘汰最早的，批量大小不影响内存占用；同一对象可供多个线程同时使用。
+"""
+import csv
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 分析网格的长边（像素块平均后）
+GRID_SIZE = 256
+# 比纸张底色暗多少（0-255）算作墨迹
+INK_DELTA = 32
+# 不参与墨迹统计的边缘比例
+MARGIN_RATIO = 0.03
+DEFAULT_MIN_INK = 0.002
+HASH_SIZE = 16
+# 相邻格子亮度差超过该值才记为 1：空白纸面上的格子几乎等亮，不设门槛时扫描噪声会随机翻转这些位
+HASH_MIN_STEP = 1.0
+DEFAULT_MAX_DISTANCE = 6
+# 每页最多逐格比较的候选数（按哈希距离从近到远）；同一模板的表单页哈希相近，不设上限时每页要比较全部登记页
+MAX_CANDIDATES = 8
+# 逐格比较的网格边长与区域边长；区域以半个边长为步长重叠，差异不会被区域边界分开
+FINE_SIZE = 512
+REGION_CELLS = 16
+# 深浅等级：每档的灰度数，相差几档算作实质差异
+LEVEL_STEP = 16
+MIN_LEVEL_DIFF = 3
+DEFAULT_MAX_REGION_DIFF = 1
+DEFAULT_MEMORY = 128
+DEFAULT_MAX_RESULT_BYTES = 64 * 1024 * 1024
+# 空白页的处理：keep 不检测 / flag 照常处理并记入报告 / skip 跳过
+BLANK_MODES = ("keep", "flag", "skip")
+
+# 报告中的处理方式
+BLANK_SKIPPED, BLANK_FLAGGED, DUPLICATE_REUSED = "blank_skipped", "blank_flagged", "duplicate_reused"
+_ACTION_LABELS = {BLANK_SKIPPED: "空白页（已跳过）", BLANK_FLAGGED: "空白页（已标记）", DUPLICATE_REUSED: "重复页（复用结果）"}
+
+
+@dataclass
+class PageVerdict:
+    file: str  # 文件路径（同名文件在不同文件夹时不会混淆）
+    page: int  # 从 1 开始
+    size: tuple  # 渲染尺寸 (宽, 高)
+    coverage: float  # 墨迹覆盖率 0-1
+    blank: bool  # blank="keep" 时总为 False
+    hash: np.ndarray  # 打包后的 HASH_SIZE² 位
+    levels: np.ndarray  # FINE_SIZE² 格的深浅等级（0-15），每字节两格
+    duplicate_of: Optional[str] = None  # 近似的已登记页（"文件#页"）
+    distance: Optional[int] = None
+    match: Optional[int] = None  # 近似页的登记序号
+
+    @property
+    def key(self) -> str:
+        return f"{self.file}#{self.page}"
+
+
+def _gray_grid(samples, width: int, height: int, n: int, stride: int) -> np.ndarray:
+    """像素样本按 k×k 块求平均，得到长边约 FINE_SIZE 的灰度网格（float32，0-255）；不复制原始像素"""
+    raw = np.frombuffer(samples, dtype=np.uint8, count=stride * height).reshape(height, stride)
+    k = max(1, max(width, height) // FINE_SIZE)
+    h, w = height // k, width // k
+    # 先在 uint16 中累加块内各行（k ≤ 257 不会溢出），再合并块内各列和通道，比一次求和快一倍
+    rows = raw[:h * k, :w * k * n].reshape(h, k, w * k * n).sum(axis=1, dtype=np.uint16)
+    channels = min(n, 3)  # 忽略 alpha
+    total = rows.reshape(h, w, k, n)[..., :channels].sum(axis=(2, 3), dtype=np.uint32)
+    return (total / (k * k * channels)).astype(np.float32)
+
+
+def _pool(grid: np.ndarray) -> np.ndarray:
+    """按 k×k 块求平均，把网格缩到长边约 GRID_SIZE"""
+    k = max(1, max(grid.shape) // GRID_SIZE)
+    h, w = grid.shape[0] // k, grid.shape[1] // k
+    return grid[:h * k, :w * k].reshape(h, k, w, k).mean(axis=(1, 3))
+
+
+def _resample(grid: np.ndarray, rows: int, cols: int) -> np.ndarray:
+    """按面积平均把网格缩放为 rows×cols（网格小于目标时按最近邻放大）"""
+    h, w = grid.shape
+    if h < rows or w < cols:
+        return grid[np.arange(rows) * h // rows][:, np.arange(cols) * w // cols]
+    row_edges = np.arange(rows) * h // rows
+    col_edges = np.arange(cols) * w // cols
+    sums = np.add.reduceat(np.add.reduceat(grid, row_edges, axis=0), col_edges, axis=1)
+    counts = np.outer(np.diff(np.append(row_edges, h)), np.diff(np.append(col_edges, w)))
+    return sums / counts
+
+
+def _inner(grid: np.ndarray) -> np.ndarray:
+    """去掉四周 MARGIN_RATIO 的边缘"""
+    h, w = grid.shape
+    mh, mw = int(h * MARGIN_RATIO), int(w * MARGIN_RATIO)
+    return grid[mh:h - mh, mw:w - mw]
+
+
+def _ink_coverage(inner: np.ndarray, paper: float) -> float:
+    if inner.size == 0:
+        return 0.0
+    return float(np.count_nonzero(inner < paper - INK_DELTA)) / inner.size
+
+
+def _levels(inner: np.ndarray, paper: float) -> np.ndarray:
+    """FINE_SIZE² 格比纸张底色暗的程度，按 LEVEL_STEP 分为 16 档，每字节存两格"""
+    if inner.size == 0:
+        return np.zeros(FINE_SIZE * FINE_SIZE // 2, dtype=np.uint8)
+    cells = _resample(inner, FINE_SIZE, FINE_SIZE).ravel()
+    # 非负数截断即向下取整（浮点整除慢得多）
+    levels = (np.clip(paper - cells, 0, 16 * LEVEL_STEP - 1) * (1 / LEVEL_STEP)).astype(np.uint8)
+    return (levels[0::2] << 4) | levels[1::2]
+
+
+def _region_diff(levels_a: np.ndarray, levels_b: np.ndarray) -> int:
+    """两页深浅相差 MIN_LEVEL_DIFF 档以上的格子在任一区域内的最大个数"""
+    if np.array_equal(levels_a, levels_b):
+        return 0
+    half = REGION_CELLS // 2
+    blocks = 0
+    # 高 4 位是偶数列、低 4 位是奇数列，分别统计后相加，不必先解包
+    for shift in (4, 0):
+        a, b = (levels_a >> shift) & 15, (levels_b >> shift) & 15
+        strong = (np.maximum(a, b) - np.minimum(a, b)) >= MIN_LEVEL_DIFF
+        blocks = blocks + strong.reshape(FINE_SIZE // half, half, FINE_SIZE // half, half // 2).sum(axis=(1, 3))
+    regions = blocks[:-1, :-1] + blocks[1:, :-1] + blocks[:-1, 1:] + blocks[1:, 1:]
+    return int(regions.max())
+
+
+def _dhash(grid: np.ndarray) -> np.ndarray:
+    cells = _resample(grid, HASH_SIZE, HASH_SIZE + 1)
+    return np.packbits(cells[:, 1:] > cells[:, :-1] + HASH_MIN_STEP)
+
+
+class PageFilter:
+    def __init__(
+        self,
+        blank: str = "skip",
+        dedupe: bool = False,
+        min_ink: float = DEFAULT_MIN_INK,
+        max_distance: int = DEFAULT_MAX_DISTANCE,
+        max_region_diff: int = DEFAULT_MAX_REGION_DIFF,
+        memory: int = DEFAULT_MEMORY,
+        max_result_bytes: int = DEFAULT_MAX_RESULT_BYTES,
+    ):
+        if blank not in BLANK_MODES:
+            raise ValueError(f"不支持的空白页处理方式: {blank}（可选 {', '.join(BLANK_MODES)}）")
+        self.blank = blank
+        self.dedupe = dedupe
+        self.min_ink = min_ink
+        self.max_distance = max_distance
+        self.max_region_diff = max_region_diff
+        self.memory = memory
+        self.max_result_bytes = max_result_bytes
+        self.records: List[dict] = []
+        self.pages_checked = 0
+        self._lock = threading.Lock()
+        # 登记的页：环形缓冲区，_count 个有效槽位，下一页写入 _slot
+        slots = memory if dedupe else 0
+        self._keys: List[Optional[str]] = [None] * slots
+        self._ids: List[int] = [0] * slots
+        self._sizes: List[Optional[tuple]] = [None] * slots
+        self._hashes = np.zeros((slots, HASH_SIZE * HASH_SIZE // 8), dtype=np.uint8)
+        self._levels = np.zeros((slots, FINE_SIZE * FINE_SIZE // 2), dtype=np.uint8)
+        self._count = 0
+        self._slot = 0
+        self._next_id = 0
+        self._results: "OrderedDict[int, tuple]" = OrderedDict()  # 登记序号 -> (结果, 字节数)
+        self._result_bytes = 0
+
+    def config(self) -> dict:
+        """构造参数，供工作进程创建相同设置的过滤器"""
+        return {
+            "blank": self.blank, "dedupe": self.dedupe, "min_ink": self.min_ink,
+            "max_distance": self.max_distance, "max_region_diff": self.max_region_diff,
+            "memory": self.memory, "max_result_bytes": self.max_result_bytes,
+        }
+
+    @property
+    def skip_blank(self) -> bool:
+        return self.blank == "skip"
+
+    # ---- 分析 ----
+    def check_pixmap(self, pix, file: str, page: int) -> PageVerdict:
+        """分析 fitz pixmap（直接读取其样本缓冲区）"""
+        return self._check(_gray_grid(pix.samples_mv, pix.width, pix.height, pix.n, pix.stride), (pix.width, pix.height), file, page)
+
+    def check_image(self, img, file: str, page: int) -> PageVerdict:
+        """分析 PIL 图像（图片文件、OCR 渲染结果）"""
+        if img.mode not in ("L", "RGB"):
+            img = img.convert("RGB")
+        n = 1 if img.mode == "L" else 3
+        return self._check(_gray_grid(img.tobytes(), img.width, img.height, n, img.width * n), img.size, file, page)
+
+    def _check(self, fine: np.ndarray, size: tuple, file: str, page: int) -> PageVerdict:
+        grid = _pool(fine)
+        inner = _inner(grid)
+        paper = float(np.percentile(inner, 90)) if inner.size else 255.0
+        coverage = _ink_coverage(inner, paper)
+        verdict = PageVerdict(
+            file, page, size, coverage, self.blank != "keep" and coverage < self.min_ink, _dhash(grid),
+            _levels(_inner(fine), paper),
+        )
+        with self._lock:
+            self.pages_checked += 1
+            if verdict.blank:
+                self._record(verdict, BLANK_SKIPPED if self.skip_blank else BLANK_FLAGGED)
+        self.match(verdict)
+        return verdict
+
+    def _closest(self, verdict: PageVerdict, hashes: np.ndarray, levels: np.ndarray, sizes: List[tuple]):
+        """在候选页中找与 verdict 近似的页，返回 (候选序号, 汉明距离)，没有时为 None。
+
+        哈希只用来挑候选（空白较多的页哈希几乎全为 0，单凭距离分不开），是否重复由逐格比较决定。
+        """
+        distances = np.unpackbits(hashes ^ verdict.hash, axis=1).sum(axis=1)
+        for k in np.argsort(distances, kind="stable")[:MAX_CANDIDATES]:
+            if distances[k] > self.max_distance:
+                break
+            if sizes[k] != verdict.size:
+                continue
+            if _region_diff(verdict.levels, levels[k]) <= self.max_region_diff:
+                return int(k), int(distances[k])
+        return None
+
+    def match(self, verdict: PageVerdict) -> bool:
+        """与已登记的页比较，找到近似页时记在 verdict 上，供 reuse() 取结果。
+
+        check_* 已比较过一次；分析之后才处理的页（如流水线中排队的页）可在处理前再比较一次。
+        """
+        if not self.dedupe or verdict.blank or verdict.duplicate_of is not None:
+            return verdict.match is not None
+        with self._lock:
+            if not self._count:
+                return False
+            n = self._count
+            found = self._closest(verdict, self._hashes[:n], self._levels[:n], self._sizes)
+            if found is None:
+                return False
+            k, verdict.distance = found
+            verdict.duplicate_of = self._keys[k]
+            verdict.match = self._ids[k]
+        return True
+
+    def match_batch(self, verdicts: List[Optional[PageVerdict]]) -> Dict[int, int]:
+        """同时处理的一组页之间互相比较（它们都还没有登记，match() 找不到彼此）。
+
+        返回 {序号: 与之近似的前面那页的序号}；调用方只处理前面那页，再用 reuse_from() 复用其结果。
+        None、空白页和已与登记页匹配的页不参与。
+        """
+        if not self.dedupe:
+            return {}
+        copies: Dict[int, int] = {}
+        sources: List[int] = []
+        for k, verdict in enumerate(verdicts):
+            if verdict is None or verdict.blank or verdict.duplicate_of is not None:
+                continue
+            if sources:
+                found = self._closest(
+                    verdict,
+                    np.stack([verdicts[j].hash for j in sources]),
+                    np.stack([verdicts[j].levels for j in sources]),
+                    [verdicts[j].size for j in sources],
+                )
+                if found is not None:
+                    copies[k] = sources[found[0]]
+                    verdict.distance = found[1]
+                    continue
+            sources.append(k)
+        return copies
+
+    # ---- 结果复用 ----
+    def reuse(self, verdict: PageVerdict) -> Optional[Any]:
+        """近似页已登记的结果；复用时记入报告"""
+        if verdict.match is None:
+            return None
+        with self._lock:
+            entry = self._results.get(verdict.match)
+            if entry is None:
+                return None  # 结果已被淘汰或原页处理失败
+            self._results.move_to_end(verdict.match)
+            self._record(verdict, DUPLICATE_REUSED)
+        return entry[0]
+
+    def reuse_from(self, verdict: PageVerdict, source: PageVerdict, result: Any) -> Any:
+        """复用同一组中近似页（见 match_batch）的结果并记入报告"""
+        verdict.duplicate_of = source.key
+        with self._lock:
+            self._record(verdict, DUPLICATE_REUSED)
+        return result
+
+    def remember(self, verdict: PageVerdict, result: Any, nbytes: int = 0):
+        """登记一页及其处理结果，后面近似的页可以复用；空白页和复用得到的页不登记"""
+        if not self.dedupe or not self.memory or verdict.blank or verdict.duplicate_of is not None:
+            return
+        with self._lock:
+            # 写入下一个槽位，缓冲区满后覆盖最早登记的页
+            k = self._slot
+            self._next_id += 1
+            self._ids[k], self._keys[k], self._sizes[k] = self._next_id, verdict.key, verdict.size
+            self._hashes[k], self._levels[k] = verdict.hash, verdict.levels
+            self._slot = (k + 1) % self.memory
+            self._count = min(self._count + 1, self.memory)
+            self._results[self._next_id] = (result, nbytes)
+            self._result_bytes += nbytes
+            while self._results and (len(self._results) > self.memory or self._result_bytes > self.max_result_bytes):
+                _, (_, size) = self._results.popitem(last=False)
+                self._result_bytes -= size
+
+    # ---- 报告 ----
+    def _record(self, verdict: PageVerdict, action: str):
+        self.records.append({
+            "file": verdict.file, "page": verdict.page, "action": action,
+            "coverage": round(verdict.coverage, 5), "duplicate_of": verdict.duplicate_of, "distance": verdict.distance,
+        })
+
+    def take_records(self) -> Tuple[List[dict], int]:
+        """取出并清空记录和已分析页数（工作进程把记录交回主进程时使用）"""
+        with self._lock:
+            records, self.records = self.records, []
+            pages, self.pages_checked = self.pages_checked, 0
+        return records, pages
+
+    def add_records(self, records: List[dict], pages: int = 0):
+        with self._lock:
+            self.records.extend(records)
+            self.pages_checked += pages
+
+    def counts(self, file: Optional[str] = None) -> Dict[str, int]:
+        """各处理方式的页数，file 不为空时只统计该文件"""
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for r in self.records:
+                if file is None or r["file"] == file:
+                    counts[r["action"]] = counts.get(r["action"], 0) + 1
+        return counts
+
+    def describe(self, file: Optional[str] = None) -> str:
+        counts = self.counts(file)
+        return "，".join(f"{_ACTION_LABELS[a]} {counts[a]} 页" for a in _ACTION_LABELS if a in counts)
+
+    def write_report(self, folder: Path) -> Optional[Path]:
+        """把记录写到 folder/page_filter_<时间>.csv 并返回路径；没有记录时不写，返回 None"""
+        with self._lock:
+            records = sorted(self.records, key=lambda r: (r["file"], r["page"]))
+        if not records:
+            return None
+        path = folder / time.strftime("page_filter_%Y%m%d_%H%M%S.csv")
+        # utf-8-sig：Excel 直接打开不乱码
+        with open(path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["file", "page", "action", "coverage", "duplicate_of", "distance"])
+            writer.writeheader()
+            writer.writerows(records)
+        return path
+
+    def save_report(self, folder: Path) -> str:
+        """写出报告（见 write_report），返回汇总文字（含文件路径）"""
+        summary = self.describe()
+        if not summary:
+            return f"🧹 页面预筛：{self.pages_checked} 页中未发现空白页或重复页"
+        try:
+            path = self.write_report(folder)
+        except OSError as e:
+            return f"🧹 页面预筛：{summary}\n⚠️ 预筛报告写入失败: {e}"
+        return f"🧹 页面预筛：{summary}\n📄 预筛报告: {path}"
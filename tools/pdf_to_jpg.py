@@ -1,68 +1,825 @@
 # tools/pdf_to_jpg.py
+import io
+import itertools
+import math
 import os
 import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import List, Tuple
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple
 import fitz  # PyMuPDF
 from PIL import Image
-import io
-import flet as ft
 
+from . import trace
+from .jobs import JobCancelled, format_progress, get_job_runner
+from .log_view import LogView
+from .progress_log import ProgressLog
+from .archive import ARCHIVE_FORMATS, PageArchive
+from .manifest import OutputManifest, atomic_write_bytes, load_manifest, source_fingerprint
+from .scanner import DirectoryScanner
+from .watcher import FolderWatcher
 
-def convert_single_pdf(pdf_path: Path, output_dir: Path, status_callback=None) -> Tuple[bool, str]:
-    """转换单个 PDF 到 JPG，使用 fitz 渲染，图片命名为 <PDF文件名>_001.jpg"""
-    try:
-        target_folder = output_dir / pdf_path.stem
-        target_folder.mkdir(parents=True, exist_ok=True)
+if TYPE_CHECKING:
+    import flet as ft
 
-        if status_callback:
-            status_callback(f"正在转换 {pdf_path.name}...")
+    from .page_filter import PageFilter
 
-        # 打开 PDF 并提前获取页数（关键！避免关闭后访问）
-        doc = fitz.open(pdf_path)
-        page_count = len(doc)
-        pdf_stem = pdf_path.stem
+TOOL_NAME = "PDF转JPG"
+TOOL_ICON = "picture_as_pdf"  # Flet 图标名，即 ft.Icons.PICTURE_AS_PDF
+
+
+# 以下字段只影响本次运行方式或输出的容器，不影响每页图像内容，不写入清单
+_RUN_ONLY_FIELDS = ("resume", "hash_source", "archive")
+# 串行模式下每渲染多少页落盘一次清单
+_MANIFEST_FLUSH_PAGES = 10
+PDF_EXTENSIONS = {".pdf"}
+# 输出格式 -> 文件扩展名
+IMAGE_FORMATS = {"JPEG": "jpg", "WEBP": "webp", "PNG": "png", "TIFF": "tif"}
+COLOR_MODES = ("RGB", "L")
+# 单页超出像素预算时的处理方式：降低分辨率 / 切块输出
+OVERSIZE_MODES = ("downscale", "tile")
+# 空白页的处理：keep 不检测 / flag 照常输出并记入报告 / skip 不输出（与 page_filter.BLANK_MODES 相同）
+BLANK_PAGE_MODES = ("keep", "flag", "skip")
+# 默认单页像素上限（1 亿像素，RGB 约 300 MB）：普通页面远达不到，只约束超大幅面
+DEFAULT_MAX_PIXELS = 100_000_000
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    """一种输出：由同一次栅格化得到的图像在内存中缩放/转换后编码，不重新渲染。
+
+    name 为文件名后缀：<PDF名>_001_<name>.<扩展名>，为空时是 <PDF名>_001.<扩展名>；
+    max_size 为长边像素上限（None 为渲染原尺寸），format 见 IMAGE_FORMATS，
+    mode 为 RGB 或 L（灰度），quality 为 JPEG/WebP 质量（None 时取 RenderOptions.quality）。
+    """
+    name: str = ""
+    format: str = "JPEG"
+    max_size: Optional[int] = None
+    mode: str = "RGB"
+    quality: Optional[int] = None
+
+    def __post_init__(self):
+        fmt = {"JPG": "JPEG", "TIF": "TIFF"}.get(self.format.upper(), self.format.upper())
+        object.__setattr__(self, "format", fmt)
+        object.__setattr__(self, "mode", self.mode.upper())
+        if fmt not in IMAGE_FORMATS:
+            raise ValueError(f"不支持的输出格式: {self.format}（可选 {', '.join(IMAGE_FORMATS)}）")
+        if self.mode not in COLOR_MODES:
+            raise ValueError(f"不支持的颜色模式: {self.mode}（可选 RGB、L）")
+        if self.max_size is not None and self.max_size < 1:
+            raise ValueError(f"尺寸必须为正数: {self.max_size}")
+
+    @classmethod
+    def parse(cls, spec: str) -> "OutputProfile":
+        """从 "name=thumb,size=400,format=webp,mode=L,quality=80" 形式的字符串创建"""
+        fields = {}
+        for part in filter(None, (p.strip() for p in spec.split(","))):
+            key, sep, value = part.partition("=")
+            key = key.strip().lower()
+            if not sep or key not in ("name", "size", "format", "mode", "quality"):
+                raise ValueError(f"无法识别的输出参数: {part}")
+            value = value.strip()
+            if key == "size":
+                fields["max_size"] = int(value)
+            elif key == "quality":
+                fields["quality"] = int(value)
+            else:
+                fields[key] = value
+        return cls(**fields)
+
+    def filename(self, pdf_stem: str, page_no: int, tile: Optional[Tuple[int, int]] = None) -> str:
+        """tile 为 (行, 列)（从 1 开始）时是切块文件名：<PDF名>_001[_name]_r01c02.<扩展名>"""
+        suffix = f"_{self.name}" if self.name else ""
+        if tile:
+            suffix += f"_r{tile[0]:02d}c{tile[1]:02d}"
+        return f"{pdf_stem}_{str(page_no).zfill(3)}{suffix}.{IMAGE_FORMATS[self.format]}"
+
+    def save_params(self, default_quality: int) -> dict:
+        quality = self.quality or default_quality
+        if self.format in ("JPEG", "WEBP"):
+            return {"quality": quality}
+        if self.format == "TIFF":
+            return {"compression": "tiff_deflate"}
+        return {}
+
+
+# 默认输出：渲染原尺寸的 RGB JPEG，<PDF名>_001.jpg
+DEFAULT_PROFILE = OutputProfile()
+# 界面上可勾选的附加输出
+EXTRA_PROFILES = {
+    "缩略图（长边 400px）": OutputProfile("thumb", max_size=400, quality=80),
+    "WebP（原尺寸）": OutputProfile(format="WEBP"),
+    "灰度 JPEG": OutputProfile("gray", mode="L"),
+}
+
+
+@dataclass(frozen=True)
+class RenderOptions:
+    """渲染参数：dpi 为输出分辨率（PDF 原生 72 DPI，144 即 2 倍），quality 为 JPEG 质量。
+
+    profiles 为每页的输出列表（见 OutputProfile），为空时只输出 DEFAULT_PROFILE；
+    所有输出共用一次栅格化。
+    archive 为 "zip" / "cbz" 时每个 PDF 输出为 <输出目录>/<PDF名>.<archive> 一个归档，
+    而不是 <输出目录>/<PDF名>/ 下每页一个文件。
+    max_pixels 为单页渲染的像素上限（None 为不限），用来约束每个进程的内存峰值；超出时按 oversize
+    处理："downscale" 降低该页分辨率到预算以内，"tile" 保持分辨率，切成不超过预算的块分别输出。
+    blank_pages 见 BLANK_PAGE_MODES，dedupe 为 True 时与前面近似重复的页直接复用其编码结果，
+    两者都在编码之前用 NumPy 分析渲染像素（见 tools/page_filter.py）；skip 跳过的页在清单中记为没有输出文件。
+    resume 为 True 时按输出目录中的清单（归档模式下为归档内的索引）跳过已完成的部分；
+    hash_source 为 True 时用源文件内容哈希（而不只是大小和修改时间）判断源文件是否变化。
+    """
+    dpi: int = 144
+    quality: int = 95
+    resume: bool = True
+    hash_source: bool = False
+    profiles: Tuple[OutputProfile, ...] = ()
+    archive: Optional[str] = None
+    max_pixels: Optional[int] = DEFAULT_MAX_PIXELS
+    oversize: str = "downscale"
+    blank_pages: str = "keep"
+    dedupe: bool = False
+
+    def __post_init__(self):
+        names = [p.filename("", 1) for p in self.output_profiles()]
+        if len(set(names)) != len(names):
+            raise ValueError("多个输出的文件名相同，请为它们设置不同的 name")
+        if self.archive is not None and self.archive not in ARCHIVE_FORMATS:
+            raise ValueError(f"不支持的归档格式: {self.archive}（可选 {', '.join(ARCHIVE_FORMATS)}）")
+        if self.oversize not in OVERSIZE_MODES:
+            raise ValueError(f"不支持的超大页面处理方式: {self.oversize}（可选 {', '.join(OVERSIZE_MODES)}）")
+        if self.max_pixels is not None and self.max_pixels < 1:
+            raise ValueError(f"像素上限必须为正数: {self.max_pixels}")
+        if self.blank_pages not in BLANK_PAGE_MODES:
+            raise ValueError(f"不支持的空白页处理方式: {self.blank_pages}（可选 {', '.join(BLANK_PAGE_MODES)}）")
+
+    @property
+    def zoom(self) -> float:
+        return self.dpi / 72
+
+    @property
+    def matrix(self) -> "fitz.Matrix":
+        return fitz.Matrix(self.zoom, self.zoom)
+
+    def output_profiles(self) -> Tuple[OutputProfile, ...]:
+        return self.profiles or (DEFAULT_PROFILE,)
+
+    def manifest_settings(self) -> dict:
+        """写入清单的输出相关参数，任一变化都会导致整份 PDF 重新渲染"""
+        settings = {k: v for k, v in asdict(self).items() if k not in _RUN_ONLY_FIELDS}
+        # 只有默认输出时不写 profiles，旧清单仍然有效
+        settings.pop("profiles")
+        if self.output_profiles() != (DEFAULT_PROFILE,):
+            settings["profiles"] = [asdict(p) for p in self.profiles]
+        # 像素预算为默认值时同样不写入，旧清单仍然有效
+        if (self.max_pixels, self.oversize) == (DEFAULT_MAX_PIXELS, "downscale"):
+            del settings["max_pixels"], settings["oversize"]
+        # 只标记空白页不改变输出；跳过空白页、复用重复页时才写入
+        if self.blank_pages != "skip":
+            del settings["blank_pages"]
+        if not self.dedupe:
+            del settings["dedupe"]
+        return settings
+
+    def page_filter(self) -> Optional["PageFilter"]:
+        """需要预筛时创建页面过滤器（需要 NumPy），否则为 None"""
+        if self.blank_pages == "keep" and not self.dedupe:
+            return None
+        from .page_filter import PageFilter
+        return PageFilter(blank=self.blank_pages, dedupe=self.dedupe)
+
+
+def pixmap_to_image(pix) -> Image.Image:
+    """直接引用 pixmap 的样本缓冲区构建 PIL 图像，不经过 PPM 编解码也不复制像素。
+
+    返回的图像与 pix 共享内存，使用期间必须保持 pix 存活；需要长期持有时请 copy()。
+    """
+    mode = "L" if pix.n == 1 else "RGB"
+    return Image.frombuffer(mode, (pix.width, pix.height), pix.samples_mv, "raw", mode, pix.stride, 1)
+
+
+def _target_size(size: Tuple[int, int], max_size: Optional[int]) -> Tuple[int, int]:
+    w, h = size
+    if not max_size or max(w, h) <= max_size:
+        return size
+    scale = max_size / max(w, h)
+    return max(1, round(w * scale)), max(1, round(h * scale))
+
+
+def _derive_images(img: Image.Image, profiles: Tuple[OutputProfile, ...], pdf_stem: str, page_no: int):
+    """按各输出的尺寸和颜色模式从同一张渲染图派生图像，产出 (输出序号, 图像)。
+
+    从大到小处理，每个尺寸从已有的、不小于它的最小图像继续缩小，缩略图不必从整页大图重新缩放。
+    """
+    sized = {img.size: img}
+    targets = [_target_size(img.size, p.max_size) for p in profiles]
+    for k in sorted(range(len(profiles)), key=lambda k: -targets[k][0] * targets[k][1]):
+        size = targets[k]
+        if size not in sized:
+            source = min(
+                (im for (w, h), im in sized.items() if w >= size[0] and h >= size[1]),
+                key=lambda im: im.size[0] * im.size[1],
+            )
+            with trace.span("image.resize", file=pdf_stem, page=page_no):
+                sized[size] = source.resize(size, Image.LANCZOS, reducing_gap=2.0)
+        out = sized[size]
+        if out.mode != profiles[k].mode:
+            out = out.convert(profiles[k].mode)
+        yield k, out
 
-        for i, page in enumerate(doc):
-            # 提高分辨率（约 150–200 DPI）
-            mat = fitz.Matrix(2.0, 2.0)
-            pix = page.get_pixmap(matrix=mat, alpha=False)  # RGB 模式
 
-            # 转为 PIL Image
-            img_data = pix.tobytes("ppm")
-            img = Image.open(io.BytesIO(img_data))
-            if img.mode != "RGB":
-                img = img.convert("RGB")
+def _encode_image(
+    img: Image.Image, profile: OutputProfile, filename: str, pdf_stem: str, page_no: int, options: RenderOptions
+) -> Tuple[str, bytes]:
+    buf = io.BytesIO()
+    with trace.span(f"{profile.format.lower()}.encode", file=pdf_stem, page=page_no):
+        img.save(buf, profile.format, **profile.save_params(options.quality))
+    return filename, buf.getvalue()
 
-            img_filename = f"{pdf_stem}_{str(i + 1).zfill(3)}.jpg"
-            img_path = target_folder / img_filename
-            img.save(img_path, "JPEG", quality=95)
 
-        doc.close()  # 安全关闭
+def _encode_page(
+    img: Image.Image, pdf_stem: str, page_no: int, options: RenderOptions,
+    profiles: Optional[Tuple[OutputProfile, ...]] = None,
+) -> List[Tuple[str, bytes]]:
+    """把一页渲染结果编码为各输出（默认 output_profiles()），返回 [(文件名, 编码后的数据)]，顺序与 profiles 一致"""
+    profiles = profiles or options.output_profiles()
+    encoded: List[Optional[Tuple[str, bytes]]] = [None] * len(profiles)
+    for k, out in _derive_images(img, profiles, pdf_stem, page_no):
+        profile = profiles[k]
+        encoded[k] = _encode_image(out, profile, profile.filename(pdf_stem, page_no), pdf_stem, page_no, options)
+    return encoded
+
+
+def _page_size(page, zoom: float) -> Tuple[int, int]:
+    """按 zoom 渲染整页得到的像素尺寸"""
+    rect = page.rect
+    return math.ceil(rect.width * zoom), math.ceil(rect.height * zoom)
+
+
+def _budget_zoom(page, zoom: float, max_pixels: int) -> float:
+    """不超过像素预算的最大缩放比例"""
+    w, h = _page_size(page, zoom)
+    if w * h <= max_pixels:
+        return zoom
+    zoom *= math.sqrt(max_pixels / (w * h))
+    # 尺寸向上取整后可能仍略超预算
+    while zoom > 0 and math.prod(_page_size(page, zoom)) > max_pixels:
+        zoom *= 0.995
+    return zoom
+
+
+def _get_pixmap(page, zoom: float, gray: bool, clip=None):
+    mat = fitz.Matrix(zoom, zoom)
+    if gray:
+        return page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False, clip=clip)
+    return page.get_pixmap(matrix=mat, alpha=False, clip=clip)  # RGB 模式
+
+
+def _tile_clips(page, zoom: float, side: int) -> Iterator[Tuple[Tuple[int, int], "fitz.Rect"]]:
+    """把按 zoom 渲染的整页切成边长不超过 side 像素的块，产出 ((行, 列), 页面坐标中的裁剪区域)"""
+    rect = page.rect
+    w, h = _page_size(page, zoom)
+    for row in range(math.ceil(h / side)):
+        for col in range(math.ceil(w / side)):
+            yield (row + 1, col + 1), fitz.Rect(
+                rect.x0 + col * side / zoom, rect.y0 + row * side / zoom,
+                rect.x0 + min(w, (col + 1) * side) / zoom, rect.y0 + min(h, (row + 1) * side) / zoom,
+            )
+
+
+def _encode_tiled_page(page, pdf_stem: str, page_no: int, gray: bool, options: RenderOptions) -> List[Tuple[str, bytes]]:
+    """超出像素预算的页在 tile 模式下的输出。
+
+    缩小后能放进预算的输出（如缩略图）照常由一次整页渲染得到，只是直接按其尺寸渲染；
+    放不下的输出按各自尺寸切块渲染，每块单独编码为 <PDF名>_001[_name]_r01c02.<扩展名>。
+    任一时刻内存中只有一块（或一张预算内的整页）像素。
+    """
+    profiles = options.output_profiles()
+    full = _page_size(page, options.zoom)
+    targets = [_target_size(full, p.max_size) for p in profiles]
+    fitting = [k for k, (w, h) in enumerate(targets) if w * h <= options.max_pixels]
+    encoded: List[Tuple[str, bytes]] = []
+
+    if fitting:
+        largest = max(targets[k][0] for k in fitting)
+        zoom = min(options.zoom * largest / full[0], _budget_zoom(page, options.zoom, options.max_pixels))
+        with trace.span("pdf.render", file=pdf_stem, page=page_no):
+            pix = _get_pixmap(page, zoom, gray)
+        encoded += _encode_page(pixmap_to_image(pix), pdf_stem, page_no, options, tuple(profiles[k] for k in fitting))
+        del pix  # 切块之前先释放整页像素
+
+    side = math.isqrt(options.max_pixels)
+    by_size: dict = {}
+    for k in range(len(profiles)):
+        if k not in fitting:
+            by_size.setdefault(targets[k], []).append(profiles[k])
+    for (w, _), group in by_size.items():
+        zoom = options.zoom * w / full[0]
+        for tile, clip in _tile_clips(page, zoom, side):
+            with trace.span("pdf.render", file=pdf_stem, page=page_no):
+                pix = _get_pixmap(page, zoom, gray, clip=clip)
+            img = pixmap_to_image(pix)
+            for profile in group:
+                out = img if img.mode == profile.mode else img.convert(profile.mode)
+                encoded.append(
+                    _encode_image(out, profile, profile.filename(pdf_stem, page_no, tile), pdf_stem, page_no, options)
+                )
+            trace.count("tiles_rendered")
+    return encoded
+
+
+def _encoded_pages(
+    doc, pdf_stem: str, pages: Iterable[int], options: RenderOptions, page_filter: Optional["PageFilter"] = None,
+    source: Optional[str] = None,
+) -> Iterator[Tuple[int, List[Tuple[str, bytes]]]]:
+    """渲染 doc 中指定页码（从 0 开始），每页栅格化一次并编码为全部输出，逐页产出 (页码, [(文件名, 数据)])。
+
+    整页像素超出 options.max_pixels 时按 options.oversize 降低分辨率或切块，见 RenderOptions。
+    传入 page_filter 时先分析渲染像素：跳过的空白页产出空列表，近似重复页复用之前的编码结果（切块的页不参与）。
+    source 为预筛记录中标识该 PDF 的路径（默认 pdf_stem），pdf_stem 只用于输出文件名。
+    """
+    # 全部输出都是灰度时直接渲染灰度，省去 RGB 渲染和转换
+    gray = all(p.mode == "L" for p in options.output_profiles())
+    for i in pages:
+        page = doc[i]
+        zoom = options.zoom
+        if options.max_pixels and math.prod(_page_size(page, zoom)) > options.max_pixels:
+            trace.count("pages_over_budget")
+            if options.oversize == "tile":
+                yield i, _encode_tiled_page(page, pdf_stem, i + 1, gray, options)
+                continue
+            zoom = _budget_zoom(page, zoom, options.max_pixels)
+        with trace.span("pdf.render", file=pdf_stem, page=i + 1):
+            pix = _get_pixmap(page, zoom, gray)
+        verdict = None
+        if page_filter:
+            with trace.span("page.filter", file=pdf_stem, page=i + 1):
+                verdict = page_filter.check_pixmap(pix, source or pdf_stem, i + 1)
+            if verdict.blank and page_filter.skip_blank:
+                trace.count("pages_blank_skipped")
+                yield i, []
+                continue
+            reused = page_filter.reuse(verdict)
+            if reused is not None:
+                trace.count("pages_reused")
+                profiles = options.output_profiles()
+                yield i, [(p.filename(pdf_stem, i + 1), data) for p, data in zip(profiles, reused)]
+                continue
+        img = pixmap_to_image(pix)
+        encoded = _encode_page(img, pdf_stem, i + 1, options)
+        if verdict is not None:
+            page_filter.remember(verdict, [data for _, data in encoded], sum(len(data) for _, data in encoded))
+        yield i, encoded
+
+
+def _render_pages(
+    doc, pdf_stem: str, target_folder: Path, pages: Iterable[int], options: RenderOptions,
+    page_filter: Optional["PageFilter"] = None, source: Optional[str] = None,
+) -> Iterator[Tuple[int, List[str]]]:
+    """渲染指定页并原子保存全部输出（默认 <pdf_stem>_001.jpg），逐页产出 (页码, [文件名])"""
+    for i, encoded in _encoded_pages(doc, pdf_stem, pages, options, page_filter, source):
+        # 先编码到内存再原子写盘，编码和磁盘写入可以分开计时
+        files = []
+        for filename, data in encoded:
+            with trace.span("disk.write", file=pdf_stem, page=i + 1):
+                atomic_write_bytes(target_folder / filename, data)
+            trace.count("bytes_written", len(data))
+            files.append(filename)
+        yield i, files
+
+
+def _open_manifest(pdf_path: Path, target_folder: Path, page_count: int, options: RenderOptions) -> OutputManifest:
+    settings = options.manifest_settings()
+    if options.resume:
+        return load_manifest(pdf_path, target_folder, settings, page_count, options.hash_source)
+    return OutputManifest(target_folder, source_fingerprint(pdf_path, options.hash_source), settings, page_count)
+
+
+class _FolderOutput:
+    """每页一个文件：文件由渲染方（本进程或工作进程）直接写入 folder，这里只维护清单"""
+
+    def __init__(self, pdf_path: Path, output_dir: Path, page_count: int, options: RenderOptions):
+        self.folder = output_dir / pdf_path.stem
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.stem = pdf_path.stem
+        self.manifest = _open_manifest(pdf_path, self.folder, page_count, options)
+
+    def pending(self) -> List[int]:
+        return self.manifest.pending()
+
+    def add(self, page_index: int, files: List[str]):
+        self.manifest.mark_done(page_index, files)
+
+    def flush(self):
+        with trace.span("manifest.save", file=self.stem):
+            self.manifest.save()
+
+    def close(self):
+        self.flush()
+
+    def abort(self):
+        # 已完成的页保留在清单中，下次从断点继续
+        self.flush()
+
+
+class _ArchiveOutput:
+    """整个 PDF 写进一个归档：渲染方只返回编码后的数据，由本进程按页写入"""
+
+    folder = None
+
+    def __init__(self, pdf_path: Path, output_dir: Path, page_count: int, options: RenderOptions):
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.stem = pdf_path.stem
+        self.archive = PageArchive(
+            output_dir / f"{pdf_path.stem}.{options.archive}",
+            source_fingerprint(pdf_path, options.hash_source), options.manifest_settings(), page_count,
+        )
+        self.up_to_date = options.resume and self.archive.is_current()
+        self._opened = False
+
+    def pending(self) -> List[int]:
+        """归档只能整体重写：已是最新时为空，否则为全部页"""
+        if self.up_to_date:
+            return []
+        if not self._opened:
+            self.archive.open()
+            self._opened = True
+        return list(range(self.archive.page_count))
 
-        return True, f"✅ {pdf_path.name} → {page_count} 页"
+    def add(self, page_index: int, files: List[Tuple[str, bytes]]):
+        with trace.span("archive.write", file=self.stem, page=page_index + 1):
+            self.archive.add(page_index, files)
+        trace.count("bytes_written", sum(len(data) for _, data in files))
 
+    def flush(self):
+        pass
+
+    def close(self):
+        if self._opened:
+            with trace.span("archive.close", file=self.stem):
+                self.archive.close()
+
+    def abort(self):
+        self.archive.abort()
+
+
+def _open_output(pdf_path: Path, output_dir: Path, page_count: int, options: RenderOptions):
+    if options.archive:
+        return _ArchiveOutput(pdf_path, output_dir, page_count, options)
+    return _FolderOutput(pdf_path, output_dir, page_count, options)
+
+
+def _render_to(
+    doc, pdf_stem: str, folder: Optional[Path], pages: Iterable[int], options: RenderOptions,
+    page_filter: Optional["PageFilter"] = None, source: Optional[str] = None,
+):
+    """folder 不为空时直接写文件并产出 (页码, [文件名])，否则产出 (页码, [(文件名, 数据)]) 交给归档"""
+    if folder is not None:
+        return _render_pages(doc, pdf_stem, folder, pages, options, page_filter, source)
+    return _encoded_pages(doc, pdf_stem, pages, options, page_filter, source)
+
+
+def _done_message(pdf_path: Path, page_count: int, rendered: int, filtered: str = "") -> str:
+    if rendered == 0 and page_count > 0:
+        return f"⏭️ {pdf_path.name} 已是最新（{page_count} 页），跳过"
+    if rendered < page_count:
+        msg = f"✅ {pdf_path.name} → {page_count} 页（续转 {rendered} 页）"
+    else:
+        msg = f"✅ {pdf_path.name} → {page_count} 页"
+    return msg + (f"；{filtered}" if filtered else "")
+
+
+def convert_single_pdf(
+    pdf_path: Path,
+    output_dir: Path,
+    status_callback=None,
+    options: Optional[RenderOptions] = None,
+    page_callback=None,
+    page_filter: Optional["PageFilter"] = None,
+) -> Tuple[bool, str]:
+    """转换单个 PDF 到 JPG，使用 fitz 渲染，图片命名为 <PDF文件名>_001.jpg。
+
+    输出目录中的清单记录已完成的页，重跑时只渲染缺失或已过期的页；
+    options.archive 设置时输出为 <output_dir>/<PDF文件名>.zip（或 .cbz）一个归档。
+    page_callback(n) 在每渲染完 n 页后调用，可在其中抛出 JobCancelled 中止转换。
+    options.blank_pages / dedupe 需要预筛时，传入的 page_filter 可在多个 PDF 之间共用
+    （跨文件识别重复页，并汇总为一份报告），不传时为本 PDF 单独创建一个。
+    """
+    options = options or RenderOptions()
+    page_filter = page_filter or options.page_filter()
+    try:
+        if status_callback:
+            status_callback(f"正在转换 {pdf_path.name}...")
+
+        # 打开 PDF 并提前获取页数（关键！避免关闭后访问）
+        with trace.span("pdf.open", file=pdf_path.stem):
+            doc = fitz.open(pdf_path)
+        try:
+            page_count = len(doc)
+            output = _open_output(pdf_path, output_dir, page_count, options)
+            pending = output.pending()
+            try:
+                rendered = _render_to(doc, pdf_path.stem, output.folder, pending, options, page_filter, str(pdf_path))
+                for n, (i, result) in enumerate(rendered, 1):
+                    output.add(i, result)
+                    if n % _MANIFEST_FLUSH_PAGES == 0:
+                        output.flush()
+                    if page_callback:
+                        page_callback(1)
+            except BaseException:
+                # 出错时清单保留已完成的页，写了一半的归档则丢弃
+                output.abort()
+                raise
+            output.close()
+        finally:
+            doc.close()  # 安全关闭
+
+        filtered = page_filter.describe(str(pdf_path)) if page_filter else ""
+        return True, _done_message(pdf_path, page_count, len(pending), filtered)
+
+    except JobCancelled:
+        raise
     except Exception as e:
         error_msg = str(e)
         msg = f"❌ {pdf_path.name} 转换失败:\n{error_msg}"
         return False, msg
 
 
+# 工作进程内的页面过滤器，在该进程处理的各分片之间共用，以便识别跨分片、跨文件的重复页
+_worker_filter: Optional["PageFilter"] = None
+
+
+def _get_worker_filter(config: dict) -> "PageFilter":
+    global _worker_filter
+    if _worker_filter is None or _worker_filter.config() != config:
+        from .page_filter import PageFilter
+        _worker_filter = PageFilter(**config)
+    return _worker_filter
+
+
+def _render_page_list(
+    pdf_path: Path, folder: Optional[Path], pages: List[int], options: RenderOptions, traced: bool = False,
+    filter_config: Optional[dict] = None,
+) -> Tuple[list, Optional[tuple], Optional[tuple]]:
+    """进程池工作函数：渲染指定页，返回每页的结果、计时记录以及预筛记录。
+
+    folder 不为空时直接写文件，结果为 (页码, [文件名])；为空时（归档模式）结果为
+    (页码, [(文件名, 数据)])，由主进程写入归档。
+    traced 为 True 时在本进程内记录各阶段耗时，连同计数一起返回 (events, counters)，否则为 None。
+    filter_config 为 PageFilter 的参数，不为空时预筛各页，并把本分片的 (预筛记录, 分析页数) 交回主进程。
+    """
+    tracer = trace.start() if traced else None
+    page_filter = _get_worker_filter(filter_config) if filter_config else None
+    try:
+        with trace.span("pdf.open", file=pdf_path.stem):
+            doc = fitz.open(pdf_path)
+        try:
+            rendered = list(_render_to(doc, pdf_path.stem, folder, pages, options, page_filter, str(pdf_path)))
+        finally:
+            doc.close()
+    finally:
+        if tracer:
+            trace.stop()
+    records = page_filter.take_records() if page_filter else None
+    return rendered, (tracer.events, tracer.counters) if tracer else None, records
+
+
+def default_workers() -> int:
+    """默认并行进程数：CPU 核心数"""
+    return os.cpu_count() or 1
+
+
+def convert_pdfs_parallel(
+    jobs: Iterable[Tuple[Path, Path]],
+    workers: Optional[int] = None,
+    chunk_size: int = 8,
+    options: Optional[RenderOptions] = None,
+    page_callback=None,
+    page_filter: Optional["PageFilter"] = None,
+) -> Iterator[Tuple[Path, bool, str, float]]:
+    """多进程按页分片批量转换。
+
+    jobs 为 (pdf_path, output_dir) 序列，每个 PDF 的待渲染页被切成 chunk_size 页一组的分片，
+    分片跨文件交给进程池并行渲染；某个 PDF 的全部分片完成后产出
+    (pdf_path, ok, msg, seconds)，ok/msg 与 convert_single_pdf 的返回值含义一致，
+    seconds 为该文件从打开到最后一个分片完成的时间（其间与其他文件的分片交错执行）。
+    jobs 按需读取，在途分片数有上限，因此可以传入很长的生成器。
+    清单由主进程维护，每完成一个分片落盘一次；归档模式下工作进程只编码，
+    由主进程把各分片写入归档。
+    page_callback(n) 在每个分片完成后以该分片页数调用；生成器被中途关闭或回调抛出
+    异常（如 JobCancelled）时，尚未开始的分片会被取消。
+    预筛（见 convert_single_pdf）在各工作进程中进行，重复页只在同一进程处理过的页之间识别；
+    各进程的预筛记录汇总到 page_filter。
+    """
+    options = options or RenderOptions()
+    page_filter = page_filter or options.page_filter()
+    filter_config = page_filter.config() if page_filter else None
+    workers = max(1, workers or default_workers())
+    max_inflight = workers * 4
+    tracer = trace.active()  # 主进程开启计时时，工作进程也记录并随结果传回
+    jobs = iter(jobs)
+    jobs_done = False
+    backlog = deque()  # 待提交分片: (pdf_path, folder, pages)
+    inflight = {}  # future -> pdf_path
+    state = {}  # pdf_path -> {"remaining", "page_count", "rendered", "error", "output", "started"}
+    ready = []
+
+    def finish(pdf_path: Path) -> Tuple[Path, bool, str, float]:
+        entry = state.pop(pdf_path)
+        seconds = time.perf_counter() - entry["started"]
+        if entry["error"]:
+            entry["output"].abort()
+            return pdf_path, False, f"❌ {pdf_path.name} 转换失败:\n{entry['error']}", seconds
+        try:
+            entry["output"].close()
+        except Exception as e:
+            entry["output"].abort()
+            return pdf_path, False, f"❌ {pdf_path.name} 转换失败:\n{e}", seconds
+        filtered = page_filter.describe(str(pdf_path)) if page_filter else ""
+        return pdf_path, True, _done_message(pdf_path, entry["page_count"], entry["rendered"], filtered), seconds
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            while len(inflight) < max_inflight:
+                if backlog:
+                    pdf_path, folder, pages = backlog.popleft()
+                    future = pool.submit(
+                        _render_page_list, pdf_path, folder, pages, options, tracer is not None, filter_config,
+                    )
+                    inflight[future] = pdf_path
+                    continue
+                if jobs_done:
+                    break
+                job = next(jobs, None)
+                if job is None:
+                    jobs_done = True
+                    break
+                pdf_path, output_dir = job
+                started = time.perf_counter()
+                try:
+                    with fitz.open(pdf_path) as doc:
+                        page_count = len(doc)
+                    output = _open_output(pdf_path, output_dir, page_count, options)
+                    pending = output.pending()
+                except Exception as e:
+                    ready.append((pdf_path, False, f"❌ {pdf_path.name} 转换失败:\n{e}", time.perf_counter() - started))
+                    continue
+                if not pending:
+                    output.close()
+                    ready.append((pdf_path, True, _done_message(pdf_path, page_count, 0), time.perf_counter() - started))
+                    continue
+                chunks = [pending[k:k + chunk_size] for k in range(0, len(pending), chunk_size)]
+                state[pdf_path] = {
+                    "remaining": len(chunks), "page_count": page_count, "rendered": len(pending),
+                    "error": None, "output": output, "started": started,
+                }
+                for pages in chunks:
+                    backlog.append((pdf_path, output.folder, pages))
+
+            yield from ready
+            ready.clear()
+            if not inflight:
+                if jobs_done and not backlog:
+                    break
+                continue
+
+            done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+            for future in done:
+                pdf_path = inflight.pop(future)
+                entry = state[pdf_path]
+                entry["remaining"] -= 1
+                try:
+                    pages, worker_trace, filter_records = future.result()
+                    if tracer and worker_trace:
+                        tracer.merge(*worker_trace)
+                    if page_filter and filter_records:
+                        page_filter.add_records(*filter_records)
+                    if not entry["error"]:
+                        for i, result in pages:
+                            entry["output"].add(i, result)
+                        entry["output"].flush()
+                except Exception as e:
+                    entry["error"] = entry["error"] or str(e)
+                else:
+                    if page_callback:
+                        page_callback(len(pages))
+                if entry["remaining"] == 0:
+                    ready.append(finish(pdf_path))
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        # 中途停止时：清单保存已完成的页，写了一半的归档丢弃
+        for entry in state.values():
+            entry["output"].abort()
+
+
+def scan_pdfs(input_path: Path, ordered: bool = False, **filters) -> DirectoryScanner:
+    """流式收集 PDF（单个文件 or 文件夹递归）：边遍历边产出，可直接交给转换队列。
+
+    filters 为 DirectoryScanner 的其余参数（大小、glob 过滤等）。
+    """
+    return DirectoryScanner(input_path, extensions=PDF_EXTENSIONS, ordered=ordered, **filters)
+
+
 def collect_pdfs(input_path: Path) -> List[Path]:
-    """收集所有 PDF 文件（单个文件 or 文件夹递归）"""
-    if input_path.is_file() and input_path.suffix.lower() == ".pdf":
-        return [input_path]
-    elif input_path.is_dir():
-        return sorted(input_path.rglob("*.pdf"))
-    else:
-        return []
+    """收集所有 PDF 文件（单个文件 or 文件夹递归），按路径排序"""
+    return list(scan_pdfs(input_path, ordered=True))
 
 
-def create_pdf_to_jpg_page(page: ft.Page) -> ft.Control:
+def output_dir_for(pdf: Path, input_path: Path, output_path: Path) -> Path:
+    """保持相对结构：输出 = output_path / (pdf 相对于 input_path 的父目录)"""
+    if input_path.is_file():
+        return output_path
+    try:
+        return output_path / pdf.relative_to(input_path).parent
+    except ValueError:
+        return output_path
+
+
+def create_pdf_to_jpg_page(page: "ft.Page") -> "ft.Control":
+    # Flet 只在打开界面时导入，命令行/无界面环境不依赖它
+    import flet as ft
+
     # === 状态控件 ===
     input_path_field = ft.TextField(label="输入路径（PDF 或 文件夹）", read_only=True, width=400)
     output_path_field = ft.TextField(label="输出目录", read_only=True, width=400)
-    status_text = ft.Text("", size=13, selectable=True, expand=True)
+    workers_field = ft.TextField(
+        label="并行进程数",
+        value=str(default_workers()),
+        width=120,
+        keyboard_type=ft.KeyboardType.NUMBER,
+        tooltip="大于 1 时按页分片到多个进程并行渲染",
+    )
+    dpi_dropdown = ft.Dropdown(
+        label="分辨率 (DPI)",
+        options=[ft.dropdown.Option(str(d)) for d in (72, 96, 144, 200, 300)],
+        value=str(RenderOptions.dpi),
+        width=120,
+    )
+    quality_field = ft.TextField(
+        label="JPEG 质量",
+        value=str(RenderOptions.quality),
+        width=120,
+        keyboard_type=ft.KeyboardType.NUMBER,
+    )
+    archive_dropdown = ft.Dropdown(
+        label="输出方式",
+        options=[
+            ft.dropdown.Option(key="", text="文件夹（每页一个文件）"),
+            ft.dropdown.Option(key="zip", text="ZIP 归档（每个 PDF 一个）"),
+            ft.dropdown.Option(key="cbz", text="CBZ 归档（每个 PDF 一个）"),
+        ],
+        value="",
+        width=240,
+    )
+    max_pixels_field = ft.TextField(
+        label="单页像素上限（百万）",
+        value=str(DEFAULT_MAX_PIXELS // 1_000_000),
+        width=170,
+        keyboard_type=ft.KeyboardType.NUMBER,
+        tooltip="超大幅面页面超出上限时的处理方式见右侧；留空为不限制",
+    )
+    oversize_dropdown = ft.Dropdown(
+        label="超出上限时",
+        options=[
+            ft.dropdown.Option(key="downscale", text="降低分辨率"),
+            ft.dropdown.Option(key="tile", text="切块输出"),
+        ],
+        value="downscale",
+        width=150,
+    )
+    blank_dropdown = ft.Dropdown(
+        label="空白页",
+        options=[
+            ft.dropdown.Option(key="keep", text="照常输出"),
+            ft.dropdown.Option(key="flag", text="输出并列入报告"),
+            ft.dropdown.Option(key="skip", text="不输出（列入报告）"),
+        ],
+        value="keep",
+        width=190,
+    )
+    dedupe_checkbox = ft.Checkbox(
+        label="近似重复页复用前面的输出",
+        value=False,
+        tooltip="与前面某页几乎相同（重复插页等）时不再编码，直接复用那一页的图像数据",
+    )
+    resume_checkbox = ft.Checkbox(label="跳过已完成的页（断点续转）", value=True)
+    trace_checkbox = ft.Checkbox(label="记录各阶段耗时（结果写入输出目录）", value=False)
+    watch_checkbox = ft.Checkbox(
+        label="持续监视输入文件夹（新放入的 PDF 自动转换，点“取消”停止）",
+        value=False,
+        tooltip="先转换文件夹中已有的 PDF（已完成的页会跳过），之后每个写完的新文件几秒内开始转换",
+    )
+    # 附加输出与原尺寸 JPEG 共用一次渲染
+    extra_checkboxes = {label: ft.Checkbox(label=label, value=False) for label in EXTRA_PROFILES}
+    # 日志只保留最近若干行，完整日志写入 logs/ 目录；界面按固定帧率刷新
+    log = ProgressLog("pdf_to_jpg")
+    log_view = LogView(log)
+    progress_bar = ft.ProgressBar(value=0, visible=False)
+    progress_text = ft.Text("", size=12, color=ft.Colors.GREY_700)
+    active_jobs = []  # 本页面提交且尚未结束的作业
 
     # === 文件选择器 ===
     file_picker = ft.FilePicker()
@@ -70,13 +827,13 @@ def create_pdf_to_jpg_page(page: ft.Page) -> ft.Control:
     folder_picker_output = ft.FilePicker()
     page.overlay.extend([file_picker, folder_picker_input, folder_picker_output])
 
-    def on_input_result(e: ft.FilePickerResultEvent):
+    def on_input_result(e: "ft.FilePickerResultEvent"):
         path = e.path or (e.files[0].path if e.files else None)
         if path:
             input_path_field.value = path
             input_path_field.update()
 
-    def on_output_result(e: ft.FilePickerResultEvent):
+    def on_output_result(e: "ft.FilePickerResultEvent"):
         if e.path:
             output_path_field.value = e.path
             output_path_field.update()
@@ -99,71 +856,173 @@ def create_pdf_to_jpg_page(page: ft.Page) -> ft.Control:
         output_str = output_path_field.value
 
         if not input_str or not os.path.exists(input_str):
-            status_text.value = "❌ 请输入有效的输入路径（PDF 或 文件夹）"
-            status_text.color = ft.Colors.RED
-            status_text.update()
+            log_view.set_status("❌ 请输入有效的输入路径（PDF 或 文件夹）", ft.Colors.RED)
             return
 
         if not output_str:
-            status_text.value = "❌ 请选择输出目录"
-            status_text.color = ft.Colors.RED
-            status_text.update()
+            log_view.set_status("❌ 请选择输出目录", ft.Colors.RED)
             return
 
         input_p = Path(input_str)
         output_p = Path(output_str)
+        watch = bool(watch_checkbox.value)
+        if watch and not input_p.is_dir():
+            log_view.set_status("❌ 监视模式需要选择文件夹", ft.Colors.RED)
+            return
+        # 边扫描边转换，不必等整个目录树遍历完；文件总数在扫描结束后才确定
+        scanner = scan_pdfs(input_p)
 
-        pdf_list = collect_pdfs(input_p)
-        if not pdf_list:
-            status_text.value = "❌ 未找到任何 PDF 文件"
-            status_text.color = ft.Colors.RED
-            status_text.update()
+        try:
+            workers = max(1, int(workers_field.value or 1))
+            quality = int(quality_field.value or RenderOptions.quality)
+            max_pixels = round(float(max_pixels_field.value) * 1_000_000) if max_pixels_field.value else None
+        except ValueError:
+            log_view.set_status("❌ 并行进程数、JPEG 质量和像素上限必须是数字", ft.Colors.RED)
+            return
+        extras = tuple(EXTRA_PROFILES[label] for label, cb in extra_checkboxes.items() if cb.value)
+        options = RenderOptions(
+            dpi=int(dpi_dropdown.value),
+            quality=min(max(quality, 1), 100),
+            resume=bool(resume_checkbox.value),
+            profiles=(DEFAULT_PROFILE,) + extras if extras else (),
+            archive=archive_dropdown.value or None,
+            max_pixels=max_pixels or None,
+            oversize=oversize_dropdown.value,
+            blank_pages=blank_dropdown.value,
+            dedupe=bool(dedupe_checkbox.value),
+        )
+        traced = bool(trace_checkbox.value)
+        try:
+            # 整次运行共用一个过滤器：跨文件识别重复页，结束时汇总为一份报告
+            page_filter = options.page_filter()
+        except ImportError:
+            log_view.set_status("❌ 空白页/重复页预筛需要安装 numpy", ft.Colors.RED)
             return
 
-        status_text.value = f"🔄 准备转换 {len(pdf_list)} 个 PDF 文件...\n"
-        status_text.color = ft.Colors.BLUE
-        status_text.update()
+        def target_dir(pdf: Path) -> Path:
+            return output_dir_for(pdf, input_p, output_p)
 
-        success_count = 0
-        log_lines = []
+        def run(job):
+            # 在后台作业线程中执行，页与页之间通过 job.report() 响应暂停/取消
+            # 作业真正开始时才清空日志：排队中的作业不会清掉前一个仍在运行的作业的日志
+            log.start()
+            log_view.set_status("🔄 正在扫描并转换 PDF 文件...", ft.Colors.BLUE)
+            def on_pages(n):
+                job.report(pages=n)
+
+            def convert(pdfs):
+                if workers > 1:
+                    return (
+                        (ok, msg) for _, ok, msg, _ in
+                        convert_pdfs_parallel(
+                            ((pdf, target_dir(pdf)) for pdf in pdfs),
+                            workers=workers, options=options, page_callback=on_pages, page_filter=page_filter,
+                        )
+                    )
+                return (
+                    convert_single_pdf(pdf, target_dir(pdf), options=options, page_callback=on_pages, page_filter=page_filter)
+                    for pdf in pdfs
+                )
+
+            watcher = None
+            if watch:
+                # 每批已写完的文件跑一遍转换；等待新文件期间照常响应取消
+                watcher = FolderWatcher(input_p, extensions=PDF_EXTENSIONS).start()
+                log.append(f"👀 正在监视 {input_p}（{watcher.backend}），新放入的 PDF 将自动转换")
+                results = itertools.chain.from_iterable(
+                    convert(batch) for batch in watcher.batches(idle=job.checkpoint)
+                )
+            else:
+                results = convert(scanner)
+
+            success_count = 0
+            processed = 0
+            tracer = trace.start() if traced else None
+
+            def save_reports():
+                if tracer is not None:
+                    log.append(trace.save_report(tracer, output_p))
+                if page_filter is not None:
+                    log.append(page_filter.save_report(output_p))
 
-        for pdf in pdf_list:
-            # 保持相对结构：输出 = output_p / (pdf 相对于 input_p 父目录的路径)
-            try:
-                if input_p.is_file():
-                    rel_parent = Path("")
-                else:
-                    rel_parent = pdf.relative_to(input_p).parent
-                target_output_dir = output_p / rel_parent
-            except ValueError:
-                target_output_dir = output_p
-
-            ok, msg = convert_single_pdf(pdf, target_output_dir)
-            log_lines.append(msg)
-            if ok:
-                success_count += 1
-
-            # 实时更新（限最后10行防卡顿）
-            status_text.value = "\n".join(log_lines[-10:])
-            status_text.update()
-
-        # 汇总 & 自动打开
-        summary = f"\n\n✅ 成功: {success_count}/{len(pdf_list)} 个文件"
-        if success_count > 0:
-            summary += f"\n📁 输出目录: {output_p}"
             try:
-                if sys.platform == "win32":
-                    os.startfile(output_p)
-                elif sys.platform == "darwin":
-                    os.system(f'open "{output_p}"')
+                for ok, msg in results:
+                    log.append(msg)
+                    processed += 1
+                    if ok:
+                        success_count += 1
+                    if watcher is None and scanner.done:
+                        job.files_total = scanner.found
+                    job.report(files=1)
+            except JobCancelled:
+                save_reports()
+                if watcher is not None:
+                    log_view.finish(f"⏹️ 已停止监视，成功 {success_count}/{processed} 个文件", ft.Colors.ORANGE)
                 else:
-                    os.system(f'xdg-open "{output_p}"')
-            except Exception:
-                pass
+                    log_view.finish(f"⏹️ 已取消，完成 {success_count}/{scanner.found} 个文件", ft.Colors.ORANGE)
+                raise
+            finally:
+                if watcher is not None:
+                    watcher.stop()
+                if tracer is not None:
+                    trace.stop()
+
+            if scanner.found == 0:
+                log_view.finish("❌ 未找到任何 PDF 文件", ft.Colors.RED)
+                return
+
+            # 汇总 & 自动打开
+            save_reports()
+            summary = f"✅ 成功: {success_count}/{scanner.found} 个文件"
+            if success_count > 0:
+                summary += f"\n📁 输出目录: {output_p}"
+                try:
+                    if sys.platform == "win32":
+                        os.startfile(output_p)
+                    elif sys.platform == "darwin":
+                        os.system(f'open "{output_p}"')
+                    else:
+                        os.system(f'xdg-open "{output_p}"')
+                except Exception:
+                    pass
+
+            log_view.finish(summary, ft.Colors.GREEN if success_count > 0 else ft.Colors.RED)
 
-        status_text.value = "\n".join(log_lines) + summary
-        status_text.color = ft.Colors.GREEN if success_count > 0 else ft.Colors.RED
-        status_text.update()
+        job = get_job_runner().submit("PDF转JPG", run, on_event=on_job_event)
+        active_jobs.append(job)
+        progress_bar.visible = True
+        progress_bar.update()
+
+    def on_job_event(event):
+        if event.finished:
+            active_jobs[:] = [j for j in active_jobs if j.id != event.job_id]
+            if event.error:
+                log.append(f"❌ 转换中断: {event.error}")
+                log_view.finish("❌ 转换中断", ft.Colors.RED)
+            if not active_jobs:
+                log.close()
+        progress_bar.visible = bool(active_jobs)
+        # 总数未知（目录仍在扫描）时显示为不确定进度
+        progress_bar.value = event.files_done / event.files_total if event.files_total else None
+        progress_text.value = format_progress(event)
+        pause_button.text = "继续" if event.state == "paused" else "暂停"
+        progress_bar.update()
+        progress_text.update()
+        pause_button.update()
+
+    def toggle_pause(_):
+        for job in active_jobs:
+            if job.paused:
+                job.resume()
+            else:
+                job.pause()
+
+    def cancel_jobs(_):
+        for job in active_jobs:
+            job.cancel()
+
+    pause_button = ft.OutlinedButton("暂停", icon=ft.Icons.PAUSE, on_click=toggle_pause)
+    cancel_button = ft.OutlinedButton("取消", icon=ft.Icons.STOP, on_click=cancel_jobs)
 
     # === UI 布局 ===
     return ft.Column([
@@ -182,29 +1041,41 @@ def create_pdf_to_jpg_page(page: ft.Page) -> ft.Control:
                 ft.Text("📤 输出:", weight="bold"),
                 output_path_field,
                 ft.ElevatedButton("选择输出目录", icon=ft.Icons.SAVE, on_click=pick_output_folder),
+                ft.Row([workers_field, dpi_dropdown, quality_field]),
+                ft.Text("附加输出:", size=13),
+                ft.Row(list(extra_checkboxes.values()), wrap=True),
+                archive_dropdown,
+                ft.Row([max_pixels_field, oversize_dropdown]),
+                ft.Row([blank_dropdown, dedupe_checkbox]),
+                resume_checkbox,
+                watch_checkbox,
+                trace_checkbox,
             ])
         ], alignment=ft.MainAxisAlignment.START),
 
         ft.Divider(height=25),
-        ft.ElevatedButton(
-            "开始转换",
-            icon=ft.Icons.PLAY_ARROW,
-            on_click=start_conversion,
-            height=50,
-            style=ft.ButtonStyle(color=ft.Colors.WHITE, bgcolor=ft.Colors.BLUE)
-        ),
+        ft.Row([
+            ft.ElevatedButton(
+                "开始转换",
+                icon=ft.Icons.PLAY_ARROW,
+                on_click=start_conversion,
+                height=50,
+                style=ft.ButtonStyle(color=ft.Colors.WHITE, bgcolor=ft.Colors.BLUE)
+            ),
+            pause_button,
+            cancel_button,
+        ]),
+        progress_bar,
+        progress_text,
         ft.Divider(),
-        ft.Container(
-            content=status_text,
-            padding=10,
-            border=ft.border.all(1, ft.Colors.GREY_300),
-            border_radius=8,
-            expand=True,
-            bgcolor=ft.Colors.BLACK12
-        )
+        log_view.control,
     ], expand=True, scroll=ft.ScrollMode.AUTO)
 
 
-# === 注册工具 ===
-from . import register_tool
-register_tool("PDF转JPG", ft.Icons.PICTURE_AS_PDF, create_pdf_to_jpg_page)
\ No newline at end of file
+# === 工具入口（tools/__init__.py 通过 TOOL_NAME / TOOL_ICON 常量发现，打开时才导入本模块） ===
+build_ui = create_pdf_to_jpg_page
+
+
+if __name__ == "__main__":
+    from tools.cli import pdf_to_jpg_main
+    sys.exit(pdf_to_jpg_main())
\ No newline at end of file
@@ -0,0 +1,137 @@
+# tools/progress_log.py
+"""有界进度日志：最近若干行保存在环形缓冲中供界面显示，完整日志逐行追加写入磁盘。
+
+批量处理十万个文件时，界面只持有最近 capacity 行，内存和每次刷新的开销都与批量大小无关；
+需要查看全部记录时打开 path 指向的日志文件。
+
+    log = ProgressLog("pdf_to_jpg")
+    log.start()                     # 每次运行开始时调用：清空缓冲，新建日志文件
+    log.append("✅ a.pdf → 3 页")
+    log.tail(100)                   # [(序号, 级别, 文字)]
+    log.close()
+
+本模块不依赖 Flet；界面显示见 tools/log_view.py。
+"""
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+DEFAULT_LOG_DIR = Path(__file__).parent.parent / "logs"
+DEFAULT_CAPACITY = 1000
+# 日志目录中每个工具最多保留的历史日志文件数
+KEEP_LOG_FILES = 20
+LEVELS = ("info", "ok", "warning", "error")
+
+# 日志行: (序号, 级别, 文字)；每次运行序号从 1 开始连续递增，界面据此判断哪些行是新的
+LogLine = Tuple[int, str, str]
+
+
+def _level_of(text: str) -> str:
+    """按行首的状态符号推断级别（工具的日志行都以 ✅/❌/⚠️ 等开头）"""
+    if text.startswith("❌"):
+        return "error"
+    if text.startswith("⚠️"):
+        return "warning"
+    if text.startswith(("✅", "🎉")):
+        return "ok"
+    return "info"
+
+
+class ProgressLog:
+    def __init__(self, name: str, capacity: int = DEFAULT_CAPACITY, log_dir: Optional[Path] = DEFAULT_LOG_DIR):
+        self.name = name
+        self.log_dir = log_dir
+        self.path: Optional[Path] = None
+        self.run = 0  # 每次 start() 递增，界面据此判断是否需要清空
+        self.total = 0  # 本次运行累计的行数（含已移出缓冲的）
+        self.counts = {level: 0 for level in LEVELS}
+        self._lines: "deque[LogLine]" = deque(maxlen=capacity)
+        self._file = None
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[], None]] = []
+
+    # ---- 运行周期 ----
+    def start(self):
+        """开始新的一次运行：清空缓冲，关闭上次的日志文件并新建一个"""
+        error = None
+        with self._lock:
+            self._close_file()
+            self._lines.clear()
+            self.run += 1
+            self.total = 0
+            self.counts = {level: 0 for level in LEVELS}
+            self.path = None
+            if self.log_dir is not None:
+                try:
+                    self.log_dir.mkdir(parents=True, exist_ok=True)
+                    self._prune()
+                    path = self.log_dir / time.strftime(f"{self.name}_%Y%m%d_%H%M%S.log")
+                    if path.exists():  # 同一秒内多次运行
+                        path = path.with_name(f"{path.stem}_{self.run}.log")
+                    # 行缓冲：进程崩溃时已写出的行不丢失
+                    self._file = open(path, "a", encoding="utf-8", buffering=1)
+                    self.path = path
+                except OSError as e:
+                    error = e
+        if error is not None:
+            # 无法写日志文件时只保留内存中的最近几行
+            self.append(f"⚠️ 无法创建日志文件: {error}")
+        else:
+            self._notify()
+
+    def close(self):
+        with self._lock:
+            self._close_file()
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def _prune(self):
+        old = sorted(self.log_dir.glob(f"{self.name}_*.log"))
+        for path in old[:max(0, len(old) - KEEP_LOG_FILES + 1)]:
+            path.unlink(missing_ok=True)
+
+    # ---- 写入 / 读取 ----
+    def append(self, text: str, level: Optional[str] = None):
+        """追加一条记录（可以是多行文字，每行单独计数）；可从任意线程调用"""
+        with self._lock:
+            for line in text.splitlines() or [""]:
+                line_level = level or _level_of(line)
+                self.total += 1
+                self.counts[line_level] = self.counts.get(line_level, 0) + 1
+                self._lines.append((self.total, line_level, line))
+                if self._file is not None:
+                    try:
+                        self._file.write(line + "\n")
+                    except OSError:
+                        self._close_file()
+        self._notify()
+
+    def tail(self, n: Optional[int] = None) -> List[LogLine]:
+        """缓冲中最后 n 行（默认全部）"""
+        with self._lock:
+            lines = list(self._lines)
+        return lines if n is None else lines[-n:]
+
+    @property
+    def capacity(self) -> int:
+        return self._lines.maxlen
+
+    # ---- 变化通知 ----
+    def subscribe(self, callback: Callable[[], None]):
+        """每次内容变化后调用 callback()（在写入方的线程中）；回调应只做标记，不要在其中刷新界面"""
+        self._listeners.append(callback)
+
+    def _notify(self):
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ 日志回调失败: {e}")
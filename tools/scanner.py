@@ -0,0 +1,219 @@
+# tools/scanner.py
+"""并行目录扫描：多个线程同时 scandir 不同子目录，边扫描边产出匹配的文件。
+
+网络共享上的大目录树遍历一次可能要几分钟，rglob 必须全部走完才能开始处理；
+这里产出的是迭代器，可以直接交给转换/识别流水线，扫描与处理同时进行。
+
+    scanner = DirectoryScanner(root, extensions={".pdf"})
+    for path in scanner:          # 默认按发现顺序产出（最快）
+        ...
+    scanner.found, scanner.done   # 已发现的文件数、是否已走完整棵树
+
+ordered=True 时按路径排序后的深度优先顺序产出（与 sorted(root.rglob(...)) 相同），
+子目录在轮到它之前就已提交给线程池预取。符号链接指向的目录不进入，避免循环。
+"""
+import fnmatch
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+# 目录项: (排序键, 完整路径, 是否为目录)
+_Entry = Tuple[str, str, bool]
+_DONE = object()
+
+
+def default_scan_workers() -> int:
+    """扫描线程数：目录遍历主要在等 I/O（尤其是网络共享），线程数可以多于核心数"""
+    return min(32, (os.cpu_count() or 1) * 4)
+
+
+class DirectoryScanner:
+    """可迭代的目录扫描器，产出 Path。
+
+    extensions: 小写后缀集合（如 {".pdf"}），不区分大小写；None 为不限
+    min_size / max_size: 文件大小范围（字节），None 为不限
+    include: 文件名需匹配其中任一 glob（如 "*_scan*"），None 为不限
+    exclude: 文件名或目录名匹配其中任一 glob 时跳过（目录连同其子树）
+    on_error(path, exc): 无法读取的目录/文件，默认忽略（与 rglob 一致）
+    root 本身是文件时，满足条件则只产出它自己。
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        extensions: Optional[Iterable[str]] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        include: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+        workers: Optional[int] = None,
+        ordered: bool = False,
+        on_error: Optional[Callable[[str, OSError], None]] = None,
+    ):
+        self.root = Path(root)
+        self.extensions = {e.lower() for e in extensions} if extensions is not None else None
+        self.min_size = min_size
+        self.max_size = max_size
+        self.include = list(include) if include else None
+        self.exclude = list(exclude) if exclude else None
+        self.workers = max(1, workers or default_scan_workers())
+        self.ordered = ordered
+        self.on_error = on_error
+        self.found = 0
+        self.done = False
+        self._lock = threading.Lock()
+
+    # ---- 过滤 ----
+    def _excluded(self, name: str) -> bool:
+        return bool(self.exclude) and any(fnmatch.fnmatch(name, p) for p in self.exclude)
+
+    def _match_name(self, name: str) -> bool:
+        if self.extensions is not None and os.path.splitext(name)[1].lower() not in self.extensions:
+            return False
+        if self.include and not any(fnmatch.fnmatch(name, p) for p in self.include):
+            return False
+        return not self._excluded(name)
+
+    def _match_size(self, size: int) -> bool:
+        if self.min_size is not None and size < self.min_size:
+            return False
+        return self.max_size is None or size <= self.max_size
+
+    def accepts(self, path: Path) -> bool:
+        """单个文件是否满足全部过滤条件（含所在目录的排除规则），供监视模式检查事件中的文件"""
+        path = Path(path)
+        try:
+            parts = path.relative_to(self.root).parts
+        except ValueError:
+            return False
+        if any(self._excluded(part) for part in parts[:-1]) or not self._match_name(path.name):
+            return False
+        try:
+            return path.is_file() and self._match_size(path.stat().st_size)
+        except OSError:
+            return False
+
+    def _error(self, path: str, exc: OSError):
+        if self.on_error:
+            self.on_error(path, exc)
+
+    def _list(self, folder: str) -> List[_Entry]:
+        """读取一层目录：返回子目录和匹配的文件，按名称排序"""
+        entries = []
+        check_size = self.min_size is not None or self.max_size is not None
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not self._excluded(entry.name):
+                                entries.append((os.path.normcase(entry.name), entry.path, True))
+                        elif entry.is_file() and self._match_name(entry.name):
+                            # 只有需要时才 stat（Windows 上 scandir 已带大小，POSIX 上是一次系统调用）
+                            if not check_size or self._match_size(entry.stat().st_size):
+                                entries.append((os.path.normcase(entry.name), entry.path, False))
+                    except OSError as e:
+                        self._error(entry.path, e)
+        except OSError as e:
+            self._error(folder, e)
+        entries.sort()
+        return entries
+
+    def _count(self, n: int):
+        with self._lock:
+            self.found += n
+
+    # ---- 遍历 ----
+    def __iter__(self) -> Iterator[Path]:
+        self.found = 0
+        self.done = False
+        if self.root.is_file():
+            try:
+                if self._match_name(self.root.name) and self._match_size(self.root.stat().st_size):
+                    self.found = 1
+                    yield self.root
+            except OSError as e:
+                self._error(str(self.root), e)
+            self.done = True
+            return
+        if not self.root.is_dir():
+            self.done = True
+            return
+        yield from (self._iter_ordered() if self.ordered else self._iter_unordered())
+
+    def _iter_unordered(self) -> Iterator[Path]:
+        """每个目录一个任务，子目录继续提交；匹配的文件放进结果队列，谁先扫到谁先产出"""
+        results: "queue.Queue" = queue.Queue()
+        stop = threading.Event()
+        pending = [1]  # 尚未完成的目录任务数
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scan")
+
+        def finish_one():
+            with self._lock:
+                pending[0] -= 1
+                last = pending[0] == 0
+            if last:
+                results.put(_DONE)
+
+        def scan(folder: str):
+            try:
+                if stop.is_set():
+                    return
+                entries = self._list(folder)
+                files = [Path(path) for _, path, is_dir in entries if not is_dir]
+                dirs = [path for _, path, is_dir in entries if is_dir]
+                self._count(len(files))
+                for f in files:
+                    results.put(f)
+                with self._lock:
+                    pending[0] += len(dirs)
+                for i, sub in enumerate(dirs):
+                    try:
+                        pool.submit(scan, sub)
+                    except RuntimeError:
+                        # 迭代器已关闭、线程池已停止：剩下的子目录不再扫描
+                        for _ in dirs[i:]:
+                            finish_one()
+                        break
+            finally:
+                finish_one()
+
+        pool.submit(scan, str(self.root))
+        try:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    self.done = True
+                    return
+                yield item
+        finally:
+            stop.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _iter_ordered(self) -> Iterator[Path]:
+        """按排序后的深度优先顺序产出；当前目录的子目录全部提前提交，轮到时多半已扫描完"""
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scan")
+
+        def walk(listing) -> Iterator[Path]:
+            entries = listing.result()
+            prefetch = {path: pool.submit(self._list, path) for _, path, is_dir in entries if is_dir}
+            for _, path, is_dir in entries:
+                if is_dir:
+                    yield from walk(prefetch.pop(path))
+                else:
+                    self._count(1)
+                    yield Path(path)
+
+        try:
+            yield from walk(pool.submit(self._list, str(self.root)))
+            self.done = True
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def scan_files(root: Path, **kwargs) -> Iterator[Path]:
+    """DirectoryScanner 的函数形式，参数相同"""
+    return iter(DirectoryScanner(root, **kwargs))
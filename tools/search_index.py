@@ -0,0 +1,309 @@
+# tools/search_index.py
+"""OCR 结果全文检索：逐行保存文字、页码、区域和置信度，SQLite FTS5 建索引。
+
+每识别完一个文件就写入（同一文件重新识别时替换旧记录），不必等整批结束；
+查询结果指向具体文件、页码和页面上的区域。
+
+    index = get_search_index()
+    index.add(file_result)                 # ocr_to_doc.FileResult
+    for hit in index.search("合同编号"):
+        print(hit.path, hit.page, hit.box, hit.snippet)
+
+全文索引使用 trigram 分词，中文无需分词即可按任意子串查找，百万行级别的查询在毫秒级完成。
+trigram 无法匹配 2 个字的词（中文最常见的查询），另建一张只记行号的 FTS5 表，
+把每行的全部二字组编码为一个个 ASCII 词写入，2 个字的词同样走索引；
+只有单个字的词退回 LIKE 逐行比较（全部是单字时较慢）。
+SQLite 不支持 FTS5 trigram（3.34 以前）时 3 个字以上的词也退回 LIKE。
+"""
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+DEFAULT_INDEX_PATH = Path(__file__).parent.parent / "ocr_index.sqlite"
+# trigram 分词能匹配的最短查询词
+MIN_FTS_CHARS = 3
+# 二字组索引覆盖的查询词长度
+BIGRAM_CHARS = 2
+# 索引结构版本（PRAGMA user_version）；1 起有二字组索引
+SCHEMA_VERSION = 1
+# 片段中标记命中文字的符号
+HIGHLIGHT = ("【", "】")
+
+
+@dataclass
+class SearchHit:
+    path: str
+    page: int  # 从 1 开始
+    line: int  # 页内行号，从 1 开始
+    text: str
+    snippet: str  # 命中文字以 HIGHLIGHT 标出
+    source: str  # 该页的处理路径：text / ocr / hybrid
+    box: Optional[Tuple[float, float, float, float]]  # PDF 为页面坐标（点），图片为像素
+    score: Optional[float]  # 识别置信度，文字层的行为 None
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _bigram_token(gram: str) -> str:
+    """二字组编码为 unicode61 分词器视为一个词的 ASCII 串（两个码位的十六进制，以 x 分隔）"""
+    return f"{ord(gram[0]):x}x{ord(gram[1]):x}"
+
+
+def _bigram_tokens(text: str) -> str:
+    """一行文字中不含空白的全部二字组（小写，与 LIKE / trigram 一样不区分大小写），编码后以空格连接。
+
+    结果只由 text 决定：删除无内容 FTS5 表中的行时需要提供与写入时相同的词。
+    """
+    text = text.lower()
+    grams = {text[i:i + 2] for i in range(len(text) - 1) if not (text[i].isspace() or text[i + 1].isspace())}
+    return " ".join(sorted(_bigram_token(g) for g in grams))
+
+
+def _fts_phrase(term: str) -> str:
+    """把用户输入的词变成 FTS5 短语，其中的双引号、运算符都按普通字符处理"""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _highlight(text: str, terms: List[str]) -> str:
+    """LIKE 查询没有 highlight()，在 Python 中标出命中的词（不区分大小写）"""
+    lower = text.lower()
+    spans = []
+    for term in terms:
+        start = lower.find(term.lower())
+        while start >= 0:
+            spans.append((start, start + len(term)))
+            start = lower.find(term.lower(), start + len(term))
+    out, pos = [], 0
+    for start, end in sorted(spans):
+        if start < pos:
+            continue
+        out += [text[pos:start], HIGHLIGHT[0], text[start:end], HIGHLIGHT[1]]
+        pos = end
+    out.append(text[pos:])
+    return "".join(out)
+
+
+class SearchIndex:
+    def __init__(self, path: Path = DEFAULT_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL,"
+            " size INTEGER, mtime_ns INTEGER, pages INTEGER NOT NULL, indexed_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS lines ("
+            " id INTEGER PRIMARY KEY,"
+            " file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,"
+            " page INTEGER NOT NULL, line INTEGER NOT NULL, source TEXT NOT NULL, text TEXT NOT NULL,"
+            " score REAL, x0 REAL, y0 REAL, x1 REAL, y1 REAL);"
+            "CREATE INDEX IF NOT EXISTS lines_file ON lines(file_id, page, line);"
+        )
+        self.fts = self._create_fts()
+        self.bigrams = self._create_bigrams()
+
+    def _create_bigrams(self) -> bool:
+        """二字组索引：无内容、只记行号（detail=none）的 FTS5 表，由 _add/remove 维护；不支持时返回 False"""
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS lines_bigram USING fts5("
+                " grams, content='', columnsize=0, detail=none, tokenize='unicode61')"
+            )
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ SQLite 不支持 FTS5，两个字的查询退回逐行比较: {e}")
+            return False
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            # 旧版索引：为已有的行补建一次
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("INSERT INTO lines_bigram (lines_bigram) VALUES ('delete-all')")
+                self._insert_bigrams(self._conn.execute("SELECT id, text FROM lines").fetchall())
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def _insert_bigrams(self, rows):
+        self._conn.executemany(
+            "INSERT INTO lines_bigram (rowid, grams) VALUES (?, ?)",
+            ((line_id, _bigram_tokens(text)) for line_id, text in rows),
+        )
+
+    def _delete_file(self, path: str):
+        """删除一个文件的记录；无内容的二字组表不能由触发器维护，按原文重新算出二字组后删除"""
+        if self.bigrams:
+            rows = self._conn.execute(
+                "SELECT lines.id, lines.text FROM lines JOIN files ON files.id = lines.file_id WHERE files.path = ?",
+                (path,),
+            ).fetchall()
+            self._conn.executemany(
+                "INSERT INTO lines_bigram (lines_bigram, rowid, grams) VALUES ('delete', ?, ?)",
+                ((line_id, _bigram_tokens(text)) for line_id, text in rows),
+            )
+        self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def _create_fts(self) -> bool:
+        """外部内容 FTS5 表，由触发器与 lines 保持同步；不支持时返回 False"""
+        try:
+            self._conn.executescript(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS lines_fts USING fts5("
+                " text, content='lines', content_rowid='id', tokenize='trigram');"
+                "CREATE TRIGGER IF NOT EXISTS lines_ai AFTER INSERT ON lines BEGIN"
+                " INSERT INTO lines_fts(rowid, text) VALUES (new.id, new.text); END;"
+                "CREATE TRIGGER IF NOT EXISTS lines_ad AFTER DELETE ON lines BEGIN"
+                " INSERT INTO lines_fts(lines_fts, rowid, text) VALUES ('delete', old.id, old.text); END;"
+            )
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ SQLite 不支持 FTS5 trigram（{sqlite3.sqlite_version}），全文检索退回逐行比较: {e}")
+            return False
+
+    # ---- 写入 ----
+    def add(self, result) -> int:
+        """写入一个文件的识别结果（ocr_to_doc.FileResult），替换该文件以前的记录，返回写入的行数。
+
+        写入失败只打印警告并返回 0，不影响本次识别和导出。
+        """
+        try:
+            return self._add(result)
+        except sqlite3.Error as e:
+            print(f"⚠️ 全文索引写入失败 {result.path}: {e}")
+            return 0
+
+    def _add(self, result) -> int:
+        path = str(Path(result.path).resolve())
+        try:
+            st = os.stat(path)
+            size, mtime_ns = st.st_size, st.st_mtime_ns
+        except OSError:
+            size = mtime_ns = None
+        rows = []
+        for page_no, page in enumerate(result.pages, 1):
+            for line_no, line in enumerate(page.lines, 1):
+                box = line.box or (None, None, None, None)
+                rows.append((page_no, line_no, page.source, line.text, line.score, *box))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._delete_file(path)
+                file_id = self._conn.execute(
+                    "INSERT INTO files (path, size, mtime_ns, pages, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                    (path, size, mtime_ns, len(result.pages), time.time()),
+                ).lastrowid
+                self._conn.executemany(
+                    "INSERT INTO lines (file_id, page, line, source, text, score, x0, y0, x1, y1)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(file_id, *row) for row in rows],
+                )
+                if self.bigrams:
+                    self._insert_bigrams(
+                        self._conn.execute("SELECT id, text FROM lines WHERE file_id = ?", (file_id,)).fetchall()
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def remove(self, path: Path):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._delete_file(str(Path(path).resolve()))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    # ---- 查询 ----
+    def search(self, query: str, limit: int = 50, offset: int = 0, path_prefix: Optional[str] = None) -> List[SearchHit]:
+        """按空白分隔的各词同时出现（AND）查找行，结果按相关度排序（没有 3 个字以上的词时按文件、页、行排序）。
+
+        path_prefix 限定文件路径前缀（如某个文件夹）。
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        long_terms = [t for t in terms if len(t) >= MIN_FTS_CHARS] if self.fts else []
+        # trigram 之外的词：2 个字的查二字组索引，其余（单字、不支持 FTS5 时的长词）逐行 LIKE
+        short_terms = [t for t in terms if t not in long_terms]
+        where, params = [], []
+        if long_terms:
+            where.append("lines_fts MATCH ?")
+            params.append(" ".join(_fts_phrase(t) for t in long_terms))
+        for term in short_terms:
+            if len(term) == BIGRAM_CHARS and self.bigrams:
+                where.append("lines.id IN (SELECT rowid FROM lines_bigram WHERE lines_bigram MATCH ?)")
+                params.append(_fts_phrase(_bigram_token(term.lower())))
+            else:
+                where.append("lines.text LIKE ? ESCAPE '\\'")
+                params.append(_like_pattern(term))
+        if path_prefix:
+            where.append("files.path LIKE ? ESCAPE '\\'")
+            params.append(_like_pattern(str(Path(path_prefix).resolve()))[1:])
+        if long_terms:
+            sql = (
+                "SELECT files.path, lines.page, lines.line, lines.text,"
+                f" highlight(lines_fts, 0, '{HIGHLIGHT[0]}', '{HIGHLIGHT[1]}'),"
+                " lines.source, lines.x0, lines.y0, lines.x1, lines.y1, lines.score"
+                " FROM lines_fts JOIN lines ON lines.id = lines_fts.rowid JOIN files ON files.id = lines.file_id"
+                f" WHERE {' AND '.join(where)} ORDER BY lines_fts.rank LIMIT ? OFFSET ?"
+            )
+        else:
+            sql = (
+                "SELECT files.path, lines.page, lines.line, lines.text, NULL,"
+                " lines.source, lines.x0, lines.y0, lines.x1, lines.y1, lines.score"
+                " FROM lines JOIN files ON files.id = lines.file_id"
+                f" WHERE {' AND '.join(where)} ORDER BY files.path, lines.page, lines.line LIMIT ? OFFSET ?"
+            )
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, limit, offset)).fetchall()
+        hits = []
+        for path, page, line, text, snippet, source, x0, y0, x1, y1, score in rows:
+            if snippet is None or short_terms:
+                snippet = _highlight(text, terms)
+            box = (x0, y0, x1, y1) if x0 is not None else None
+            hits.append(SearchHit(path, page, line, text, snippet, source, box, score))
+        return hits
+
+    def stats(self) -> dict:
+        with self._lock:
+            files = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            lines = self._conn.execute("SELECT COUNT(*) FROM lines").fetchone()[0]
+        return {"files": files, "lines": lines, "fts": self.fts}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_index: Optional[SearchIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    """应用目录下的共享索引（与 OCR 缓存同级）"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex()
+        return _index
+
+
+if __name__ == "__main__":
+    import sys
+
+    from tools.cli import search_main
+    sys.exit(search_main())
@@ -0,0 +1,173 @@
+# tools/trace.py
+"""分阶段计时：记录渲染、编码、写盘、识别、导出等各阶段的耗时，按阶段和文件汇总，
+并可导出为 Chrome trace（chrome://tracing 或 https://ui.perfetto.dev 打开）。
+
+默认关闭，此时 span() 返回共享的空上下文管理器，开销只有一次函数调用：
+
+    tracer = trace.start()
+    with trace.span("pdf.render", file=name, page=3):
+        ...
+    trace.stop()
+    print(tracer.summary())
+
+只在最内层的阶段上计时（阶段之间不嵌套），按文件汇总时才不会重复计算。
+进程池的工作进程在本进程内 start()/stop()，把 tracer.events 随结果返回，由主进程 merge()。
+"""
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_NULL_SPAN = nullcontext()
+
+
+class _Span:
+    __slots__ = ("tracer", "stage", "args", "start")
+
+    def __init__(self, tracer: "Tracer", stage: str, args: dict):
+        self.tracer = tracer
+        self.stage = stage
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.stage, self.start, time.perf_counter_ns() - self.start, self.args)
+
+
+class Tracer:
+    """一次作业的计时记录；events 为 (阶段, 开始 ns, 时长 ns, 进程号, 线程号, 参数)"""
+
+    def __init__(self):
+        self.events: List[tuple] = []
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def span(self, stage: str, **args) -> _Span:
+        return _Span(self, stage, args)
+
+    def record(self, stage: str, start_ns: int, duration_ns: int, args: dict):
+        event = (stage, start_ns, duration_ns, self._pid, threading.get_ident(), args)
+        with self._lock:
+            self.events.append(event)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def merge(self, events: Iterable[tuple], counters: Optional[Dict[str, int]] = None):
+        """并入工作进程返回的记录"""
+        with self._lock:
+            self.events.extend(events)
+            for name, n in (counters or {}).items():
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def stage_totals(self) -> Dict[str, Tuple[int, float]]:
+        """阶段 -> (次数, 总秒数)，按总耗时降序"""
+        totals: Dict[str, List] = {}
+        with self._lock:
+            for stage, _, duration, _, _, _ in self.events:
+                entry = totals.setdefault(stage, [0, 0])
+                entry[0] += 1
+                entry[1] += duration
+        ordered = sorted(totals.items(), key=lambda kv: -kv[1][1])
+        return {stage: (n, ns / 1e9) for stage, (n, ns) in ordered}
+
+    def file_totals(self) -> Dict[str, float]:
+        """文件 -> 各阶段总秒数（只统计带 file 参数的阶段），按耗时降序"""
+        totals: Dict[str, int] = {}
+        with self._lock:
+            for _, _, duration, _, _, args in self.events:
+                name = args.get("file")
+                if name is not None:
+                    totals[name] = totals.get(name, 0) + duration
+        return {k: v / 1e9 for k, v in sorted(totals.items(), key=lambda kv: -kv[1])}
+
+    def summary(self, top_files: int = 3) -> str:
+        """多行文字汇总，供状态栏显示"""
+        stages = self.stage_totals()
+        if not stages:
+            return "⏱️ 没有记录到耗时数据"
+        busy = sum(seconds for _, seconds in stages.values())
+        # 多线程/多进程时各阶段耗时之和可能大于实际经过的时间
+        lines = [f"⏱️ 各阶段耗时（合计 {busy:.2f} 秒）:"]
+        for stage, (n, seconds) in stages.items():
+            lines.append(
+                f"  {stage}: {seconds:.2f} 秒 · {seconds / busy:.0%} · {n} 次 · 平均 {seconds / n * 1000:.1f} ms"
+            )
+        slowest = list(self.file_totals().items())[:top_files]
+        if slowest:
+            lines.append("  最慢的文件: " + " · ".join(f"{name} {s:.2f} 秒" for name, s in slowest))
+        if self.counters:
+            lines.append("  计数: " + " · ".join(f"{k} {v}" for k, v in sorted(self.counters.items())))
+        return "\n".join(lines)
+
+    def to_chrome_trace(self) -> dict:
+        """Chrome trace 事件格式（完整事件 ph=X，时间单位微秒）"""
+        with self._lock:
+            events = list(self.events)
+            counters = dict(self.counters)
+        origin = min((e[1] for e in events), default=0)
+        trace_events = [
+            {
+                "name": stage, "cat": stage.split(".", 1)[0], "ph": "X",
+                "ts": (start - origin) / 1000, "dur": duration / 1000,
+                "pid": pid, "tid": tid, "args": args,
+            }
+            for stage, start, duration, pid, tid, args in events
+        ]
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms", "otherData": {"counters": counters}}
+
+    def write_chrome_trace(self, path: Path):
+        path.write_text(json.dumps(self.to_chrome_trace(), ensure_ascii=False, default=str), encoding="utf-8")
+
+
+_active: Optional[Tracer] = None
+
+
+def start() -> Tracer:
+    """开启本进程的计时记录并返回记录器（替换已有的记录器）"""
+    global _active
+    _active = Tracer()
+    return _active
+
+
+def stop() -> Optional[Tracer]:
+    """关闭计时，返回刚才的记录器"""
+    global _active
+    tracer, _active = _active, None
+    return tracer
+
+
+def active() -> Optional[Tracer]:
+    return _active
+
+
+def span(stage: str, **args):
+    """计时上下文；未开启时返回空上下文"""
+    tracer = _active
+    if tracer is None:
+        return _NULL_SPAN
+    return tracer.span(stage, **args)
+
+
+def count(name: str, n: int = 1):
+    tracer = _active
+    if tracer is not None:
+        tracer.count(name, n)
+
+
+def save_report(tracer: Tracer, folder: Path) -> str:
+    """把 trace 写到 folder/trace_<时间>.json，返回汇总文字（含文件路径）"""
+    path = folder / time.strftime("trace_%Y%m%d_%H%M%S.json")
+    try:
+        tracer.write_chrome_trace(path)
+    except OSError as e:
+        return tracer.summary() + f"\n⚠️ 耗时记录写入失败: {e}"
+    return tracer.summary() + f"\n📊 耗时记录: {path}"
@@ -0,0 +1,245 @@
+# tools/watcher.py
+"""热文件夹监视：持续监视输入目录，把新增或修改、且已写完的文件交给转换/识别流水线。
+
+    watcher = FolderWatcher(root, extensions={".pdf"})
+    watcher.start()
+    for batch in watcher.batches(idle=job.checkpoint):   # 阻塞，直到 stop()
+        ...                                              # batch 为一组已就绪的 Path
+    watcher.stop()
+
+装有 watchdog 时使用系统文件事件（Linux inotify、Windows ReadDirectoryChangesW、macOS FSEvents），
+并每隔 rescan_interval 秒全量扫描一次兜底（网络共享上的事件并不可靠）；
+没有 watchdog 时每隔 poll_interval 秒扫描一次。
+
+扫描仪写文件需要时间：文件的大小和修改时间连续 settle 秒不变、且能以只读方式打开时才算写完。
+已交出的文件记录其大小和修改时间，之后只有再次变化才会重新交出。
+"""
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .scanner import DirectoryScanner
+
+DEFAULT_SETTLE = 2.0
+DEFAULT_POLL_INTERVAL = 2.0
+DEFAULT_RESCAN_INTERVAL = 60.0
+# 检查待定文件是否写完的间隔
+_TICK = 0.5
+
+# 文件状态: (大小, 修改时间 ns)
+_Signature = Tuple[int, int]
+
+
+def _signature(path: str) -> Optional[_Signature]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _readable(path: str) -> bool:
+    """Windows 上仍被写入方独占打开的文件无法读取"""
+    try:
+        with open(path, "rb"):
+            return True
+    except OSError:
+        return False
+
+
+class FolderWatcher:
+    """监视 root 下满足过滤条件的文件；过滤参数与 DirectoryScanner 相同。
+
+    include_existing 为 True 时启动时已有的文件也会交出一次（PDF 转换有清单，已完成的会被跳过），
+    否则只交出启动之后新增或修改的文件。native 为 False 时不使用 watchdog，始终轮询。
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        extensions: Optional[Iterable[str]] = None,
+        settle: float = DEFAULT_SETTLE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        rescan_interval: float = DEFAULT_RESCAN_INTERVAL,
+        include_existing: bool = True,
+        native: bool = True,
+        **filters,
+    ):
+        self.root = Path(root)
+        self.scanner = DirectoryScanner(self.root, extensions=extensions, **filters)
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.rescan_interval = rescan_interval
+        self.include_existing = include_existing
+        self.native = native
+        self.backend: Optional[str] = None  # "watchdog" / "polling"，start() 后确定
+        self.emitted = 0
+        self._known: Dict[str, _Signature] = {}  # 已交出的文件 -> 交出时的状态
+        self._pending: Dict[str, Tuple[Optional[_Signature], float]] = {}  # 待定文件 -> (状态, 状态开始不变的时刻)
+        self._lock = threading.Lock()
+        self._ready: "queue.Queue[Path]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+
+    # ---- 生命周期 ----
+    def start(self) -> "FolderWatcher":
+        if not self.root.is_dir():
+            raise NotADirectoryError(f"监视路径不是文件夹: {self.root}")
+        if self.native and self._start_native():
+            self.backend = "watchdog"
+        else:
+            self.backend = "polling"
+        self._thread = threading.Thread(target=self._loop, name="folder-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._observer is not None:
+            try:
+                self._observer.stop()
+                self._observer.join(timeout=2)
+            except Exception:
+                pass
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def _start_native(self) -> bool:
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return False
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory:
+                    return
+                # 移动/重命名时关心的是目标路径
+                path = getattr(event, "dest_path", "") or event.src_path
+                if event.event_type in ("created", "modified", "moved", "closed"):
+                    watcher._touch(os.fsdecode(path))
+
+        try:
+            observer = Observer()
+            observer.schedule(Handler(), str(self.root), recursive=True)
+            observer.daemon = True
+            observer.start()
+        except Exception as e:
+            # 例如 inotify 监视数达到上限
+            print(f"⚠️ 无法使用文件系统事件监视 {self.root}，改为轮询: {e}")
+            return False
+        self._observer = observer
+        return True
+
+    # ---- 产出 ----
+    def batches(self, max_batch: Optional[int] = None, idle: Optional[Callable[[], None]] = None) -> Iterator[List[Path]]:
+        """阻塞等待就绪的文件，每次把当时已就绪的文件（最多 max_batch 个）作为一批产出。
+
+        idle() 在等待期间约每 0.2 秒调用一次，可在其中抛出异常（如 JobCancelled）结束等待；
+        stop() 之后产出剩余的就绪文件并结束。
+        """
+        while True:
+            try:
+                batch = [self._ready.get(timeout=0.2)]
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                if idle:
+                    idle()
+                continue
+            while max_batch is None or len(batch) < max_batch:
+                try:
+                    batch.append(self._ready.get_nowait())
+                except queue.Empty:
+                    break
+            yield batch
+
+    def __iter__(self) -> Iterator[Path]:
+        for batch in self.batches():
+            yield from batch
+
+    # ---- 内部 ----
+    def _touch(self, path: str):
+        """文件系统事件：满足过滤条件的文件放入待定列表，重新开始计时"""
+        if not self.scanner.accepts(Path(path)):
+            return
+        with self._lock:
+            self._pending[path] = (None, time.monotonic())
+
+    def _rescan(self, initial: bool = False):
+        seen = set()
+        for path in self.scanner:
+            key = str(path)
+            seen.add(key)
+            signature = _signature(key)
+            if signature is None:
+                continue
+            with self._lock:
+                if initial and not self.include_existing:
+                    self._known[key] = signature
+                elif self._known.get(key) != signature and key not in self._pending:
+                    self._pending[key] = (None, time.monotonic())
+        with self._lock:
+            # 已删除的文件不再记录，以后同名文件出现时按新文件处理
+            for key in [k for k in self._known if k not in seen]:
+                del self._known[key]
+
+    def _check_pending(self):
+        now = time.monotonic()
+        with self._lock:
+            items = list(self._pending.items())
+        for path, (last, since) in items:
+            signature = _signature(path)
+            with self._lock:
+                if signature is None or self._known.get(path) == signature:
+                    # 已删除，或只是被访问、内容没有变化
+                    self._pending.pop(path, None)
+                    continue
+                if signature != last:
+                    # 刚发现或仍在变化：重新计时
+                    self._pending[path] = (signature, now)
+                    continue
+            if now - since < self.settle or not _readable(path):
+                continue  # 还没写完，下一轮再看
+            with self._lock:
+                self._pending.pop(path, None)
+            if not self.scanner.accepts(Path(path)):
+                continue
+            with self._lock:
+                self._known[path] = signature
+            self.emitted += 1
+            self._ready.put(Path(path))
+
+    def _loop(self):
+        try:
+            self._rescan(initial=True)
+        except Exception as e:
+            print(f"⚠️ 扫描 {self.root} 失败: {e}")
+        interval = self.rescan_interval if self.backend == "watchdog" else self.poll_interval
+        last_scan = time.monotonic()
+        while not self._stop.wait(_TICK):
+            if time.monotonic() - last_scan >= interval:
+                try:
+                    self._rescan()
+                except Exception as e:
+                    print(f"⚠️ 扫描 {self.root} 失败: {e}")
+                last_scan = time.monotonic()
+            self._check_pending()
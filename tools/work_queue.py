@@ -0,0 +1,481 @@
+# tools/work_queue.py
+"""共享目录任务队列：多台机器从同一个网络共享目录领取文件，合力处理一批 PDF 转换或 OCR。
+
+不需要消息服务器，队列就是共享目录中的几个文件夹：
+
+    <队列目录>/queue.json          工具、输入/输出路径、处理参数、租约时长
+    <队列目录>/items.txt           待处理文件（相对输入目录的路径），每行一个，行号即编号
+    <队列目录>/leases/000123.lease 租约：以 O_CREAT|O_EXCL 创建，只有一个进程能创建成功
+    <队列目录>/done/000123.json    处理结果：先写结果再删租约
+
+持有租约的进程每隔 lease_seconds/3 刷新一次租约文件的修改时间；进程崩溃或机器断网后租约过期，
+其他进程把过期的租约 rename 成自己的临时名（同样只有一个进程能成功）后重新领取，重试次数有上限。
+各机器的时钟需大致同步（误差远小于租约时长）。
+
+转换和识别都可以重复执行（PDF 转换有清单，OCR 结果覆盖写入），因此极少数情况下同一文件被处理两次
+也不影响结果；租约只是让这种情况尽量不发生。
+
+OCR 结果与单机运行一样写入全文检索索引（各机器本地的索引，与识别缓存相同）。空白页/重复页预筛
+在每个工作进程内进行，重复页只在同一进程处理过的页之间识别；预筛记录随结果保存，汇总时写出一份报告。
+
+    queue = WorkQueue.create(queue_dir, "pdf_to_jpg", input_dir, output_dir, settings)
+    for record in run_worker(WorkQueue(queue_dir)):   # 每台机器、每个进程各运行一份
+        ...
+    summary = collect_results(WorkQueue(queue_dir))   # 全部完成后汇总（OCR 在此导出文档）
+"""
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .manifest import atomic_write_bytes
+
+if TYPE_CHECKING:
+    from .page_filter import PageFilter
+
+QUEUE_FILE = "queue.json"
+ITEMS_FILE = "items.txt"
+SUMMARY_FILE = "summary.json"
+QUEUE_VERSION = 1
+QUEUE_TOOLS = ("pdf_to_jpg", "ocr_to_doc")
+DEFAULT_LEASE_SECONDS = 300.0
+DEFAULT_MAX_ATTEMPTS = 3
+# 没有可领取的文件（其余都被其他进程持有）时，再次查看的间隔
+DEFAULT_POLL_INTERVAL = 5.0
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _item_name(index: int) -> str:
+    return str(index).zfill(6)
+
+
+def _read_json(path: Path) -> Optional[dict]:
+    """读取 JSON 文件；不存在或正在被替换时返回 None"""
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: Path, data: dict):
+    atomic_write_bytes(path, json.dumps(data, ensure_ascii=False, indent=1).encode("utf-8"))
+
+
+@dataclass
+class Lease:
+    index: int
+    path: str  # 相对输入目录的路径
+    token: str
+    attempt: int
+    worker: str
+    lease_file: Path
+    lost: bool = False  # 刷新时发现租约已被其他进程接手
+
+    def renew(self) -> bool:
+        """刷新租约的修改时间；租约文件已不属于本进程时标记 lost 并返回 False"""
+        data = _read_json(self.lease_file)
+        if data is None or data.get("token") != self.token:
+            self.lost = True
+            return False
+        try:
+            os.utime(self.lease_file)
+        except OSError:
+            self.lost = True
+            return False
+        return True
+
+
+class WorkQueue:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        spec = _read_json(self.root / QUEUE_FILE)
+        if spec is None:
+            raise FileNotFoundError(f"不是任务队列目录（缺少 {QUEUE_FILE}）: {self.root}")
+        if spec.get("version") != QUEUE_VERSION:
+            raise ValueError(f"不支持的队列版本: {spec.get('version')}")
+        self.spec = spec
+        self.tool: str = spec["tool"]
+        self.input = Path(spec["input"])
+        self.output = Path(spec["output"])
+        self.settings: dict = spec.get("settings", {})
+        self.lease_seconds: float = spec.get("lease_seconds", DEFAULT_LEASE_SECONDS)
+        self.max_attempts: int = spec.get("max_attempts", DEFAULT_MAX_ATTEMPTS)
+        self.leases_dir = self.root / "leases"
+        self.done_dir = self.root / "done"
+        self._items: Optional[List[str]] = None
+        # 领取时的扫描位置和目录快照；快照只用来跳过明显不可领取的文件，是否领到以 O_EXCL 为准
+        self._cursor = 0
+        self._done: set = set()
+        self._leased: Dict[str, float] = {}
+
+    @classmethod
+    def create(
+        cls,
+        root: Path,
+        tool: str,
+        input_path: Path,
+        output_path: Path,
+        items: Iterable[Path],
+        settings: Optional[dict] = None,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> "WorkQueue":
+        """新建队列：items 为 input_path 下的文件；同一目录已有队列时抛出 FileExistsError"""
+        if tool not in QUEUE_TOOLS:
+            raise ValueError(f"不支持的工具: {tool}（可选 {', '.join(QUEUE_TOOLS)}）")
+        root = Path(root)
+        if (root / QUEUE_FILE).exists():
+            raise FileExistsError(f"队列已存在: {root}")
+        input_path = Path(input_path).resolve()
+        relative = [Path(p).resolve().relative_to(input_path).as_posix() for p in items]
+        root.mkdir(parents=True, exist_ok=True)
+        (root / "leases").mkdir(exist_ok=True)
+        (root / "done").mkdir(exist_ok=True)
+        atomic_write_bytes(root / ITEMS_FILE, "".join(p + "\n" for p in relative).encode("utf-8"))
+        # queue.json 最后写入：它存在时 items.txt 一定完整
+        _write_json(root / QUEUE_FILE, {
+            "version": QUEUE_VERSION,
+            "tool": tool,
+            "input": str(input_path),
+            "output": str(Path(output_path).resolve()),
+            "settings": settings or {},
+            "lease_seconds": lease_seconds,
+            "max_attempts": max_attempts,
+            "items": len(relative),
+            "created_at": time.time(),
+        })
+        return cls(root)
+
+    # ---- 文件列表 ----
+    @property
+    def items(self) -> List[str]:
+        if self._items is None:
+            text = (self.root / ITEMS_FILE).read_text(encoding="utf-8")
+            self._items = text.splitlines()
+        return self._items
+
+    def source_path(self, item: str) -> Path:
+        return self.input / item
+
+    def _lease_file(self, name: str) -> Path:
+        return self.leases_dir / f"{name}.lease"
+
+    def _done_file(self, name: str) -> Path:
+        return self.done_dir / f"{name}.json"
+
+    def _snapshot(self):
+        """先列租约再列结果：结果先于租约删除写入，两次列目录之间完成的文件不会被漏看成未领取"""
+        leased = {}
+        with os.scandir(self.leases_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".lease"):
+                    try:
+                        leased[entry.name[:-len(".lease")]] = entry.stat().st_mtime
+                    except OSError:
+                        pass
+        self._leased = leased
+        self._done = {name[:-len(".json")] for name in os.listdir(self.done_dir) if name.endswith(".json")}
+
+    def _expired(self, mtime: float) -> bool:
+        return time.time() - mtime > self.lease_seconds
+
+    # ---- 领取 / 完成 ----
+    def claim(self, worker: Optional[str] = None) -> Optional[Lease]:
+        """领取一个文件；当前没有可领取的（全部完成或都被其他进程持有）时返回 None。
+
+        按编号顺序扫描，到末尾后重新列目录，从头查找未完成的文件和过期的租约。
+        """
+        worker = worker or default_worker_id()
+        for rescan in (False, True):
+            if rescan or self._cursor == 0:
+                self._snapshot()
+                self._cursor = 0
+            while self._cursor < len(self.items):
+                index = self._cursor
+                self._cursor += 1
+                name = _item_name(index)
+                if name in self._done:
+                    continue
+                attempt = 1
+                if name in self._leased:
+                    if not self._expired(self._leased[name]):
+                        continue
+                    stolen = self._take_expired(name)
+                    if stolen is None:
+                        continue
+                    attempt = stolen + 1
+                    if attempt > self.max_attempts:
+                        self._give_up(index, stolen)
+                        continue
+                lease = self._try_lease(index, worker, attempt)
+                if lease is not None:
+                    return lease
+        return None
+
+    def _take_expired(self, name: str) -> Optional[int]:
+        """把过期租约 rename 为本进程的临时名（只有一个进程能成功），返回原租约的尝试次数"""
+        lease_file = self._lease_file(name)
+        stale = self.leases_dir / f"{name}.{uuid.uuid4().hex}.stale"
+        try:
+            # 快照可能已过时：确认租约此刻仍然过期（期间可能已被其他进程重新领取）
+            if not self._expired(lease_file.stat().st_mtime):
+                return None
+            os.rename(lease_file, stale)
+        except OSError:
+            return None  # 已被其他进程接手或释放
+        data = _read_json(stale) or {}
+        stale.unlink(missing_ok=True)
+        return int(data.get("attempt", 1))
+
+    def _give_up(self, index: int, attempts: int):
+        """租约反复过期（处理该文件的进程每次都崩溃）时记为失败，不再重试"""
+        name = _item_name(index)
+        item = self.items[index]
+        _write_json(self._done_file(name), {
+            "index": index, "path": item, "ok": False, "attempt": attempts, "worker": None,
+            "message": f"❌ {Path(item).name} 处理失败:\n租约已过期 {attempts} 次，处理该文件的进程可能反复崩溃",
+            "finished_at": time.time(),
+        })
+
+    def _try_lease(self, index: int, worker: str, attempt: int) -> Optional[Lease]:
+        name = _item_name(index)
+        lease_file = self._lease_file(name)
+        token = uuid.uuid4().hex
+        data = {"worker": worker, "token": token, "attempt": attempt, "claimed_at": time.time()}
+        try:
+            fd = os.open(lease_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return None
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        lease = Lease(index, self.items[index], token, attempt, worker, lease_file)
+        if self._done_file(name).exists():
+            # 快照之后刚被其他进程完成
+            self.release(lease)
+            return None
+        return lease
+
+    def complete(self, lease: Lease, record: dict):
+        """写入处理结果后释放租约"""
+        record = {"index": lease.index, "path": lease.path, "worker": lease.worker, "attempt": lease.attempt,
+                  "finished_at": time.time(), **record}
+        _write_json(self._done_file(_item_name(lease.index)), record)
+        self.release(lease)
+
+    def release(self, lease: Lease):
+        """放弃租约（不写结果），文件可被立即重新领取"""
+        if lease.renew():  # 只删除仍属于本进程的租约
+            lease.lease_file.unlink(missing_ok=True)
+
+    @contextmanager
+    def keep_alive(self, lease: Lease):
+        """处理期间在后台线程中定期刷新租约"""
+        stop = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(self.lease_seconds / 3):
+                if not lease.renew():
+                    print(f"⚠️ {lease.path} 的租约已被其他进程接手，结果仍会写入")
+                    return
+
+        thread = threading.Thread(target=heartbeat, name="lease-heartbeat", daemon=True)
+        thread.start()
+        try:
+            yield lease
+        finally:
+            stop.set()
+            thread.join()
+
+    # ---- 状态 / 结果 ----
+    def status(self) -> dict:
+        self._snapshot()
+        expired = sum(1 for name, mtime in self._leased.items() if name not in self._done and self._expired(mtime))
+        leased = sum(1 for name in self._leased if name not in self._done)
+        failed = sum(1 for record in self.results() if not record.get("ok"))
+        total = len(self.items)
+        return {
+            "tool": self.tool,
+            "items": total,
+            "done": len(self._done),
+            "failed": failed,
+            "leased": leased - expired,
+            "expired": expired,
+            "pending": total - len(self._done) - leased,
+        }
+
+    def finished(self) -> bool:
+        self._snapshot()
+        return len(self._done) >= len(self.items)
+
+    def results(self) -> Iterator[dict]:
+        """按编号顺序产出已完成文件的结果"""
+        for index in range(len(self.items)):
+            record = _read_json(self._done_file(_item_name(index)))
+            if record is not None:
+                yield record
+
+
+# === 各工具的处理函数（在工作进程中执行，按需导入重量级依赖） ===
+def render_settings(options) -> dict:
+    """RenderOptions -> 可写入 queue.json 的参数"""
+    return asdict(options)
+
+
+_worker_filter: Optional["PageFilter"] = None
+
+
+def _get_worker_filter(settings: dict) -> Optional["PageFilter"]:
+    """本进程的页面预筛过滤器（按队列设置创建，处理多个文件时共用，以便跨文件识别重复页）"""
+    global _worker_filter
+    blank, dedupe = settings.get("blank_pages", "keep"), bool(settings.get("dedupe", False))
+    if blank == "keep" and not dedupe:
+        return None
+    if _worker_filter is None or (_worker_filter.blank, _worker_filter.dedupe) != (blank, dedupe):
+        from .page_filter import PageFilter
+        _worker_filter = PageFilter(blank=blank, dedupe=dedupe)
+    return _worker_filter
+
+
+def _with_filter_records(record: dict, page_filter: Optional["PageFilter"]) -> dict:
+    """本文件的预筛记录随结果保存，汇总时写出报告"""
+    if page_filter is not None:
+        records, _ = page_filter.take_records()
+        if records:
+            record["page_filter"] = records
+    return record
+
+
+def _process_pdf(queue: WorkQueue, path: Path) -> dict:
+    from .pdf_to_jpg import OutputProfile, RenderOptions, convert_single_pdf, output_dir_for
+
+    settings = dict(queue.settings)
+    settings["profiles"] = tuple(OutputProfile(**p) for p in settings.get("profiles", ()))
+    page_filter = _get_worker_filter(settings)
+    ok, msg = convert_single_pdf(
+        path, output_dir_for(path, queue.input, queue.output), options=RenderOptions(**settings), page_filter=page_filter,
+    )
+    return _with_filter_records({"ok": ok, "message": msg}, page_filter)
+
+
+def _process_ocr(queue: WorkQueue, path: Path) -> dict:
+    from .ocr_cache import get_ocr_cache
+    from .ocr_to_doc import ocr_file
+    from .search_index import get_search_index
+
+    cache = get_ocr_cache() if queue.settings.get("cache", True) else None
+    page_filter = _get_worker_filter(queue.settings)
+    r = ocr_file(path, cache=cache, use_text_layer=queue.settings.get("use_text_layer", True), page_filter=page_filter)
+    if queue.settings.get("index", True):
+        get_search_index().add(r)
+    message = f"✅ {path.name} 识别完成"
+    filtered = page_filter.describe(str(path)) if page_filter else ""
+    if filtered:
+        message += f"；{filtered}"
+    # 文字随结果保存，汇总时按文件顺序导出为一份文档
+    record = {"ok": True, "message": message, "text": r.text, "pages": r.source_counts()}
+    return _with_filter_records(record, page_filter)
+
+
+_PROCESSORS: Dict[str, Callable[[WorkQueue, Path], dict]] = {
+    "pdf_to_jpg": _process_pdf,
+    "ocr_to_doc": _process_ocr,
+}
+
+
+def run_worker(
+    queue: WorkQueue,
+    worker: Optional[str] = None,
+    wait: bool = True,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    stop: Optional[threading.Event] = None,
+) -> Iterator[dict]:
+    """领取并处理文件，每完成一个产出其结果记录，直到队列全部完成。
+
+    wait 为 False 时没有可领取的文件就结束，否则等待其他进程持有的文件完成或租约过期；
+    stop 被设置后处理完当前文件即结束。
+    """
+    worker = worker or default_worker_id()
+    process = _PROCESSORS[queue.tool]
+    while not (stop and stop.is_set()):
+        lease = queue.claim(worker)
+        if lease is None:
+            if not wait or queue.finished():
+                return
+            if stop:
+                stop.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+            continue
+        started = time.perf_counter()
+        source = queue.source_path(lease.path)
+        try:
+            with queue.keep_alive(lease):
+                record = process(queue, source)
+        except Exception as e:
+            # 文件本身的问题（损坏、无法读取）重试也不会成功，直接记为失败
+            record = {"ok": False, "message": f"❌ {source.name} 处理失败:\n{e}"}
+        except BaseException:
+            # 中断（Ctrl+C 等）时释放租约，其他进程可以立即接手
+            queue.release(lease)
+            raise
+        record["seconds"] = round(time.perf_counter() - started, 3)
+        queue.complete(lease, record)
+        yield {**record, "path": lease.path, "attempt": lease.attempt}
+
+
+def collect_results(queue: WorkQueue, output: Optional[Path] = None, fmt: Optional[str] = None) -> dict:
+    """汇总全部结果写入队列目录下的 summary.json；OCR 队列同时把各文件文字按顺序导出为文档"""
+    output = Path(output or queue.output)
+    records = list(queue.results())
+    failed = [r for r in records if not r.get("ok")]
+    summary = {
+        "tool": queue.tool,
+        "items": len(queue.items),
+        "done": len(records),
+        "ok": len(records) - len(failed),
+        "failed": [{"path": r["path"], "message": r.get("message")} for r in failed],
+        "workers": sorted({r["worker"] for r in records if r.get("worker")}),
+        "retried": sum(1 for r in records if r.get("attempt", 1) > 1),
+        "seconds": round(sum(r.get("seconds", 0) for r in records), 3),
+        "files": [],
+    }
+    filter_records = [item for r in records for item in r.get("page_filter", ())]
+    if filter_records:
+        from .page_filter import PageFilter
+
+        page_filter = PageFilter()
+        page_filter.add_records(filter_records)
+        output.mkdir(parents=True, exist_ok=True)
+        report = page_filter.write_report(output)
+        summary["page_filter"] = {"counts": page_filter.counts(), "report": str(report)}
+    if queue.tool == "ocr_to_doc":
+        from .ocr_export import open_exporter, unique_export_name
+
+        output.mkdir(parents=True, exist_ok=True)
+        fmt = fmt or queue.settings.get("format", "word")
+        exporter = open_exporter(output, fmt, max_files=queue.settings.get("files_per_part", 1000),
+                                 name=unique_export_name(output))
+        try:
+            for r in records:
+                if r.get("ok"):
+                    exporter.add(Path(r["path"]).name, r.get("text", ""))
+        finally:
+            summary["files"] = [str(p) for p in exporter.close()]
+    _write_json(queue.root / SUMMARY_FILE, summary)
+    return summary
+
+
+if __name__ == "__main__":
+    import sys
+
+    from tools.cli import queue_main
+    sys.exit(queue_main())